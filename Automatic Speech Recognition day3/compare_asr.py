@@ -1,19 +1,7 @@
-import re
 from termcolor import colored
 from jiwer import wer
 
-# Helper: Normalize text (lowercase, remove punctuation)
-def normalize(text):
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
-
-# Read lines from file, skipping blank lines
-def read_lines(file_path):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = [line.strip() for line in f if line.strip()]
-    return lines
+from utils.text_utils import normalize, read_lines
 
 # File paths
 whisper_file = 'outputs/live_transcript.txt'
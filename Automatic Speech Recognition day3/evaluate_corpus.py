@@ -0,0 +1,303 @@
+"""
+Corpus-level ASR evaluation: run Whisper and/or Vosk over a manifest of audio/reference
+pairs and report per-utterance and corpus WER/CER with bootstrap confidence intervals,
+plus the real-time factor (decode time / audio duration) of each engine.
+
+Manifest formats (paths are resolved relative to the manifest file):
+  - JSONL: one {"audio": "clips/a.wav", "reference": "hello world", "id": "optional"} per line
+  - CSV/TSV: header row with at least `audio` and `reference` columns
+
+Decoding runs in a process pool (one model per worker) and hypotheses are cached on disk,
+keyed by the SHA-256 of the audio file, the engine, the model (the full path for Vosk)
+and the decode options (e.g. --language), so re-runs only decode new audio. Audio is
+decoded with ffmpeg directly, so a Vosk-only run needs neither whisper nor torch.
+
+Usage:
+  python evaluate_corpus.py --manifest data/test.jsonl --engines whisper vosk \
+      --whisper-model base --vosk-model vosk-model-small-en-us-0.15 --workers 2
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import jiwer
+import numpy as np
+
+from utils.audio_utils import ensure_dir, load_audio
+from utils.text_utils import normalize
+
+SAMPLE_RATE = 16000
+
+# Per-process engine state, populated by _init_worker
+_engine = None
+
+
+def read_manifest(manifest_path):
+    """Load utterances as dicts with id, audio (absolute path) and reference."""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    if manifest_path.endswith(".jsonl"):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        delimiter = "\t" if manifest_path.endswith(".tsv") else ","
+        with open(manifest_path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f, delimiter=delimiter))
+
+    utterances = []
+    for i, row in enumerate(rows):
+        if "audio" not in row or "reference" not in row:
+            raise ValueError(f"Manifest row {i} needs 'audio' and 'reference' fields: {row}")
+        audio = row["audio"] if os.path.isabs(row["audio"]) else os.path.join(base_dir, row["audio"])
+        utterances.append({
+            "id": row.get("id") or os.path.splitext(os.path.basename(audio))[0],
+            "audio": audio,
+            "reference": row["reference"]
+        })
+    return utterances
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def decode_options(engine, language=None):
+    """Options that change an engine's output; part of the hypothesis cache key."""
+    if engine == "whisper":
+        return {"language": language, "fp16": False}
+    return {}
+
+
+class HypothesisCache:
+    """One JSON file per (engine, model, decode options, audio hash) under cache_dir."""
+
+    def __init__(self, cache_dir, engine, model_name, options=None):
+        # Vosk models are directories: key on the full path so that two models with the
+        # same directory name do not share hypotheses. Whisper models are names.
+        model_key = os.path.realpath(model_name) if engine == "vosk" else model_name
+        safe_model = os.path.basename(os.path.normpath(model_name)).replace(os.sep, "_")
+        key = json.dumps({"model": model_key, "options": options or {}}, sort_keys=True)
+        name = f"{engine}-{safe_model}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]}"
+        self.directory = os.path.join(cache_dir, name)
+        ensure_dir(self.directory)
+
+    def _path(self, audio_hash):
+        return os.path.join(self.directory, f"{audio_hash}.json")
+
+    def get(self, audio_hash):
+        try:
+            with open(self._path(audio_hash), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, audio_hash, entry):
+        tmp_path = self._path(audio_hash) + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(audio_hash))
+
+
+# --- Engines (same calls as whisper_batch.py / vosk_live.py) ---
+
+class WhisperEngine:
+    def __init__(self, model_name, language=None):
+        import whisper
+        self.model = whisper.load_model(model_name)
+        self.options = decode_options("whisper", language)
+
+    def transcribe(self, audio):
+        result = self.model.transcribe(audio, **self.options)
+        return result["text"]
+
+
+class VoskEngine:
+    def __init__(self, model_path):
+        import vosk
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def transcribe(self, audio):
+        # Feed 16 kHz int16 PCM in 4000-frame chunks, as in the live recognizer
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        rec = self._vosk.KaldiRecognizer(self.model, SAMPLE_RATE)
+        parts = []
+        step = 4000 * 2
+        for start in range(0, len(pcm), step):
+            if rec.AcceptWaveform(pcm[start:start + step]):
+                parts.append(json.loads(rec.Result())["text"])
+        parts.append(json.loads(rec.FinalResult())["text"])
+        return " ".join(p for p in parts if p)
+
+
+def _init_worker(engine, model_name, language, threads):
+    global _engine
+    if engine == "whisper":
+        import torch
+        torch.set_num_threads(threads)
+        _engine = WhisperEngine(model_name, language)
+    else:
+        _engine = VoskEngine(model_name)
+
+
+def _decode(audio_path):
+    audio = load_audio(audio_path, SAMPLE_RATE)
+    start = time.perf_counter()
+    text = _engine.transcribe(audio)
+    return {
+        "hypothesis": text.strip(),
+        "decode_time": time.perf_counter() - start,
+        "audio_duration": len(audio) / SAMPLE_RATE
+    }
+
+
+def run_engine(engine, model_name, utterances, hashes, args):
+    """Decode every utterance with one engine, reusing cached hypotheses."""
+    cache = HypothesisCache(args.cache_dir, engine, model_name, decode_options(engine, args.language))
+    results = [cache.get(h) if not args.no_cache else None for h in hashes]
+    pending = [i for i, r in enumerate(results) if r is None]
+    print(f"[{engine}] {len(utterances) - len(pending)} cached, {len(pending)} to decode")
+
+    if pending:
+        threads = max(1, (os.cpu_count() or 1) // args.workers)
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(engine, model_name, args.language, threads)
+        ) as pool:
+            paths = [utterances[i]["audio"] for i in pending]
+            for i, entry in zip(pending, pool.map(_decode, paths)):
+                cache.put(hashes[i], entry)
+                results[i] = entry
+    return results
+
+
+# --- Metrics ---
+
+def error_counts(reference, hypothesis):
+    """Word and character (errors, reference length) for one normalized utterance pair."""
+    if not reference:
+        return len(hypothesis.split()), 0, len(hypothesis), 0
+    words = jiwer.process_words(reference, hypothesis)
+    chars = jiwer.process_characters(reference, hypothesis)
+    word_errors = words.substitutions + words.deletions + words.insertions
+    char_errors = chars.substitutions + chars.deletions + chars.insertions
+    return word_errors, len(reference.split()), char_errors, len(reference)
+
+
+def bootstrap_ci(errors, lengths, n_resamples=1000, confidence=0.95, seed=0):
+    """Percentile bootstrap CI of the corpus error rate, resampling utterances."""
+    errors = np.asarray(errors, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.float64)
+    if len(errors) == 0 or n_resamples <= 0:
+        return None
+    rng = np.random.default_rng(seed)
+    rates = np.empty(n_resamples)
+    # Resample in blocks to bound the (resamples x utterances) index matrix
+    block = max(1, 2_000_000 // len(errors))
+    for start in range(0, n_resamples, block):
+        stop = min(start + block, n_resamples)
+        idx = rng.integers(0, len(errors), size=(stop - start, len(errors)))
+        totals = lengths[idx].sum(axis=1)
+        rates[start:stop] = errors[idx].sum(axis=1) / np.maximum(totals, 1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(rates, [alpha, 1 - alpha])
+    return [float(low), float(high)]
+
+
+def score_engine(utterances, results, n_resamples):
+    rows = []
+    for utt, entry in zip(utterances, results):
+        ref, hyp = normalize(utt["reference"]), normalize(entry["hypothesis"])
+        w_err, w_len, c_err, c_len = error_counts(ref, hyp)
+        rows.append({
+            "id": utt["id"],
+            "audio": utt["audio"],
+            "reference": utt["reference"],
+            "hypothesis": entry["hypothesis"],
+            "word_errors": w_err,
+            "reference_words": w_len,
+            "wer": w_err / w_len if w_len else float(w_err > 0),
+            "char_errors": c_err,
+            "reference_chars": c_len,
+            "cer": c_err / c_len if c_len else float(c_err > 0),
+            "decode_time": entry["decode_time"],
+            "audio_duration": entry["audio_duration"]
+        })
+
+    word_errors = [r["word_errors"] for r in rows]
+    word_lengths = [r["reference_words"] for r in rows]
+    char_errors = [r["char_errors"] for r in rows]
+    char_lengths = [r["reference_chars"] for r in rows]
+    decode_time = sum(r["decode_time"] for r in rows)
+    audio_duration = sum(r["audio_duration"] for r in rows)
+    summary = {
+        "utterances": len(rows),
+        "wer": sum(word_errors) / max(sum(word_lengths), 1),
+        "wer_ci": bootstrap_ci(word_errors, word_lengths, n_resamples),
+        "cer": sum(char_errors) / max(sum(char_lengths), 1),
+        "cer_ci": bootstrap_ci(char_errors, char_lengths, n_resamples),
+        "decode_time": decode_time,
+        "audio_duration": audio_duration,
+        "rtf": decode_time / audio_duration if audio_duration else None
+    }
+    return summary, rows
+
+
+def _format_ci(ci):
+    return f"[{ci[0]:.2%}, {ci[1]:.2%}]" if ci else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate ASR engines on a corpus manifest")
+    parser.add_argument("--manifest", required=True, help="JSONL/CSV/TSV with audio and reference columns")
+    parser.add_argument("--engines", nargs="+", default=["whisper"], choices=["whisper", "vosk"])
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--vosk-model", default="vosk-model-small-en-us-0.15")
+    parser.add_argument("--language", default=None, help="Force the Whisper decoding language")
+    parser.add_argument("--workers", type=int, default=2, help="Decoder processes per engine")
+    parser.add_argument("--cache-dir", default="outputs/eval_cache")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached hypotheses")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Bootstrap resamples (0 disables CIs)")
+    parser.add_argument("--output", default=None, help="Report path (default: outputs/corpus_eval_<time>.json)")
+    args = parser.parse_args()
+
+    utterances = read_manifest(args.manifest)
+    missing = [u["audio"] for u in utterances if not os.path.exists(u["audio"])]
+    if missing:
+        raise FileNotFoundError(f"{len(missing)} audio files not found, e.g. {missing[0]}")
+    hashes = [file_sha256(u["audio"]) for u in utterances]
+    print(f"Loaded {len(utterances)} utterances from {args.manifest}")
+
+    report = {"manifest": os.path.abspath(args.manifest), "engines": {}}
+    for engine in args.engines:
+        model_name = args.whisper_model if engine == "whisper" else args.vosk_model
+        results = run_engine(engine, model_name, utterances, hashes, args)
+        summary, rows = score_engine(utterances, results, args.bootstrap)
+        report["engines"][engine] = {"model": model_name, "summary": summary, "utterances": rows}
+
+    print(f"\n{'Engine':<10} {'WER':>8} {'WER 95% CI':>20} {'CER':>8} {'CER 95% CI':>20} {'RTF':>7}")
+    print("-" * 78)
+    for engine, data in report["engines"].items():
+        s = data["summary"]
+        rtf = f"{s['rtf']:.3f}" if s["rtf"] is not None else "-"
+        print(f"{engine:<10} {s['wer']:>8.2%} {_format_ci(s['wer_ci']):>20} "
+              f"{s['cer']:>8.2%} {_format_ci(s['cer_ci']):>20} {rtf:>7}")
+
+    output = args.output or os.path.join("outputs", f"corpus_eval_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    ensure_dir(os.path.dirname(output) or ".")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReport saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
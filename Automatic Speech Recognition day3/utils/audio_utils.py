@@ -1,6 +1,8 @@
 import os
 import subprocess
 
+import numpy as np
+
 def convert_to_wav(input_path, output_path, sample_rate=16000):
     """Convert audio file to WAV format with specified sample rate."""
     command = [
@@ -13,6 +15,24 @@ def convert_to_wav(input_path, output_path, sample_rate=16000):
     ]
     subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
+def load_audio(path, sample_rate=16000):
+    """Decode any ffmpeg-readable file to mono float32 in [-1, 1] (same as whisper.load_audio)."""
+    command = [
+        'ffmpeg',
+        '-nostdin',
+        '-threads', '0',
+        '-i', path,
+        '-f', 's16le',  # raw little-endian int16 PCM on stdout
+        '-ac', '1',
+        '-acodec', 'pcm_s16le',
+        '-ar', str(sample_rate),
+        '-'
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to load audio {path}: {result.stderr.decode(errors='ignore')}")
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
 def ensure_dir(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
@@ -0,0 +1,16 @@
+import re
+
+
+def normalize(text):
+    """Lowercase, strip punctuation and collapse whitespace."""
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def read_lines(file_path):
+    """Read lines from a file, skipping blank lines."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return lines
@@ -0,0 +1,96 @@
+"""
+Startup-time benchmark for the translator.
+
+Each run starts a fresh Python process and measures:
+  - import_s:            `import src.translator` (should not load the model)
+  - load_s:              first get_translation_pipeline() call (model load)
+  - first_translation_s: first translate_text() call after loading
+Results are appended to benchmarks/startup_history.jsonl so regressions show up over time.
+
+Usage (from the project root):
+  python benchmarks/bench_startup.py --runs 3
+  python -m src.pipeline_manager models/opus-mt-en-fr   # one-off conversion
+  python benchmarks/bench_startup.py --runs 3 --local-dir models/opus-mt-en-fr
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HISTORY_FILE = os.path.join(PROJECT_ROOT, 'benchmarks', 'startup_history.jsonl')
+
+CHILD_SCRIPT = r"""
+import json, time
+t0 = time.perf_counter()
+import src.translator as translator
+t1 = time.perf_counter()
+pipe = translator.get_translation_pipeline()
+t2 = time.perf_counter()
+text = translator.translate_text("Hello, how are you today?")
+t3 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "load_s": t2 - t1, "first_translation_s": t3 - t2,
+                  "ok": pipe is not None, "sample": text}))
+"""
+
+
+def run_once(local_dir=None):
+    env = dict(os.environ)
+    if local_dir:
+        env['MT_LOCAL_MODEL_DIR'] = os.path.abspath(local_dir)
+    else:
+        env.pop('MT_LOCAL_MODEL_DIR', None)
+    proc = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT], cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, check=True
+    )
+    # The last stdout line is the JSON record; earlier lines are load messages
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure translator import and first-translation latency")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--local-dir', default=None, help="Pre-converted safetensors model directory")
+    parser.add_argument('--no-history', action='store_true', help="Do not append to the history file")
+    args = parser.parse_args()
+
+    runs = [run_once(args.local_dir) for _ in range(args.runs)]
+    if not all(r['ok'] for r in runs):
+        print("Warning: the pipeline failed to load in at least one run.")
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'source': 'local' if args.local_dir else 'hub',
+        'runs': args.runs
+    }
+    for key in ('import_s', 'load_s', 'first_translation_s'):
+        values = [r[key] for r in runs]
+        record[key] = round(statistics.median(values), 4)
+        record[f'{key}_min'] = round(min(values), 4)
+
+    print(f"{'metric':<22} {'median':>9} {'min':>9}")
+    for key in ('import_s', 'load_s', 'first_translation_s'):
+        print(f"{key:<22} {record[key]:>9.3f} {record[key + '_min']:>9.3f}")
+
+    if not args.no_history:
+        with open(HISTORY_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        print(f"Appended to {HISTORY_FILE}")
+
+
+if __name__ == '__main__':
+    main()
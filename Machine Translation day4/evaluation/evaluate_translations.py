@@ -2,22 +2,129 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
+import hashlib
 import json
-from datetime import datetime
-from sacrebleu import corpus_bleu
-from src.translator import translate_text
+import sqlite3
 import string
+import time
+from datetime import datetime
+
+from sacrebleu import corpus_bleu, corpus_chrf
+from src.pipeline_manager import DEFAULT_MODEL, setup_pipeline
 
 def normalize_text(text: str) -> str:
     text = text.lower()
     text = text.translate(str.maketrans('', '', string.punctuation))
     return text.strip()
 
-def evaluate_translations():
+class TranslationMemo:
+    """
+    On-disk memo of model outputs keyed by (model, source text), so re-running
+    the evaluation only translates samples that are new for a given model.
+    """
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, translation TEXT NOT NULL, "
+            "latency REAL NOT NULL, PRIMARY KEY (model, text_hash))"
+        )
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, model: str, texts):
+        """Return {text: (translation, latency)} for the texts already memoized."""
+        found = {}
+        hashes = {self._hash(t): t for t in texts}
+        keys = list(hashes)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT text_hash, translation, latency FROM translations "
+                f"WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                [model, *chunk]
+            )
+            for text_hash, translation, latency in rows:
+                found[hashes[text_hash]] = (translation, latency)
+        return found
+
+    def put_many(self, model: str, items):
+        """Store (text, translation, latency) tuples."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                [(model, self._hash(t), out, lat) for t, out, lat in items]
+            )
+
+    def close(self):
+        self.conn.close()
+
+def translate_batched(translator_pipeline, texts, batch_size):
+    """
+    Translate a list of texts in batches. Texts are sorted by length so each batch
+    pads to a similar size; results come back in input order with the per-sentence
+    latency (batch wall time divided by batch size).
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    outputs = [None] * len(texts)
+    latencies = [0.0] * len(texts)
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        batch = [texts[i] for i in idx]
+        t0 = time.perf_counter()
+        result = translator_pipeline(batch, batch_size=len(batch))
+        elapsed = time.perf_counter() - t0
+        for i, item in zip(idx, result):
+            outputs[i] = item['translation_text']
+            latencies[i] = elapsed / len(batch)
+    return outputs, latencies
+
+def evaluate_model(model_name, sources, references, memo, batch_size):
+    """Translate all sources with one model (memo first) and score them."""
+    cached = memo.get_many(model_name, set(sources))
+    todo = sorted({s for s in sources if s not in cached})
+
+    translation_time = 0.0
+    if todo:
+        translator_pipeline = setup_pipeline(model_name)
+        if translator_pipeline is None:
+            print(f"Skipping '{model_name}': pipeline could not be loaded.")
+            return None
+        t0 = time.perf_counter()
+        outputs, latencies = translate_batched(translator_pipeline, todo, batch_size)
+        translation_time = time.perf_counter() - t0
+        memo.put_many(model_name, zip(todo, outputs, latencies))
+        cached.update({s: (o, l) for s, o, l in zip(todo, outputs, latencies)})
+
+    hypotheses = [cached[s][0] for s in sources]
+    latencies = sorted(cached[s][1] for s in sources)
+    bleu = corpus_bleu(hypotheses, [references])
+    chrf = corpus_chrf(hypotheses, [references])
+    total_latency = sum(latencies)
+    return {
+        'model': model_name,
+        'bleu_score': round(bleu.score, 2),
+        'chrf_score': round(chrf.score, 2),
+        'samples': len(sources),
+        'newly_translated': len(todo),
+        'batch_size': batch_size,
+        'mean_latency_ms': round(1000 * total_latency / max(len(latencies), 1), 2),
+        'p95_latency_ms': round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else 0.0,
+        'throughput_sentences_per_s': round(len(latencies) / total_latency, 2) if total_latency else None,
+        'translation_time_s': round(translation_time, 3),
+        'hypotheses': hypotheses
+    }
+
+def evaluate_translations(models=None, batch_size=16, use_cache=True):
     project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
     data_path = os.path.join(project_root, 'data', 'test_samples.json')
     output_dir = os.path.join(project_root, 'outputs')
     os.makedirs(output_dir, exist_ok=True)
+    models = models or [DEFAULT_MODEL]
 
     try:
         with open(data_path, 'r', encoding='utf-8') as f:
@@ -26,41 +133,67 @@ def evaluate_translations():
         print(f"Error: Could not find test_samples.json at {data_path}")
         return
 
-    model_translations = []
-    ground_truths = []
-    results_data = []
+    sources = [sample['asr_output'] for sample in test_samples]
+    ground_truths = [sample['ground_truth_translation'] for sample in test_samples]
+    memo_path = os.path.join(output_dir, 'translation_memo.sqlite') if use_cache else ':memory:'
+    memo = TranslationMemo(memo_path)
 
+    model_reports = []
+    try:
+        for model_name in models:
+            report = evaluate_model(model_name, sources, ground_truths, memo, batch_size)
+            if report is not None:
+                model_reports.append(report)
+    finally:
+        memo.close()
+    if not model_reports:
+        print("Error: no model could be evaluated.")
+        return
+
+    # Per-sample view uses the first model, as in the single-model report
+    primary = model_reports[0]
+    results_data = []
     print("--- Translation Evaluation Results ---")
-    for sample in test_samples:
+    for i, (sample, model_output) in enumerate(zip(test_samples, primary['hypotheses'])):
         asr_input = sample['asr_output']
         ground_truth = sample['ground_truth_translation']
-        model_output = translate_text(asr_input)
-        model_translations.append(model_output)
-        ground_truths.append(ground_truth)
         results_data.append({
             'id': sample['id'],
             'input_asr': asr_input,
             'ground_truth_translation': ground_truth,
-            'model_translation': model_output
+            'model_translation': model_output,
+            'model_translations': {r['model']: r['hypotheses'][i] for r in model_reports}
         })
         match = 'Yes' if normalize_text(model_output) == normalize_text(ground_truth) else 'No'
         print(f"Source (ASR): \"{asr_input}\"")
         print(f"Translated  : \"{model_output}\"")
         print(f"Expected    : \"{ground_truth}\"")
         print(f"Match       : {match}\n")
-    bleu = corpus_bleu(model_translations, [ground_truths])
+
     final_output = {
         'evaluation_timestamp': datetime.now().isoformat(),
-        'bleu_score': f"{bleu.score:.2f}",
+        'bleu_score': f"{primary['bleu_score']:.2f}",
+        'models': [{k: v for k, v in r.items() if k != 'hypotheses'} for r in model_reports],
         'results': results_data
     }
     output_filename = os.path.join(output_dir, 'evaluation_results.json')
     with open(output_filename, 'w', encoding='utf-8') as f:
         json.dump(final_output, f, indent=4, ensure_ascii=False)
     print("--- Summary ---")
-    print(f"Overall BLEU Score: {bleu.score:.2f}")
+    print(f"{'Model':<40} {'BLEU':>7} {'chrF':>7} {'ms/sent':>9} {'sent/s':>8} {'new':>5}")
+    for r in model_reports:
+        throughput = r['throughput_sentences_per_s']
+        print(f"{r['model']:<40} {r['bleu_score']:>7.2f} {r['chrf_score']:>7.2f} "
+              f"{r['mean_latency_ms']:>9.2f} {throughput if throughput is not None else '-':>8} "
+              f"{r['newly_translated']:>5}")
     print(f"Detailed results saved to: {output_filename}")
     print("-----------------")
 
 if __name__ == "__main__":
-    evaluate_translations()
+    parser = argparse.ArgumentParser(description="Evaluate translation models on data/test_samples.json")
+    parser.add_argument('--models', nargs='+', default=[DEFAULT_MODEL],
+                        help="Hugging Face translation models to compare")
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--no-cache', action='store_true', help="Ignore the on-disk translation memo")
+    args = parser.parse_args()
+    evaluate_translations(models=args.models, batch_size=args.batch_size, use_cache=not args.no_cache)
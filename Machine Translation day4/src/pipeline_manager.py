@@ -1,18 +1,68 @@
-from transformers import pipeline
+import os
 
-def setup_pipeline():
+DEFAULT_MODEL = 'Helsinki-NLP/opus-mt-en-fr'
+
+# Directory holding a pre-converted (safetensors) copy of the model; see convert_model()
+LOCAL_MODEL_ENV = 'MT_LOCAL_MODEL_DIR'
+
+def _is_local_model(path: str) -> bool:
+    return bool(path) and os.path.isfile(os.path.join(path, 'model.safetensors'))
+
+def setup_pipeline(model_name: str = DEFAULT_MODEL, local_dir: str = None):
     """
-    Initializes and returns the MarianMT translation pipeline.
+    Initializes and returns a MarianMT translation pipeline.
     
-    This function loads the pre-trained English-to-French model
-    from Hugging Face.
+    By default this loads the pre-trained English-to-French model
+    from Hugging Face; pass another model name to evaluate alternatives.
+    If `local_dir` (or, for the default model, the MT_LOCAL_MODEL_DIR environment
+    variable) points to a directory written by convert_model(), the weights are
+    memory-mapped from its safetensors file instead, which skips the hub lookup
+    and pickle loading. A configured directory without model.safetensors raises
+    FileNotFoundError rather than silently downloading from the hub.
     """
-    model_name = 'Helsinki-NLP/opus-mt-en-fr'
+    source = 'local_dir'
+    if local_dir is None and model_name == DEFAULT_MODEL:
+        local_dir = os.environ.get(LOCAL_MODEL_ENV)
+        source = LOCAL_MODEL_ENV
+    if local_dir and not _is_local_model(local_dir):
+        raise FileNotFoundError(
+            f"{source}='{local_dir}' has no model.safetensors; run convert_model() to create it"
+        )
     try:
-        translator_pipeline = pipeline('translation', model=model_name)
-        print(f"Pipeline for model '{model_name}' loaded successfully.")
+        # transformers is imported here so that importing this module stays cheap
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+
+        if _is_local_model(local_dir):
+            tokenizer = AutoTokenizer.from_pretrained(local_dir)
+            model = AutoModelForSeq2SeqLM.from_pretrained(local_dir, use_safetensors=True)
+            translator_pipeline = pipeline('translation', model=model, tokenizer=tokenizer)
+            print(f"Pipeline loaded from local safetensors directory '{local_dir}'.")
+        else:
+            translator_pipeline = pipeline('translation', model=model_name)
+            print(f"Pipeline for model '{model_name}' loaded successfully.")
         return translator_pipeline
     except Exception as e:
         print(f"Error loading pipeline: {e}")
         return None
 
+def convert_model(output_dir: str, model_name: str = DEFAULT_MODEL) -> str:
+    """
+    Download a model once and save it (weights as safetensors + tokenizer) to
+    `output_dir`, for fast cold starts via setup_pipeline(local_dir=...).
+    """
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    AutoModelForSeq2SeqLM.from_pretrained(model_name).save_pretrained(output_dir, safe_serialization=True)
+    print(f"Model '{model_name}' saved to '{output_dir}'.")
+    return output_dir
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a translation model to a local safetensors directory")
+    parser.add_argument('output_dir')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    args = parser.parse_args()
+    convert_model(args.output_dir, args.model)
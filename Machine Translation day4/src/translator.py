@@ -1,8 +1,40 @@
+import threading
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
 from .pipeline_manager import setup_pipeline
 
-# Initialize the pipeline once when the module is loaded
-# This avoids reloading the model on every function call
-translation_pipeline = setup_pipeline()
+# The pipeline is created on first use (not at import time) and shared afterwards
+_translation_pipeline = None
+_pipeline_lock = threading.Lock()
+_pipeline_loaded = False
+
+def get_translation_pipeline():
+    """
+    Return the shared translation pipeline, loading it on the first call.
+    Thread-safe: concurrent first callers wait for a single load. Returns None
+    if loading failed (the failure is not retried).
+    """
+    global _translation_pipeline, _pipeline_loaded
+    if not _pipeline_loaded:
+        with _pipeline_lock:
+            if not _pipeline_loaded:
+                _translation_pipeline = setup_pipeline()
+                _pipeline_loaded = True
+    return _translation_pipeline
+
+@dataclass
+class TranslationResult:
+    """Outcome for one input of translate_many: either a translation or an error."""
+    index: int
+    source: str
+    translation: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 def translate_text(asr_output: str) -> str:
     """
@@ -14,6 +46,7 @@ def translate_text(asr_output: str) -> str:
     Returns:
         The translated French text as a string.
     """
+    translation_pipeline = get_translation_pipeline()
     if translation_pipeline is None:
         return "Error: Translation pipeline not available."
 
@@ -27,3 +60,83 @@ def translate_text(asr_output: str) -> str:
     except Exception as e:
         return f"Error during translation: {e}"
 
+def _translate_batch(translation_pipeline, texts):
+    """Translate a batch; if the batch fails, retry items one by one to isolate the bad input."""
+    try:
+        result = translation_pipeline(texts, batch_size=len(texts))
+        return [(item['translation_text'], None) for item in result]
+    except Exception:
+        if len(texts) == 1:
+            raise
+    outcomes = []
+    for text in texts:
+        try:
+            outcomes.append((translation_pipeline(text)[0]['translation_text'], None))
+        except Exception as e:
+            outcomes.append((None, f"Error during translation: {e}"))
+    return outcomes
+
+def translate_many(texts: Iterable[str], batch_size: int = 16, window: Optional[int] = None) -> Iterator[TranslationResult]:
+    """
+    Translate an arbitrarily large iterable of strings (a list, a generator, an open file)
+    and yield one TranslationResult per input, in input order.
+
+    Inputs are consumed `window` items at a time (default: 8 batches). Within a window
+    they are sorted by length so each batch pads to similar lengths, then results are
+    put back in input order. A failing item yields a result with `error` set instead of
+    aborting the whole stream.
+
+    Args:
+        texts: The English texts to translate. Trailing newlines are stripped.
+        batch_size: Number of sentences per forward pass.
+        window: Number of inputs buffered and length-sorted together.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    window = window or batch_size * 8
+    translation_pipeline = get_translation_pipeline()
+    iterator = iter(texts)
+    offset = 0
+    while True:
+        chunk = list(islice(iterator, window))
+        if not chunk:
+            return
+        results = [TranslationResult(index=offset + i, source=text) for i, text in enumerate(chunk)]
+        valid = []
+        for result in results:
+            if not isinstance(result.source, str) or not result.source.strip():
+                result.error = "Error: Invalid input. Please provide a non-empty string."
+            elif translation_pipeline is None:
+                result.error = "Error: Translation pipeline not available."
+            else:
+                result.source = result.source.rstrip("\r\n")
+                valid.append(result)
+
+        valid.sort(key=lambda r: len(r.source))
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            try:
+                outcomes = _translate_batch(translation_pipeline, [r.source for r in batch])
+            except Exception as e:
+                outcomes = [(None, f"Error during translation: {e}")] * len(batch)
+            for result, (translation, error) in zip(batch, outcomes):
+                result.translation, result.error = translation, error
+
+        yield from results
+        offset += len(chunk)
+
+def translate_file(input_path: str, output_path: str, batch_size: int = 16) -> int:
+    """
+    Translate a text file line by line without loading it into memory.
+    Failed lines are written as empty lines so line numbers stay aligned.
+
+    Returns:
+        The number of lines that failed to translate.
+    """
+    failures = 0
+    with open(input_path, 'r', encoding='utf-8') as src, open(output_path, 'w', encoding='utf-8') as dst:
+        for result in translate_many(src, batch_size=batch_size):
+            if not result.ok and result.source.strip():
+                failures += 1
+            dst.write((result.translation or '') + '\n')
+    return failures
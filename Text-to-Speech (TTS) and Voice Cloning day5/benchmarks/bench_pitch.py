@@ -0,0 +1,77 @@
+"""
+Speed and accuracy benchmark for the pitch tracking backends.
+
+The test signal is synthetic speech-like audio with a known F0 contour: a harmonic tone
+gliding through a vibrato, with noise-only gaps as unvoiced stretches. Each backend reports:
+  - rtf:            processing seconds per second of audio (lower is faster)
+  - median_cents:   median |error| in cents on frames both voiced in truth and detected
+  - gross_error:    share of those frames off by more than 20% (octave/halving errors)
+  - voicing_acc:    frame-level voiced/unvoiced agreement with the ground truth
+Backends whose dependencies are missing (librosa for pyin, crepe) are skipped.
+
+Usage (from the project root):
+  python benchmarks/bench_pitch.py --seconds 30
+  python benchmarks/bench_pitch.py --backends yin crepe --crepe-capacity full
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from pitch import BACKENDS, track_pitch  # noqa: E402
+
+
+def synth_speech(seconds, sr, seed=0):
+    """Harmonic glide with vibrato and noise gaps; returns (audio, f0 per sample, voiced per sample)."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 140 + 60 * np.sin(2 * np.pi * t / 4.0) + 6 * np.sin(2 * np.pi * 5.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    audio = sum(np.sin(k * phase) / k for k in range(1, 6))
+    voiced = (t % 2.0) < 1.6
+    audio = np.where(voiced, 0.3 * audio, 0.0) + 0.01 * rng.standard_normal(len(t))
+    return audio.astype(np.float32), f0, voiced
+
+
+def evaluate(track, f0_true, voiced_true, sr):
+    frames = np.minimum((track.times * sr).astype(int), len(f0_true) - 1)
+    truth, truth_voiced = f0_true[frames], voiced_true[frames]
+    both = truth_voiced & track.voiced & (track.frequency > 0)
+    cents = np.abs(1200 * np.log2(track.frequency[both] / truth[both]))
+    return {
+        "median_cents": float(np.median(cents)) if cents.size else float("nan"),
+        "gross_error": float(np.mean(cents > 1200 * np.log2(1.2))) if cents.size else float("nan"),
+        "voicing_acc": float(np.mean(track.voiced == truth_voiced)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pitch tracker speed/accuracy benchmark")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--backends", nargs="+", default=sorted(BACKENDS), choices=sorted(BACKENDS))
+    parser.add_argument("--crepe-capacity", default="tiny", choices=["tiny", "small", "medium", "large", "full"])
+    args = parser.parse_args()
+
+    audio, f0_true, voiced_true = synth_speech(args.seconds, args.sr)
+    print(f"{'backend':<8} {'rtf':>8} {'median_cents':>13} {'gross_error':>12} {'voicing_acc':>12}")
+    for backend in args.backends:
+        params = {"model_capacity": args.crepe_capacity} if backend == "crepe" else {}
+        try:
+            start = time.perf_counter()
+            track = track_pitch(audio, args.sr, backend=backend, **params)
+            elapsed = time.perf_counter() - start
+        except ImportError as e:
+            print(f"{backend:<8} skipped ({e})")
+            continue
+        scores = evaluate(track, f0_true, voiced_true, args.sr)
+        print(f"{backend:<8} {elapsed / args.seconds:>8.4f} {scores['median_cents']:>13.1f} "
+              f"{scores['gross_error']:>12.3f} {scores['voicing_acc']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
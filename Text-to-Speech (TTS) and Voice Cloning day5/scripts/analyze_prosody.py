@@ -3,13 +3,19 @@ import numpy as np
 import logging
 import os
 
+from pitch import track_pitch
+
+# Prosody analysis and plot_visualizations.py share F0 results through this cache
+PITCH_BACKEND = os.environ.get("PITCH_BACKEND", "yin")
+PITCH_CACHE_DIR = "outputs/.pitch_cache"
+
 os.makedirs("outputs", exist_ok=True)
 logging.basicConfig(filename='outputs/app.log', level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def extract_prosody(audio_path):
     y, sr = librosa.load(audio_path, sr=None)
-    f0, _, _ = librosa.pyin(y, fmin=50, fmax=500)
+    f0 = track_pitch(y, sr, backend=PITCH_BACKEND, cache_dir=PITCH_CACHE_DIR, fmin=50, fmax=500).f0
     energy = np.sum(librosa.feature.rms(y=y))
     tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
     return {
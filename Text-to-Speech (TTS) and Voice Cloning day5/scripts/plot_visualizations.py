@@ -5,17 +5,22 @@ import numpy as np
 import logging
 import os
 
+from pitch import track_pitch
+
+PITCH_BACKEND = os.environ.get("PITCH_BACKEND", "yin")
+PITCH_CACHE_DIR = "outputs/.pitch_cache"
+
 os.makedirs("outputs", exist_ok=True)
 logging.basicConfig(filename='outputs/app.log', level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def plot_pitch(audio_path, output_path):
     y, sr = librosa.load(audio_path, sr=None)
-    f0, _, _ = librosa.pyin(y, fmin=50, fmax=500)
+    pitch = track_pitch(y, sr, backend=PITCH_BACKEND, cache_dir=PITCH_CACHE_DIR, fmin=50, fmax=500)
     plt.figure(figsize=(10, 4))
-    plt.plot(f0, label="Pitch (F0)")
+    plt.plot(pitch.times, pitch.f0, label=f"Pitch (F0, {pitch.backend})")
     plt.title("Pitch Contour")
-    plt.xlabel("Frame")
+    plt.xlabel("Time (s)")
     plt.ylabel("Frequency (Hz)")
     plt.legend()
     plt.tight_layout()
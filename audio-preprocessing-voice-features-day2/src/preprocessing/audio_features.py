@@ -3,41 +3,50 @@ import librosa
 import numpy as np
 import matplotlib.pyplot as plt
 import soundfile as sf
-import noisereduce as nr
-import webrtcvad
-import crepe
+
+try:
+    from .denoise import reduce_noise
+    from .pitch import track_pitch
+    from .vad import VALID_SAMPLE_RATES, detect_speech, voiced_audio
+except ImportError:  # run as a script: python src/preprocessing/audio_features.py
+    from denoise import reduce_noise
+    from pitch import track_pitch
+    from vad import VALID_SAMPLE_RATES, detect_speech, voiced_audio
 
 RAW_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/raw'))
 PROC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/processed'))
 
-def apply_noise_suppression(y, sr):
-    # Noise suppression using noisereduce (Python alternative to RNNoise/SpeexDSP for Windows)
-    return nr.reduce_noise(y=y, sr=sr)
+def apply_noise_suppression(y, sr, noise_seconds=1.0):
+    # Streaming spectral gating (block-wise STFT, constant working memory). The noise
+    # profile is seeded from up to `noise_seconds` of VAD-silent audio when available,
+    # otherwise from the leading frames, and is tracked online afterwards.
+    noise_clip = None
+    if sr in VALID_SAMPLE_RATES:
+        result = detect_speech(y, sr, aggressiveness=3)
+        silent = y[:len(result.frame_mask) * result.frame_length][np.repeat(~result.frame_mask, result.frame_length)]
+        if len(silent) >= sr // 10:
+            noise_clip = silent[:int(noise_seconds * sr)]
+    return reduce_noise(y, sr, noise_clip=noise_clip)
 
-def apply_vad(y, sr, aggressiveness=2):
-    vad = webrtcvad.Vad(aggressiveness)
-    frame_duration = 30  # ms
-    frame_length = int(sr * frame_duration / 1000)
-    voiced = []
-    for i in range(0, len(y), frame_length):
-        frame = y[i:i+frame_length]
-        if len(frame) < frame_length:
-            break
-        is_speech = vad.is_speech((frame * 32768).astype(np.int16).tobytes(), sr)
-        if is_speech:
-            voiced.extend(frame)
-    return np.array(voiced)
+def apply_vad(y, sr, aggressiveness=2, padding_ms=0, min_silence_ms=0):
+    # 30 ms WebRTC VAD frames over a single int16 buffer; optional padding/hangover
+    # keeps word edges and short pauses inside the speech segments
+    result = detect_speech(y, sr, aggressiveness=aggressiveness, padding_ms=padding_ms,
+                           min_silence_ms=min_silence_ms)
+    return voiced_audio(y, result, padded=bool(padding_ms or min_silence_ms))
 
 def extract_mfcc(y, sr):
     return librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
 
+def extract_pitch(y, sr, backend="crepe", **params):
+    # Frame-level F0 on a 10 ms hop; "yin" is a vectorized NumPy tracker that runs
+    # orders of magnitude faster than the CREPE CNN on CPU
+    return track_pitch(y, sr, backend=backend, **params).frequency
+
 def extract_pitch_crepe(y, sr):
-    audio = librosa.util.normalize(y)
-    audio = audio.astype(np.float32)
-    time, frequency, confidence, activation = crepe.predict(audio, sr, viterbi=True)
-    return frequency
+    return extract_pitch(y, sr, backend="crepe", model_capacity="full", viterbi=True)
 
-def plot_waveforms(y_orig, y_proc, sr, fname):
+def plot_waveforms(y_orig, y_proc, sr, fname, out_dir=PROC_DIR):
     plt.figure(figsize=(12, 6))
     plt.subplot(2, 1, 1)
     librosa.display.waveshow(y_orig, sr=sr)
@@ -46,7 +55,7 @@ def plot_waveforms(y_orig, y_proc, sr, fname):
     librosa.display.waveshow(y_proc, sr=sr)
     plt.title("Processed Audio (Denoised + VAD)")
     plt.tight_layout()
-    plt.savefig(os.path.join(PROC_DIR, fname + "_waveforms.png"))
+    plt.savefig(os.path.join(out_dir, fname + "_waveforms.png"))
     plt.close()
 
 def main():
@@ -0,0 +1,183 @@
+"""
+Streaming spectral-gating noise suppression.
+
+Audio is processed block by block with a sqrt-Hann STFT at 50% overlap (which
+reconstructs perfectly under overlap-add), so working memory is bounded by the block
+size rather than the signal length, and live audio can be denoised chunk by chunk.
+The noise profile (mean power per frequency bin) is estimated from the leading frames
+or an explicit noise clip (e.g. VAD-silent audio) and then tracked online from frames
+whose energy stays close to the current estimate.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class StreamingDenoiser:
+    """
+    Stateful denoiser. `process(chunk)` returns exactly `len(chunk)` samples delayed by
+    `latency` samples; `flush()` returns the remaining `latency` samples, so the
+    concatenated output has the same length as the concatenated input.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        n_fft: int = 512,
+        noise_init_ms: int = 250,
+        threshold_db: float = 6.0,
+        min_gain: float = 0.1,
+        noise_update_rate: float = 0.05,
+        noise_update_ratio: float = 2.0,
+        freq_smoothing: int = 3
+    ):
+        if n_fft % 2:
+            raise ValueError("n_fft must be even")
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop = n_fft // 2
+        # One hop of delay comes from overlap-add, one from emitting whole chunks
+        self.latency = n_fft
+        self.window = np.sqrt(np.hanning(n_fft + 1)[:-1]).astype(np.float32)
+        self.threshold = 10 ** (threshold_db / 10)
+        self.min_gain = min_gain
+        self.noise_update_rate = noise_update_rate
+        self.noise_update_ratio = noise_update_ratio
+        self.noise_init_frames = max(1, int(noise_init_ms * sample_rate / 1000) // self.hop)
+        self.freq_smoothing = freq_smoothing
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget stream state and the noise profile."""
+        self._input_tail = np.zeros(self.n_fft - self.hop, dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._ola_tail = np.zeros(self.hop, dtype=np.float32)
+        self._ready = np.zeros(self.hop, dtype=np.float32)
+        self._noise_sum = np.zeros(self.n_fft // 2 + 1, dtype=np.float64)
+        self._noise_frames = 0
+        self._pcm_remainder = b""
+
+    @property
+    def noise_profile(self) -> Optional[np.ndarray]:
+        if self._noise_frames == 0:
+            return None
+        return (self._noise_sum / self._noise_frames).astype(np.float32)
+
+    def _power(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Windowed spectrum and power per frame."""
+        spectrum = np.fft.rfft(frames * self.window, axis=1)
+        return spectrum, spectrum.real ** 2 + spectrum.imag ** 2
+
+    def _frames(self, samples: np.ndarray) -> np.ndarray:
+        """Frames of n_fft at hop spacing over `samples` (a zero-copy strided view)."""
+        if len(samples) < self.n_fft:
+            return np.zeros((0, self.n_fft), dtype=np.float32)
+        return np.lib.stride_tricks.sliding_window_view(samples, self.n_fft)[::self.hop]
+
+    def update_noise(self, noise: np.ndarray) -> None:
+        """Fold known noise-only audio (leading silence, VAD-silent frames) into the profile."""
+        frames = self._frames(np.asarray(noise, dtype=np.float32))
+        if len(frames):
+            _, power = self._power(frames)
+            self._noise_sum += power.sum(axis=0)
+            self._noise_frames += len(frames)
+
+    def _gains(self, power: np.ndarray) -> np.ndarray:
+        # Leading frames seed the profile until noise_init_frames have been seen
+        if self._noise_frames < self.noise_init_frames:
+            take = min(len(power), self.noise_init_frames - self._noise_frames)
+            self._noise_sum += power[:take].sum(axis=0)
+            self._noise_frames += take
+        noise = self._noise_sum / self._noise_frames
+
+        # Online tracking: frames within noise_update_ratio of the profile count as noise
+        quiet = power.mean(axis=1) < self.noise_update_ratio * noise.mean()
+        if quiet.any():
+            rate = self.noise_update_rate
+            updated = noise * (1 - rate) ** quiet.sum() + power[quiet].mean(axis=0) * (1 - (1 - rate) ** quiet.sum())
+            self._noise_sum = updated * self._noise_frames
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain = np.clip(1.0 - self.threshold * noise / power, 0.0, 1.0)
+        gain = np.nan_to_num(gain, nan=0.0)
+        if self.freq_smoothing > 1:
+            # Smoothing across frequency suppresses isolated "musical noise" bins
+            bins = gain.shape[1]
+            padded = np.pad(gain, ((0, 0), (self.freq_smoothing // 2, self.freq_smoothing // 2)), mode="edge")
+            gain = sum(padded[:, i:i + bins] for i in range(self.freq_smoothing)) / self.freq_smoothing
+        return self.min_gain + (1.0 - self.min_gain) * gain
+
+    def process(self, chunk: np.ndarray) -> np.ndarray:
+        """Denoise one chunk of float audio; returns len(chunk) samples (delayed by `latency`)."""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        pending = np.concatenate([self._pending, chunk]) if len(self._pending) else chunk
+        n_hops = len(pending) // self.hop
+        ready = self._ola_tail[:0]
+        if n_hops:
+            block = np.concatenate([self._input_tail, pending[:n_hops * self.hop]])
+            frames = self._frames(block)
+            spectrum, power = self._power(frames)
+            out_frames = np.fft.irfft(spectrum * self._gains(power), self.n_fft, axis=1) * self.window
+            # 50% overlap-add: first halves plus the previous frame's second halves
+            ola = out_frames[:, :self.hop].reshape(-1).copy()
+            ola[:self.hop] += self._ola_tail
+            ola[self.hop:] += out_frames[:-1, self.hop:].reshape(-1)
+            self._ola_tail = out_frames[-1, self.hop:].copy()
+            self._input_tail = block[-(self.n_fft - self.hop):].copy()
+            ready = ola
+        self._pending = pending[n_hops * self.hop:].copy()
+        # Emit from the queue of finished samples so every call returns len(chunk) samples;
+        # the queue never runs dry because it starts one hop ahead of the pending input
+        queue = np.concatenate([self._ready, ready])
+        self._ready = queue[len(chunk):]
+        return queue[:len(chunk)]
+
+    def flush(self) -> np.ndarray:
+        """Push the buffered input through (zero-padded) and return the final `latency` samples."""
+        padding = (-len(self._pending)) % self.hop + self.hop
+        tail = np.concatenate([self.process(np.zeros(padding, dtype=np.float32)), self._ready])
+        self.reset()
+        return tail[:self.latency]
+
+    def process_pcm16(self, data: bytes) -> bytes:
+        """Denoise little-endian 16-bit PCM bytes (odd trailing bytes are carried over)."""
+        data = self._pcm_remainder + data
+        usable = len(data) - len(data) % 2
+        self._pcm_remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        denoised = self.process(samples)
+        return np.clip(np.rint(denoised * 32768.0), -32768, 32767).astype("<i2").tobytes()
+
+
+def reduce_noise(
+    audio: np.ndarray,
+    sample_rate: int,
+    noise_clip: Optional[np.ndarray] = None,
+    block_size: int = 65536,
+    **params
+) -> np.ndarray:
+    """
+    Denoise a whole signal block by block; the output has the same shape as the input.
+    `noise_clip` (e.g. VAD-silent samples) seeds the noise profile instead of the
+    leading frames.
+    """
+    audio = np.asarray(audio)
+    denoiser = StreamingDenoiser(sample_rate, **params)
+    if noise_clip is not None:
+        denoiser.update_noise(noise_clip)
+    output = np.empty(len(audio), dtype=np.float32)
+    # Output sample i belongs to input sample i - latency: skip the lead-in, then copy
+    position = -denoiser.latency
+    for start in range(0, len(audio), block_size):
+        position = _place(output, denoiser.process(audio[start:start + block_size]), position)
+    _place(output, denoiser.flush(), position)
+    return output if not np.issubdtype(audio.dtype, np.floating) else output.astype(audio.dtype, copy=False)
+
+
+def _place(output: np.ndarray, block: np.ndarray, position: int) -> int:
+    """Copy the part of `block` (starting at aligned index `position`) that falls inside `output`."""
+    start = max(position, 0)
+    end = min(position + len(block), len(output))
+    if end > start:
+        output[start:end] = block[start - position:end - position]
+    return position + len(block)
@@ -0,0 +1,220 @@
+"""
+Consolidated, memory-mappable feature store.
+
+Usage (import existing per-file outputs):
+  python src/preprocessing/feature_store.py import data/processed data/processed/features
+
+Reading from a training job:
+  store = FeatureStore("data/processed/features", mode="r")
+  mfcc = store.get("mfcc", "sample1")      # zero-copy (frames, 13) view of mfcc.bin
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+INDEX_FILE = "index.json"
+DTYPES = ("float32", "float16")
+
+# Layout of the per-file outputs written by audio_features.main(): <utt>_<feature>.npy,
+# MFCC as (13, frames) and pitch as (frames,)
+NPY_PATTERN = re.compile(r"^(?P<utt>.+)_(?P<feature>mfcc|pitch)\.npy$")
+NPY_DEFAULTS = {
+    "mfcc": {"transpose": True, "hop_length": 512},  # librosa.feature.mfcc default hop
+    "pitch": {"transpose": False, "hop_length": None},  # CREPE 10 ms step, set from sample rate
+}
+
+
+class FeatureStore:
+    """
+    Consolidated feature store: every utterance's frames for one feature type are appended
+    to a single `<feature>.bin` file (frames x dim, float32 or float16), and `index.json`
+    maps each utterance ID to its (frame offset, frame count) next to the feature's
+    metadata (dtype, dim, sample rate, hop length, feature type). This replaces one tiny
+    .npy file per utterance and feature.
+
+    The store has a single writer (mode="a", the pipeline's main process) and any number
+    of concurrent readers (mode="r"). Data is appended before the index is rewritten
+    atomically, so a reader only ever sees entries whose frames are fully on disk; bytes
+    written after its index snapshot are simply not mapped. `refresh()` picks up new
+    entries. The index is flushed every `flush_every` appends and on close, so a crash
+    loses at most one chunk of index entries; the next append truncates `<feature>.bin`
+    back to the last indexed frame, discarding those frames and any torn partial row.
+    Re-processing an utterance appends a new copy and repoints its index entry.
+    """
+
+    def __init__(self, root, mode="a", flush_every=64):
+        if mode not in ("a", "r"):
+            raise ValueError(f"mode must be 'a' or 'r', got {mode!r}")
+        self.root = root
+        self.mode = mode
+        self.flush_every = flush_every
+        self._index_path = os.path.join(root, INDEX_FILE)
+        self._pending = 0
+        self._maps = {}
+        if mode == "a":
+            os.makedirs(root, exist_ok=True)
+        elif not os.path.exists(self._index_path):
+            raise FileNotFoundError(f"No feature store index at {self._index_path}")
+        self.refresh()
+
+    def refresh(self):
+        """Reload the index (readers call this to see entries appended since opening)."""
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {"features": {}}
+        self._maps = {}
+
+    def _data_path(self, feature):
+        return os.path.join(self.root, f"{feature}.bin")
+
+    def create_feature(self, feature, dim, dtype="float32", sample_rate=None, hop_length=None,
+                       feature_type=None):
+        """Declare a feature's layout and metadata; returns the existing entry if already declared."""
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        meta = self.index["features"].get(feature)
+        if meta is not None:
+            if meta["dim"] != dim or meta["dtype"] != dtype:
+                raise ValueError(
+                    f"{feature} is stored as {meta['dtype']} x {meta['dim']}, got {dtype} x {dim}"
+                )
+            return meta
+        meta = {
+            "dtype": dtype,
+            "dim": int(dim),
+            "frames": 0,
+            "sample_rate": sample_rate,
+            "hop_length": hop_length,
+            "feature_type": feature_type or feature,
+            "entries": {},
+        }
+        self.index["features"][feature] = meta
+        return meta
+
+    def metadata(self, feature):
+        """Feature-level metadata without the per-utterance entries."""
+        meta = self.index["features"][feature]
+        return {key: value for key, value in meta.items() if key != "entries"}
+
+    def append(self, feature, utt_id, frames, dtype="float32", **metadata):
+        """
+        Append a (frames,) or (frames, dim) array for `utt_id` under `feature`. The first
+        append declares the feature (see `create_feature` for `dtype` and metadata).
+        """
+        if self.mode != "a":
+            raise PermissionError("FeatureStore opened read-only")
+        frames = np.asarray(frames)
+        if frames.ndim == 1:
+            frames = frames[:, None]
+        meta = self.index["features"].get(feature)
+        if meta is None:
+            meta = self.create_feature(feature, frames.shape[1], dtype=dtype, **metadata)
+        if frames.shape[1] != meta["dim"]:
+            raise ValueError(f"{feature} expects dim {meta['dim']}, got {frames.shape[1]}")
+        data = np.ascontiguousarray(frames, dtype=meta["dtype"])
+        row_bytes = meta["dim"] * data.itemsize
+        offset = meta["frames"]
+        with open(self._data_path(feature), "ab") as f:
+            # Drop bytes past the last indexed frame (a torn write or frames whose index
+            # entries were never flushed) so the new rows start exactly at `offset`
+            f.truncate(offset * row_bytes)
+            f.write(data.tobytes())
+        meta["entries"][utt_id] = [offset, data.shape[0]]
+        meta["frames"] = offset + data.shape[0]
+        self._maps.pop(feature, None)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def _map(self, feature):
+        """Read-only memmap over the frames covered by the current index snapshot."""
+        meta = self.index["features"][feature]
+        mapped = self._maps.get(feature)
+        if mapped is None or mapped.shape[0] != meta["frames"]:
+            if meta["frames"] == 0:
+                mapped = np.empty((0, meta["dim"]), dtype=meta["dtype"])
+            else:
+                mapped = np.memmap(self._data_path(feature), dtype=meta["dtype"], mode="r",
+                                   shape=(meta["frames"], meta["dim"]))
+            self._maps[feature] = mapped
+        return mapped
+
+    def get(self, feature, utt_id):
+        """One utterance's frames as a zero-copy (frames, dim) view of the memory-mapped file."""
+        offset, count = self.index["features"][feature]["entries"][utt_id]
+        return self._map(feature)[offset:offset + count]
+
+    def keys(self, feature):
+        return list(self.index["features"].get(feature, {}).get("entries", {}))
+
+    def import_npy(self, directory, sample_rate=16000, dtype="float32"):
+        """
+        Import per-file `<utt>_mfcc.npy` / `<utt>_pitch.npy` outputs from `directory`.
+        Returns the number of arrays imported.
+        """
+        imported = 0
+        for name in sorted(os.listdir(directory)):
+            match = NPY_PATTERN.match(name)
+            if not match:
+                continue
+            feature = match.group("feature")
+            defaults = NPY_DEFAULTS[feature]
+            array = np.load(os.path.join(directory, name), mmap_mode="r")
+            if defaults["transpose"]:
+                array = array.T
+            hop_length = defaults["hop_length"] or sample_rate // 100
+            self.append(feature, match.group("utt"), array, dtype=dtype, sample_rate=sample_rate,
+                        hop_length=hop_length)
+            imported += 1
+        return imported
+
+    def flush(self):
+        """Atomically rewrite the index so readers never see a half-written file."""
+        if self.mode != "a":
+            return
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self._index_path)
+        self._pending = 0
+
+    def close(self):
+        self.flush()
+        self._maps = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature store utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Import existing <utt>_mfcc.npy / <utt>_pitch.npy files")
+    imp.add_argument("source_dir")
+    imp.add_argument("store_dir")
+    imp.add_argument("--sr", type=int, default=16000)
+    imp.add_argument("--dtype", default="float32", choices=DTYPES)
+    info = sub.add_parser("info", help="Print feature metadata and utterance counts")
+    info.add_argument("store_dir")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        with FeatureStore(args.store_dir) as store:
+            count = store.import_npy(args.source_dir, sample_rate=args.sr, dtype=args.dtype)
+        print(f"Imported {count} arrays into {args.store_dir}")
+    else:
+        store = FeatureStore(args.store_dir, mode="r")
+        for feature in store.index["features"]:
+            print(f"{feature}: {len(store.keys(feature))} utterances, {store.metadata(feature)}")
+
+
+if __name__ == "__main__":
+    main()
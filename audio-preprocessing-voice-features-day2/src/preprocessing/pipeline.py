@@ -0,0 +1,217 @@
+"""
+Parallel, resumable feature extraction for a directory of audio files.
+
+Each file goes through the selected stages (load -> denoise -> VAD -> MFCC / pitch ->
+processed wav / plot) in a worker process. A manifest of input hashes lets unchanged
+files be skipped on the next run, features are appended to a consolidated FeatureStore
+instead of per-file .npy files, and per-stage timings are reported at the end.
+
+Usage:
+  python src/preprocessing/pipeline.py --workers 8
+  python src/preprocessing/pipeline.py --skip plot pitch --input-dir /data/corpus
+  python src/preprocessing/pipeline.py --force          # ignore the manifest
+"""
+import os
+
+# One process per core: keep BLAS/TensorFlow from oversubscribing the machine. This must
+# run before numpy is first imported, since BLAS sizes its thread pool at load time and
+# forked workers inherit the parent's pools.
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+             "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from feature_store import DTYPES, NPY_DEFAULTS, FeatureStore
+from pitch import BACKENDS
+
+RAW_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/raw'))
+PROC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/processed'))
+
+STAGES = ["denoise", "vad", "mfcc", "pitch", "audio", "plot"]
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def config_key(stages, sr, aggressiveness, pitch_backend):
+    """Files are re-processed when the stage selection or parameters change."""
+    # ids=path: utterances are keyed by their path relative to the input dir (extension
+    # included); runs from before that stored them under the bare stem
+    return f"{','.join(sorted(stages))}|sr={sr}|vad={aggressiveness}|pitch={pitch_backend}|ids=path"
+
+
+def normalize_extensions(extensions):
+    """'wav', '.WAV' and '.wav' all select .wav files."""
+    return {ext.lower() if ext.startswith(".") else "." + ext.lower() for ext in extensions}
+
+
+def utterance_id(path, input_dir):
+    """Manifest and feature-store key: the path relative to the input dir, with its extension,
+    so a.wav and a.flac never overwrite each other."""
+    return os.path.relpath(path, input_dir).replace(os.sep, "/")
+
+
+def input_fingerprint(path, previous):
+    """(size, mtime, sha256); the hash is reused when size and mtime are unchanged."""
+    stat = os.stat(path)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime:
+        return stat.st_size, stat.st_mtime, previous["sha256"]
+    return stat.st_size, stat.st_mtime, file_sha256(path)
+
+
+def process_file(path, out_dir, stages, sr, aggressiveness, pitch_backend, utt_id=None):
+    """Run the selected stages on one file; returns features and per-stage seconds."""
+    import librosa
+    import soundfile as sf
+    from audio_features import apply_noise_suppression, apply_vad, extract_mfcc, extract_pitch, plot_waveforms
+
+    name = utt_id or os.path.basename(path)
+    # Per-file outputs (processed wav, plot) are named after the id, flattened to one file name
+    stem = name.replace("/", "__")
+    timings = {}
+
+    def timed(stage, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    y = timed("load", lambda: librosa.load(path, sr=sr)[0])
+    y_proc = y
+    if "denoise" in stages:
+        y_proc = timed("denoise", apply_noise_suppression, y_proc, sr)
+    if "vad" in stages:
+        y_proc = timed("vad", apply_vad, y_proc, sr, aggressiveness)
+
+    features = {}
+    if len(y_proc) == 0:
+        return {"name": name, "features": features, "timings": timings, "duration": len(y) / sr,
+                "warning": "no speech detected"}
+    if "mfcc" in stages:
+        # Stored frames-major (frames x 13) so each utterance is one contiguous block
+        features["mfcc"] = timed("mfcc", extract_mfcc, y_proc, sr).T
+    if "pitch" in stages:
+        features["pitch"] = timed("pitch", extract_pitch, y_proc, sr, backend=pitch_backend)
+    if "audio" in stages:
+        timed("audio", sf.write, os.path.join(out_dir, f"{stem}_processed.wav"), y_proc, sr)
+    if "plot" in stages:
+        timed("plot", plot_waveforms, y, y_proc, sr, stem, out_dir)
+    return {"name": name, "features": features, "timings": timings, "duration": len(y) / sr}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, resumable audio feature extraction")
+    parser.add_argument("--input-dir", default=RAW_DIR)
+    parser.add_argument("--output-dir", default=PROC_DIR)
+    parser.add_argument("--extensions", nargs="+", default=[".wav"],
+                        help="Input file extensions (e.g. .wav flac)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--skip", nargs="*", default=[], choices=STAGES, help="Stages to skip")
+    parser.add_argument("--sr", type=int, default=16000)
+    parser.add_argument("--vad-aggressiveness", type=int, default=2, choices=[0, 1, 2, 3])
+    parser.add_argument("--pitch-backend", default="yin", choices=sorted(BACKENDS),
+                        help="yin (fast NumPy), pyin or crepe")
+    parser.add_argument("--dtype", default="float32", choices=DTYPES, help="Feature store precision")
+    parser.add_argument("--force", action="store_true", help="Re-process files even if unchanged")
+    args = parser.parse_args()
+
+    stages = [stage for stage in STAGES if stage not in args.skip]
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = load_manifest(args.output_dir)
+    key = config_key(stages, args.sr, args.vad_aggressiveness, args.pitch_backend)
+
+    extensions = normalize_extensions(args.extensions)
+    files = sorted(
+        os.path.join(args.input_dir, f) for f in os.listdir(args.input_dir)
+        if os.path.splitext(f)[1].lower() in extensions
+    )
+    todo = {}
+    for path in files:
+        previous = manifest.get(utterance_id(path, args.input_dir))
+        size, mtime, sha = input_fingerprint(path, previous)
+        if not args.force and previous and previous["sha256"] == sha and previous.get("config") == key:
+            continue
+        todo[path] = {"size": size, "mtime": mtime, "sha256": sha, "config": key}
+    print(f"{len(files)} files, {len(files) - len(todo)} unchanged, {len(todo)} to process "
+          f"with {args.workers} workers (stages: {', '.join(stages)})")
+    if not todo:
+        return
+
+    totals = defaultdict(float)
+    audio_seconds = 0.0
+    start = time.perf_counter()
+    store = FeatureStore(os.path.join(args.output_dir, "features"))
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = {
+                pool.submit(process_file, path, args.output_dir, stages, args.sr, args.vad_aggressiveness,
+                            args.pitch_backend, utterance_id(path, args.input_dir)): path
+                for path in todo
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                filename = utterance_id(path, args.input_dir)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[{done}/{len(todo)}] {filename} failed: {e}")
+                    continue
+                for feature, frames in result["features"].items():
+                    hop_length = NPY_DEFAULTS[feature]["hop_length"] or args.sr // 100
+                    store.append(feature, result["name"], frames, dtype=args.dtype,
+                                 sample_rate=args.sr, hop_length=hop_length)
+                for stage, seconds in result["timings"].items():
+                    totals[stage] += seconds
+                audio_seconds += result["duration"]
+                manifest[filename] = dict(todo[path], timings=result["timings"], processed_at=time.time())
+                if "warning" in result:
+                    print(f"[{done}/{len(todo)}] {filename}: {result['warning']}")
+                if done % 50 == 0:
+                    store.flush()
+                    save_manifest(args.output_dir, manifest)
+    finally:
+        store.close()
+        save_manifest(args.output_dir, manifest)
+
+    wall = time.perf_counter() - start
+    print(f"\nProcessed {audio_seconds / 60:.1f} min of audio in {wall:.1f}s wall time")
+    print(f"{'stage':<10} {'total s':>9} {'share':>7}")
+    cpu_total = sum(totals.values()) or 1.0
+    for stage in ["load"] + stages:
+        if stage in totals:
+            print(f"{stage:<10} {totals[stage]:>9.2f} {totals[stage] / cpu_total:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Pluggable pitch (F0) tracking with a shared on-disk cache.
+
+Backends:
+  yin    vectorized YIN in NumPy (batched FFT passes); fast, no extra dependencies
+  pyin   librosa.pyin (probabilistic YIN with HMM voicing); accurate but slow
+  crepe  CREPE CNN ("tiny" ... "full" capacity), frames batched through the model
+
+Every backend returns a PitchTrack on the same 10 ms hop by default, so results can be
+swapped or compared frame by frame. `track_pitch(..., cache_dir=...)` keys results by a
+hash of the audio samples plus the backend parameters, so separate scripts analysing the
+same file (prosody analysis and pitch plotting) share one F0 computation.
+"""
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Optional, Type
+
+import numpy as np
+
+
+@dataclass
+class PitchTrack:
+    """Frame-level pitch estimates; `frequency` holds the raw estimate for every frame."""
+    frequency: np.ndarray
+    voiced: np.ndarray
+    confidence: np.ndarray
+    sample_rate: int
+    hop_length: int
+    backend: str
+
+    @property
+    def f0(self) -> np.ndarray:
+        """Frequency with unvoiced frames set to NaN (the librosa.pyin convention)."""
+        return np.where(self.voiced, self.frequency, np.nan)
+
+    @property
+    def times(self) -> np.ndarray:
+        return np.arange(len(self.frequency)) * self.hop_length / self.sample_rate
+
+    def to_npz(self, path: str) -> None:
+        np.savez(path, frequency=self.frequency, voiced=self.voiced, confidence=self.confidence,
+                 meta=np.array(json.dumps({"sample_rate": self.sample_rate, "hop_length": self.hop_length,
+                                           "backend": self.backend})))
+
+    @classmethod
+    def from_npz(cls, path: str) -> "PitchTrack":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(data["frequency"], data["voiced"], data["confidence"], **meta)
+
+
+class PitchTracker(ABC):
+    """Base class: subclasses implement `track(y, sr)` for one backend."""
+    name = "base"
+
+    def __init__(self, fmin: float = 50.0, fmax: float = 500.0, hop_length: Optional[int] = None):
+        self.fmin = fmin
+        self.fmax = fmax
+        self.hop_length = hop_length
+
+    def _hop(self, sr: int) -> int:
+        return self.hop_length or sr // 100
+
+    def params(self) -> dict:
+        """Everything that changes the output; part of the cache key."""
+        return {"backend": self.name, "fmin": self.fmin, "fmax": self.fmax, "hop_length": self.hop_length}
+
+    @abstractmethod
+    def track(self, y: np.ndarray, sr: int) -> PitchTrack:
+        """Pitch track of a mono signal `y` sampled at `sr` Hz."""
+
+
+class YinTracker(PitchTracker):
+    """
+    YIN (de Cheveigné & Kawahara, 2002), vectorized over frames: the difference function
+    comes from a batched real FFT cross-correlation, followed by the cumulative mean
+    normalised difference, the first trough under `threshold` and parabolic refinement.
+    Frames are processed `batch_frames` at a time, so memory stays bounded on long files.
+    """
+    name = "yin"
+
+    def __init__(self, fmin: float = 50.0, fmax: float = 500.0, hop_length: Optional[int] = None,
+                 threshold: float = 0.15, frame_length: Optional[int] = None, batch_frames: int = 2048):
+        super().__init__(fmin, fmax, hop_length)
+        self.threshold = threshold
+        self.frame_length = frame_length
+        self.batch_frames = batch_frames
+
+    def params(self) -> dict:
+        return dict(super().params(), threshold=self.threshold, frame_length=self.frame_length)
+
+    def track(self, y: np.ndarray, sr: int) -> PitchTrack:
+        hop = self._hop(sr)
+        min_lag = max(1, int(np.floor(sr / self.fmax)))
+        max_lag = int(np.ceil(sr / self.fmin))
+        # Window must hold the longest period twice: max_lag lags over a max_lag-long integration window
+        frame_length = self.frame_length or int(2 ** np.ceil(np.log2(2 * max_lag + 2)))
+        if frame_length <= max_lag + 1:
+            raise ValueError(f"frame_length {frame_length} too short for fmin={self.fmin} Hz at {sr} Hz")
+        window = frame_length - max_lag
+
+        y = np.asarray(y, dtype=np.float64)
+        padded = np.pad(y, frame_length // 2)
+        n_frames = 1 + len(y) // hop
+        padded = np.pad(padded, (0, max(0, (n_frames - 1) * hop + frame_length - len(padded))))
+        frames = np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop][:n_frames]
+
+        # The framed view is free; the FFT work arrays are built one batch at a time
+        results = [self._track_frames(frames[start:start + self.batch_frames], sr, min_lag, max_lag, window)
+                   for start in range(0, n_frames, self.batch_frames)]
+        frequency, voiced, confidence = (np.concatenate(part) for part in zip(*results))
+        return PitchTrack(frequency, voiced, confidence, sr, hop, self.name)
+
+    def _track_frames(self, frames: np.ndarray, sr: int, min_lag: int, max_lag: int, window: int):
+        """(frequency, voiced, confidence) for a batch of frames."""
+        n_frames, frame_length = frames.shape
+        # d(tau) = E[0:W] + E[tau:tau+W] - 2 * sum_j x[j] x[j+tau]
+        n_fft = int(2 ** np.ceil(np.log2(frame_length + window)))
+        spec = np.fft.rfft(frames, n_fft, axis=1)
+        spec_head = np.fft.rfft(frames[:, :window], n_fft, axis=1)
+        corr = np.fft.irfft(spec * np.conj(spec_head), n_fft, axis=1)[:, :max_lag + 1]
+        energy = np.cumsum(np.pad(frames ** 2, ((0, 0), (1, 0))), axis=1)
+        lagged_energy = energy[:, window:window + max_lag + 1] - energy[:, :max_lag + 1]
+        diff = np.maximum(energy[:, window:window + 1] + lagged_energy - 2 * corr, 0.0)
+
+        # Cumulative mean normalised difference d'(tau) = d(tau) * tau / sum_{k<=tau} d(k)
+        lags = np.arange(1, max_lag + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cmnd = diff[:, 1:] * lags / np.cumsum(diff[:, 1:], axis=1)
+        cmnd = np.nan_to_num(cmnd, nan=1.0, posinf=1.0)
+        cmnd = np.concatenate([np.ones((n_frames, 1)), cmnd], axis=1)
+
+        search = cmnd[:, min_lag:max_lag + 1]
+        trough = np.zeros_like(search, dtype=bool)
+        trough[:, 1:-1] = (search[:, 1:-1] < search[:, :-2]) & (search[:, 1:-1] <= search[:, 2:])
+        candidates = trough & (search < self.threshold)
+        voiced = candidates.any(axis=1)
+        best = np.where(voiced, candidates.argmax(axis=1), search.argmin(axis=1))
+
+        # Parabolic interpolation around the chosen lag
+        rows = np.arange(n_frames)
+        idx = np.clip(best, 1, search.shape[1] - 2)
+        left, centre, right = search[rows, idx - 1], search[rows, idx], search[rows, idx + 1]
+        denom = left - 2 * centre + right
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shift = np.where(np.abs(denom) > 1e-12, 0.5 * (left - right) / denom, 0.0)
+        shift = np.where(best == idx, np.clip(shift, -1, 1), 0.0)
+        period = min_lag + best + shift
+
+        confidence = np.clip(1.0 - search[rows, best], 0.0, 1.0)
+        return sr / period, voiced, confidence
+
+
+class PyinTracker(PitchTracker):
+    """librosa.pyin; kept as the accuracy reference."""
+    name = "pyin"
+
+    def __init__(self, fmin: float = 50.0, fmax: float = 500.0, hop_length: Optional[int] = None,
+                 frame_length: int = 2048):
+        super().__init__(fmin, fmax, hop_length)
+        self.frame_length = frame_length
+
+    def params(self) -> dict:
+        return dict(super().params(), frame_length=self.frame_length)
+
+    def track(self, y: np.ndarray, sr: int) -> PitchTrack:
+        import librosa
+
+        hop = self._hop(sr)
+        f0, voiced, prob = librosa.pyin(np.asarray(y, dtype=np.float32), fmin=self.fmin, fmax=self.fmax,
+                                        sr=sr, frame_length=self.frame_length, hop_length=hop)
+        # pyin reports NaN for unvoiced frames; keep a finite frequency like the other backends
+        frequency = np.nan_to_num(f0, nan=0.0)
+        return PitchTrack(frequency, voiced, prob, sr, hop, self.name)
+
+
+class CrepeTracker(PitchTracker):
+    """CREPE; frames are pushed through the CNN `batch_size` at a time."""
+    name = "crepe"
+
+    def __init__(self, fmin: float = 50.0, fmax: float = 500.0, hop_length: Optional[int] = None,
+                 model_capacity: str = "tiny", viterbi: bool = True, batch_size: int = 512,
+                 voicing_threshold: float = 0.5):
+        super().__init__(fmin, fmax, hop_length)
+        self.model_capacity = model_capacity
+        self.viterbi = viterbi
+        self.batch_size = batch_size
+        self.voicing_threshold = voicing_threshold
+
+    def params(self) -> dict:
+        return dict(super().params(), model_capacity=self.model_capacity, viterbi=self.viterbi,
+                    voicing_threshold=self.voicing_threshold)
+
+    def track(self, y: np.ndarray, sr: int) -> PitchTrack:
+        import crepe  # TensorFlow import is slow; only pay it when this backend is used
+
+        hop = self._hop(sr)
+        audio = np.asarray(y, dtype=np.float32)
+        peak = np.max(np.abs(audio)) if audio.size else 0.0
+        if peak > 0:
+            audio = audio / peak
+        _, frequency, confidence, _ = crepe.predict(
+            audio, sr, model_capacity=self.model_capacity, viterbi=self.viterbi,
+            step_size=1000 * hop / sr, batch_size=self.batch_size, verbose=0
+        )
+        voiced = (confidence >= self.voicing_threshold) & (frequency >= self.fmin) & (frequency <= self.fmax)
+        return PitchTrack(frequency, voiced, confidence, sr, hop, self.name)
+
+
+BACKENDS: Dict[str, Type[PitchTracker]] = {
+    YinTracker.name: YinTracker,
+    PyinTracker.name: PyinTracker,
+    CrepeTracker.name: CrepeTracker,
+}
+
+
+def get_tracker(backend: str = "yin", **params) -> PitchTracker:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown pitch backend {backend!r}; choose from {sorted(BACKENDS)}")
+    return BACKENDS[backend](**params)
+
+
+def cache_key(y: np.ndarray, sr: int, tracker: PitchTracker) -> str:
+    digest = hashlib.sha256(np.ascontiguousarray(y, dtype=np.float32).tobytes())
+    digest.update(json.dumps(dict(tracker.params(), sample_rate=sr), sort_keys=True).encode())
+    return digest.hexdigest()[:32]
+
+
+def track_pitch(
+    y: np.ndarray,
+    sr: int,
+    backend: str = "yin",
+    cache_dir: Optional[str] = None,
+    **params
+) -> PitchTrack:
+    """Run one backend, reusing a cached result for identical audio and parameters."""
+    tracker = get_tracker(backend, **params)
+    if cache_dir is None:
+        return tracker.track(y, sr)
+    path = os.path.join(cache_dir, f"{cache_key(y, sr, tracker)}.npz")
+    if os.path.exists(path):
+        return PitchTrack.from_npz(path)
+    result = tracker.track(y, sr)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write under a temporary name so a concurrent reader never loads a partial file
+    tmp_path = f"{path[:-4]}.{os.getpid()}.tmp.npz"
+    result.to_npz(tmp_path)
+    os.replace(tmp_path, path)
+    return result
@@ -0,0 +1,134 @@
+"""
+WebRTC voice activity detection over whole signals.
+
+The signal is converted to 16-bit PCM once and the VAD is fed zero-copy `memoryview`
+slices of that buffer, one per 10/20/30 ms frame. The result is a boolean frame mask
+plus speech segments (with optional padding and merging of short pauses), and the
+voiced audio is gathered with a single boolean index instead of per-frame list growth.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import webrtcvad
+
+VALID_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+VALID_FRAME_MS = (10, 20, 30)
+
+
+@dataclass
+class VadResult:
+    """Per-frame speech decisions and the merged speech segments (in samples)."""
+    frame_mask: np.ndarray
+    segments: List[Tuple[int, int]]
+    frame_length: int
+    sample_rate: int
+    num_samples: int
+
+    def sample_mask(self) -> np.ndarray:
+        """Boolean mask over samples that lie inside a speech segment."""
+        mask = np.zeros(self.num_samples, dtype=bool)
+        for start, end in self.segments:
+            mask[start:end] = True
+        return mask
+
+    def segment_times(self) -> List[Tuple[float, float]]:
+        return [(start / self.sample_rate, end / self.sample_rate) for start, end in self.segments]
+
+
+def to_int16(audio: Union[np.ndarray, bytes]) -> np.ndarray:
+    """
+    Convert float audio in [-1, 1] (or raw little-endian PCM bytes) to contiguous int16.
+    Samples are rounded and saturated; the old `(frame * 32768).astype(np.int16)` truncated
+    toward zero (up to 1 LSB off) and wrapped +1.0 to -32768.
+    """
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return np.frombuffer(audio, dtype="<i2")
+    audio = np.asarray(audio)
+    if audio.dtype == np.int16:
+        return np.ascontiguousarray(audio)
+    return np.clip(np.rint(audio * 32768.0), -32768, 32767).astype(np.int16)
+
+
+def frame_mask(
+    pcm: np.ndarray,
+    sample_rate: int,
+    aggressiveness: int = 2,
+    frame_ms: int = 30,
+    vad: Optional[webrtcvad.Vad] = None
+) -> np.ndarray:
+    """
+    Run the VAD on every full frame of an int16 signal (a trailing partial frame is
+    ignored, as WebRTC only accepts exact frame sizes). Returns one bool per frame.
+    """
+    if sample_rate not in VALID_SAMPLE_RATES:
+        raise ValueError(f"WebRTC VAD supports sample rates {VALID_SAMPLE_RATES}, got {sample_rate}")
+    if frame_ms not in VALID_FRAME_MS:
+        raise ValueError(f"WebRTC VAD supports frame durations {VALID_FRAME_MS} ms, got {frame_ms}")
+    vad = vad or webrtcvad.Vad(aggressiveness)
+    frame_length = sample_rate * frame_ms // 1000
+    frame_bytes = frame_length * 2
+    n_frames = len(pcm) // frame_length
+    buffer = memoryview(np.ascontiguousarray(pcm, dtype=np.int16)).cast("B")
+    mask = np.zeros(n_frames, dtype=bool)
+    for i in range(n_frames):
+        mask[i] = vad.is_speech(buffer[i * frame_bytes:(i + 1) * frame_bytes], sample_rate)
+    return mask
+
+
+def merge_segments(
+    mask: np.ndarray,
+    frame_length: int,
+    num_samples: int,
+    padding_frames: int = 0,
+    min_gap_frames: int = 0
+) -> List[Tuple[int, int]]:
+    """
+    Turn a frame mask into [start, end) sample ranges. Every speech run is extended by
+    `padding_frames` on both sides, and runs that then overlap or are separated by fewer
+    than `min_gap_frames` silent frames (hangover) are merged.
+    """
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    segments: List[Tuple[int, int]] = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        start = max(0, start - padding_frames)
+        end = end + padding_frames
+        if segments and start - segments[-1][1] < max(min_gap_frames, 1):
+            segments[-1] = (segments[-1][0], max(segments[-1][1], end))
+        else:
+            segments.append((start, end))
+    return [(start * frame_length, min(end * frame_length, num_samples)) for start, end in segments]
+
+
+def detect_speech(
+    audio: Union[np.ndarray, bytes],
+    sample_rate: int,
+    aggressiveness: int = 2,
+    frame_ms: int = 30,
+    padding_ms: int = 0,
+    min_silence_ms: int = 0,
+    vad: Optional[webrtcvad.Vad] = None
+) -> VadResult:
+    """Frame mask and merged speech segments for a whole signal."""
+    pcm = to_int16(audio)
+    mask = frame_mask(pcm, sample_rate, aggressiveness, frame_ms, vad)
+    frame_length = sample_rate * frame_ms // 1000
+    segments = merge_segments(
+        mask, frame_length, len(pcm),
+        padding_frames=-(-padding_ms // frame_ms),
+        min_gap_frames=-(-min_silence_ms // frame_ms)
+    )
+    return VadResult(mask, segments, frame_length, sample_rate, len(pcm))
+
+
+def voiced_audio(audio: np.ndarray, result: VadResult, padded: bool = False) -> np.ndarray:
+    """
+    Gather the speech samples with one boolean index: the raw speech frames by default,
+    or the padded/merged segments when `padded` is True.
+    """
+    if padded:
+        return audio[result.sample_mask()]
+    usable = len(result.frame_mask) * result.frame_length
+    return audio[:usable][np.repeat(result.frame_mask, result.frame_length)]
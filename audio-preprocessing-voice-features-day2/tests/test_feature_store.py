@@ -0,0 +1,86 @@
+"""
+Feature store tests: append/get, float16, .npy import, torn writes and concurrent readers.
+"""
+import numpy as np
+import pytest
+
+from feature_store import FeatureStore
+
+
+class TestFeatureStore:
+    """Test suite for the consolidated memory-mapped feature store."""
+
+    def test_append_and_get(self, tmp_path):
+        """Test frames round-trip per utterance and re-appending repoints the entry."""
+        with FeatureStore(str(tmp_path)) as store:
+            store.append("mfcc", "a", np.full((3, 13), 1.0), sample_rate=16000, hop_length=512)
+            store.append("mfcc", "b", np.full((5, 13), 2.0))
+            store.append("pitch", "a", np.arange(4.0))
+            store.append("mfcc", "a", np.full((2, 13), 3.0))
+            with pytest.raises(ValueError):
+                store.append("mfcc", "c", np.zeros((2, 12)))
+        reader = FeatureStore(str(tmp_path), mode="r")
+        assert reader.get("mfcc", "a").shape == (2, 13) and np.all(reader.get("mfcc", "a") == 3.0)
+        assert np.all(reader.get("mfcc", "b") == 2.0)
+        assert reader.get("pitch", "a")[:, 0].tolist() == [0.0, 1.0, 2.0, 3.0]
+        assert sorted(reader.keys("mfcc")) == ["a", "b"]
+        assert reader.metadata("mfcc")["hop_length"] == 512 and reader.metadata("mfcc")["frames"] == 10
+        with pytest.raises(PermissionError):
+            reader.append("mfcc", "d", np.zeros((1, 13)))
+
+    def test_float16(self, tmp_path):
+        """Test float16 features are stored at half size and rejected as float32 later."""
+        values = np.linspace(-1, 1, 40, dtype=np.float32).reshape(4, 10)
+        with FeatureStore(str(tmp_path)) as store:
+            store.append("mfcc", "a", values, dtype="float16")
+            with pytest.raises(ValueError):
+                store.create_feature("mfcc", 10, dtype="float32")
+        reader = FeatureStore(str(tmp_path), mode="r")
+        frames = reader.get("mfcc", "a")
+        assert frames.dtype == np.float16
+        assert np.allclose(frames, values, atol=1e-3)
+        assert (tmp_path / "mfcc.bin").stat().st_size == values.size * 2
+
+    def test_import_npy(self, tmp_path):
+        """Test per-file <utt>_mfcc.npy / <utt>_pitch.npy outputs are imported frame-major."""
+        source = tmp_path / "processed"
+        source.mkdir()
+        mfcc = np.arange(13 * 6, dtype=np.float32).reshape(13, 6)
+        np.save(source / "s1_mfcc.npy", mfcc)
+        np.save(source / "s1_pitch.npy", np.array([100.0, 110.0, 0.0]))
+        np.save(source / "notes.npy", np.zeros(3))
+        with FeatureStore(str(tmp_path / "store")) as store:
+            assert store.import_npy(str(source), sample_rate=16000) == 2
+        reader = FeatureStore(str(tmp_path / "store"), mode="r")
+        assert np.array_equal(reader.get("mfcc", "s1"), mfcc.T)
+        assert reader.get("pitch", "s1")[:, 0].tolist() == [100.0, 110.0, 0.0]
+        assert reader.metadata("pitch")["hop_length"] == 160
+
+    def test_torn_write_is_discarded(self, tmp_path):
+        """Test stray bytes after the last indexed frame do not shift later entries."""
+        with FeatureStore(str(tmp_path)) as store:
+            store.append("mfcc", "a", np.full((3, 13), 1.0))
+        with open(tmp_path / "mfcc.bin", "ab") as f:
+            f.write(b"\x01" * 10)
+        with FeatureStore(str(tmp_path)) as store:
+            store.append("mfcc", "b", np.full((2, 13), 7.0))
+        reader = FeatureStore(str(tmp_path), mode="r")
+        assert np.all(reader.get("mfcc", "a") == 1.0) and np.all(reader.get("mfcc", "b") == 7.0)
+        assert (tmp_path / "mfcc.bin").stat().st_size == 5 * 13 * 4
+
+    def test_reader_while_writer_appends(self, tmp_path):
+        """Test a reader sees only flushed entries, keeps valid views and picks up new ones on refresh."""
+        writer = FeatureStore(str(tmp_path), flush_every=2)
+        writer.append("mfcc", "u0", np.full((4, 13), 0.0))
+        writer.append("mfcc", "u1", np.full((4, 13), 1.0))
+        reader = FeatureStore(str(tmp_path), mode="r")
+        view = reader.get("mfcc", "u1")
+        writer.append("mfcc", "u2", np.full((4, 13), 2.0))
+        reader.refresh()
+        assert reader.keys("mfcc") == ["u0", "u1"]
+        writer.append("mfcc", "u3", np.full((4, 13), 3.0))
+        assert np.all(view == 1.0)
+        reader.refresh()
+        assert reader.keys("mfcc") == ["u0", "u1", "u2", "u3"]
+        assert np.all(reader.get("mfcc", "u3") == 3.0)
+        writer.close()
@@ -0,0 +1,68 @@
+"""
+Pipeline tests: utterance ids, extension handling and manifest-based skipping.
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import pipeline
+from feature_store import FeatureStore
+
+
+class TestPipeline:
+    """Test suite for the resumable pipeline driver (with a stubbed process_file)."""
+
+    def _run(self, monkeypatch, input_dir, output_dir, *extra):
+        calls = []
+
+        def fake_process_file(path, out_dir, stages, sr, aggressiveness, pitch_backend, utt_id=None):
+            calls.append(utt_id)
+            with open(path, "rb") as f:
+                value = float(len(f.read()))
+            return {"name": utt_id, "features": {"mfcc": np.full((2, 13), value)},
+                    "timings": {"load": 0.0}, "duration": 1.0}
+
+        monkeypatch.setattr(pipeline, "process_file", fake_process_file)
+        monkeypatch.setattr(pipeline, "ProcessPoolExecutor", ThreadPoolExecutor)
+        monkeypatch.setattr(sys, "argv", ["pipeline.py", "--input-dir", str(input_dir), "--output-dir",
+                                          str(output_dir), "--workers", "2", *extra])
+        pipeline.main()
+        return sorted(calls)
+
+    def test_same_stem_different_extensions(self, tmp_path, monkeypatch):
+        """Test a.wav and a.flac get separate manifest and store entries; bare extensions work."""
+        raw, out = tmp_path / "raw", tmp_path / "out"
+        raw.mkdir()
+        (raw / "a.wav").write_bytes(b"1" * 10)
+        (raw / "a.flac").write_bytes(b"2" * 20)
+        (raw / "notes.txt").write_bytes(b"skip")
+        assert self._run(monkeypatch, raw, out, "--extensions", "wav", ".FLAC") == ["a.flac", "a.wav"]
+
+        assert sorted(pipeline.load_manifest(str(out))) == ["a.flac", "a.wav"]
+        store = FeatureStore(str(out / "features"), mode="r")
+        assert np.all(store.get("mfcc", "a.wav") == 10.0)
+        assert np.all(store.get("mfcc", "a.flac") == 20.0)
+
+    def test_manifest_skips_unchanged_files(self, tmp_path, monkeypatch):
+        """Test unchanged files are skipped, edited ones re-run and a new config re-runs all."""
+        raw, out = tmp_path / "raw", tmp_path / "out"
+        raw.mkdir()
+        (raw / "a.wav").write_bytes(b"1" * 10)
+        (raw / "b.wav").write_bytes(b"2" * 10)
+        assert self._run(monkeypatch, raw, out) == ["a.wav", "b.wav"]
+        assert self._run(monkeypatch, raw, out) == []
+
+        (raw / "b.wav").write_bytes(b"3" * 30)
+        assert self._run(monkeypatch, raw, out) == ["b.wav"]
+        assert self._run(monkeypatch, raw, out, "--sr", "8000") == ["a.wav", "b.wav"]
+        assert self._run(monkeypatch, raw, out, "--sr", "8000", "--force") == ["a.wav", "b.wav"]
+        assert np.all(FeatureStore(str(out / "features"), mode="r").get("mfcc", "b.wav") == 30.0)
+
+    def test_config_key(self):
+        """Test the config key ignores stage order but tracks parameters."""
+        key = pipeline.config_key(["mfcc", "vad"], 16000, 2, "yin")
+        assert key == pipeline.config_key(["vad", "mfcc"], 16000, 2, "yin")
+        assert key != pipeline.config_key(["vad", "mfcc"], 16000, 3, "yin")
+        assert key != pipeline.config_key(["vad", "mfcc"], 16000, 2, "crepe")
+        assert key != pipeline.config_key(["vad"], 16000, 2, "yin")
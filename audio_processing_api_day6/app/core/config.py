@@ -25,15 +25,43 @@ class Settings(BaseSettings):
 
     ASR_MODEL_NAME: str = "base"
     ASR_DEVICE: str = "cpu"
+    ASR_REPLICAS: int = 1
+    ASR_LONGFORM_THRESHOLD_SECONDS: float = 120.0
+    ASR_CHUNK_SECONDS: float = 30.0
     TTS_MODEL_NAME: str = "tts_models/multilingual/multi-dataset/your_tts"
     TRANSLATION_MODEL: str = "Helsinki-NLP/opus-mt-en-fr"
 
     MAX_UPLOAD_SIZE_MB: int = 50
     ALLOWED_AUDIO_FORMATS: List[str] = ["wav", "mp3", "ogg", "flac", "m4a"]
     PROCESSING_TIMEOUT: int = 300
+    UPLOAD_SPOOL_THRESHOLD_MB: int = 4
+    ASR_WINDOW_SECONDS: float = 30.0
+    JOB_STORE_PATH: str = "reports/jobs.db"
+    JOB_DATA_DIR: str = "reports/jobs"
+    JOB_WORKERS: int = 2
+    JOB_MAX_RUNNING_PER_USER: int = 0  # 0 = no cap; claiming still favours users with fewer running jobs
+    JOB_RESULT_TTL_SECONDS: int = 86400
+    JOB_LEASE_SECONDS: int = 60
+    JOB_MAX_UPLOAD_SIZE_MB: int = 500
+
+    SIMILARITY_WORKERS: int = 4
+    SIMILARITY_MAX_BATCH_PARTIALS: int = 256
+    SPEAKER_INDEX_DIR: str = "speaker_index"
+    SPEAKER_INDEX_ANN_MIN_SIZE: int = 50000
+    SPEAKER_DEDUP_THRESHOLD: float = 0.9
+    TRANSLATION_MEMORY_ENABLED: bool = True
+    TRANSLATION_MEMORY_PATH: str = "reports/translation_memory.db"
+    TM_FUZZY_MODE: str = "hint"  # serve | hint | off
+    TM_FUZZY_THRESHOLD: float = 0.9
+    TM_BATCH_SIZE: int = 16  # sentences per generate() call for translation-memory misses
+    LANGID_MODEL_PATH: str = "models/langid_ngrams.npz"
+    LANGID_FASTTEXT_MODEL: str = ""
+    LANGUAGE_CONTEXT_MIN_CONFIDENCE: float = 0.7
+    REALTIME_DENOISE: bool = False
 
     LOG_LEVEL: str = "INFO"
     REPORTS_DIR: str = "reports"
+    EVENT_STORE_PATH: str = "reports/events.db"
     ENABLE_METRICS: bool = True
 
     ALLOWED_ORIGINS: List[str] = [
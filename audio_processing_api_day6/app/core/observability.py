@@ -17,6 +17,10 @@ REQUEST_LATENCY = Histogram(
     'http_request_latency_seconds', 'HTTP request latency (seconds)',
     ['endpoint']
 )
+TRANSLATION_MEMORY_LOOKUPS = Counter(
+    'translation_memory_lookups_total', 'Translation memory segment lookups by result',
+    ['result']
+)
 
 async def prometheus_middleware(request: Request, call_next):
     start_time = time.time()
@@ -32,8 +32,11 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Audio Processing API...")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
+    api_v1_endpoints.job_workers.start()
+    logger.info(f"Job workers: {settings.JOB_WORKERS}")
     yield
     logger.info("Shutting down Audio Processing API...")
+    api_v1_endpoints.job_workers.stop()
 
 # Create FastAPI application
 app = FastAPI(
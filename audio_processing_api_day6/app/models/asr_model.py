@@ -2,14 +2,22 @@
 ASRModel for production-grade speech-to-text using OpenAI Whisper.
 Accepts np.ndarray (audio array) for robust API integration.
 """
-from typing import Optional, Dict, Any
+import os
+import threading
+from typing import Optional, Dict, Any, Callable, Iterable, Tuple
 import numpy as np
 
+from app.core.config import get_settings
+from app.services.longform_asr import LongFormTranscriber, ReplicaPool, WhisperReplica
+from app.utils.lang_detect import LanguageContext
+
 try:
     import whisper
 except ImportError:
     whisper = None
 
+settings = get_settings()
+
 class ASRModel:
     def __init__(self, model_name: str = "base"):
         if whisper is None:
@@ -17,6 +25,24 @@ class ASRModel:
         self.model_name = model_name
         self._model = whisper.load_model(model_name)
         self.supported_languages = ["en", "fr", "de", "es", "hi", "auto"]
+        self._longform: Optional[LongFormTranscriber] = None
+        self._longform_lock = threading.Lock()
+
+    def _longform_transcriber(self) -> LongFormTranscriber:
+        """
+        Replica pool built on first use (streamed uploads, jobs, long arrays): the loaded
+        model plus ASR_REPLICAS - 1 copies. Locked so concurrent job workers build one pool.
+        """
+        with self._longform_lock:
+            if self._longform is None:
+                replicas = max(1, settings.ASR_REPLICAS)
+                if replicas > 1:
+                    import torch
+                    # Split the cores between replicas instead of every replica using all of them
+                    torch.set_num_threads(max(1, (os.cpu_count() or 1) // replicas))
+                models = [self._model] + [whisper.load_model(self.model_name) for _ in range(replicas - 1)]
+                self._longform = LongFormTranscriber(ReplicaPool([WhisperReplica(m) for m in models]))
+            return self._longform
 
     async def transcribe(
         self,
@@ -24,10 +50,26 @@ class ASRModel:
         language: Optional[str] = None,
         **kwargs
     ) -> Dict[str, Any]:
+        if (isinstance(audio_array, np.ndarray)
+                and len(audio_array) > settings.ASR_LONGFORM_THRESHOLD_SECONDS * 16000):
+            # Long recordings: VAD chunks transcribed concurrently across the replica pool
+            response = await self._longform_transcriber().transcribe(audio_array, 16000, language)
+            response["model_info"] = {
+                "model_name": self.model_name,
+                "device": str(self._model.device),
+                "replicas": len(self._longform.pool)
+            }
+            return response
+        requested = language if language and language != "auto" else None
+        probability = 1.0
+        if requested is None and isinstance(audio_array, np.ndarray):
+            # Detect once up front: transcribe() would run the same detection but
+            # discard the probability, which downstream routing relies on.
+            requested, probability = self._detect_language(audio_array)
         # Whisper expects np.ndarray for in-memory audio
         result = self._model.transcribe(
             audio_array,
-            language=language if language and language != "auto" else None,
+            language=requested,
             word_timestamps=True,
             **kwargs
         )
@@ -35,7 +77,7 @@ class ASRModel:
         response = {
             "text": result.get("text", ""),
             "language": result.get("language", language or "auto"),
-            "language_probability": result.get("language_probability", 1.0),
+            "language_probability": result.get("language_probability", probability),
             "duration": result.get("duration", 0),
             "segments": result.get("segments", []),
             "words": [],
@@ -48,4 +90,39 @@ class ASRModel:
             for seg in result["segments"]:
                 if "words" in seg:
                     response["words"].extend(seg["words"])
+        response["language_context"] = LanguageContext.from_asr(response, language).to_dict()
+        return response
+
+    async def transcribe_windows(
+        self,
+        windows: Iterable[Tuple[float, np.ndarray]],
+        language: Optional[str] = None,
+        sample_rate: int = 16000,
+        on_window: Optional[Callable[[float, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe streamed (offset_seconds, samples) windows with bounded memory. The
+        windows are re-cut at VAD silences into chunks of at most ASR_CHUNK_SECONDS (speech
+        longer than a chunk is hard-split with a 1 s overlap) and the chunks are transcribed
+        concurrently on the ASR_REPLICAS replica pool while decoding continues, then
+        stitched with global timestamps. The language is detected on the first chunk.
+        `on_window(seconds_done, partial)` is called as chunks finish, in order, with the
+        transcript so far; an exception raised there stops the transcription.
+        """
+        transcriber = self._longform_transcriber()
+        response = await transcriber.transcribe_stream(windows, sample_rate, language, on_chunk=on_window)
+        response["model_info"] = {
+            "model_name": self.model_name,
+            "device": str(self._model.device),
+            "replicas": len(transcriber.pool)
+        }
         return response
+
+    def _detect_language(self, audio_array: np.ndarray) -> Tuple[str, float]:
+        """Whisper's language posterior on the first 30 seconds: (language, probability)."""
+        audio = whisper.pad_or_trim(audio_array.astype(np.float32))
+        n_mels = getattr(self._model.dims, "n_mels", 80)
+        mel = whisper.log_mel_spectrogram(audio, n_mels=n_mels).to(self._model.device)
+        _, probs = self._model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
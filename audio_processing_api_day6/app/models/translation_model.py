@@ -1,15 +1,28 @@
 """
 Neural machine translation using Hugging Face Transformers.
-Supports multiple language pairs with confidence scoring.
+Supports multiple language pairs with confidence scoring, with a sentence-level
+translation memory consulted before the model.
 """
 import asyncio
 from typing import Dict, Any, Optional, List
 from transformers import MarianMTModel, MarianTokenizer
-from langdetect import detect
 from app.core.config import get_settings
+from app.services.translation_memory import TranslationMemory, split_sentences
+from app.utils.fast_langid import get_language_identifier
+from app.utils.lang_detect import LanguageContext, resolve_language
 
 settings = get_settings()
 
+# MarianMT checkpoint per (source, target) language pair
+MARIAN_MODELS = {
+    ("en", "fr"): "Helsinki-NLP/opus-mt-en-fr",
+    ("en", "es"): "Helsinki-NLP/opus-mt-en-es",
+    ("en", "de"): "Helsinki-NLP/opus-mt-en-de",
+    ("fr", "en"): "Helsinki-NLP/opus-mt-fr-en",
+    ("es", "en"): "Helsinki-NLP/opus-mt-es-en",
+    ("de", "en"): "Helsinki-NLP/opus-mt-de-en"
+}
+
 class TranslationModel:
     """Advanced translation model with multi-language support."""
 
@@ -17,14 +30,9 @@ class TranslationModel:
         self.models = {}
         self.tokenizers = {}
         # Use tuple keys for language pairs for clarity and robustness
-        self.language_pairs = {
-            ("en", "fr"): "Helsinki-NLP/opus-mt-en-fr",
-            ("en", "es"): "Helsinki-NLP/opus-mt-en-es",
-            ("en", "de"): "Helsinki-NLP/opus-mt-en-de",
-            ("fr", "en"): "Helsinki-NLP/opus-mt-fr-en",
-            ("es", "en"): "Helsinki-NLP/opus-mt-es-en",
-            ("de", "en"): "Helsinki-NLP/opus-mt-de-en"
-        }
+        self.language_pairs = dict(MARIAN_MODELS)
+        self.memory = TranslationMemory() if settings.TRANSLATION_MEMORY_ENABLED else None
+        self.fuzzy_mode = settings.TM_FUZZY_MODE
 
     def _load_model(self, model_name: str):
         """Load translation model and tokenizer."""
@@ -41,7 +49,7 @@ class TranslationModel:
     def detect_language(self, text: str) -> str:
         """Detect the language of input text."""
         try:
-            return detect(text)
+            return get_language_identifier().detect(text).language
         except Exception:
             return "en"  # Default to English
 
@@ -49,7 +57,8 @@ class TranslationModel:
         self,
         text: str,
         target_language: str,
-        source_language: Optional[str] = None
+        source_language: Optional[str] = None,
+        language_context: Optional[LanguageContext] = None
     ) -> Dict[str, Any]:
         """
         Translate text between languages with confidence scoring.
@@ -58,13 +67,14 @@ class TranslationModel:
             text: Text to translate
             target_language: Target language code
             source_language: Source language code (auto-detected if not provided)
+            language_context: Language known upstream (e.g. Whisper's posterior); when
+                reliable, the text is not re-detected
 
         Returns:
             Translation results with metadata
         """
-        # Default to English if not provided
         if not source_language:
-            source_language = "en"
+            source_language = resolve_language(text, language_context).language
 
         lang_pair = (source_language, target_language)
         if lang_pair not in self.language_pairs:
@@ -73,24 +83,90 @@ class TranslationModel:
         model_name = self.language_pairs[lang_pair]
 
         try:
-            model, tokenizer = self._load_model(model_name)
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self._perform_translation,
-                text, model, tokenizer
-            )
+            if self.memory is not None:
+                result = await loop.run_in_executor(
+                    None,
+                    self._translate_with_memory,
+                    text, source_language, target_language, model_name
+                )
+            else:
+                model, tokenizer = self._load_model(model_name)
+                result = await loop.run_in_executor(
+                    None,
+                    self._perform_translation,
+                    text, model, tokenizer
+                )
             return {
                 "translated_text": result["translation"],
                 "source_language": source_language,
                 "target_language": target_language,
                 "confidence_score": result.get("confidence", 0.0),
                 "model_used": model_name,
-                "original_text": text
+                "original_text": text,
+                "translation_memory": result.get("translation_memory")
             }
         except Exception as e:
             raise RuntimeError(f"Translation failed: {str(e)}")
 
+    def _translate_with_memory(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        model_name: str
+    ) -> Dict[str, Any]:
+        """
+        Translate sentence by sentence: exact TM hits (and fuzzy hits in "serve" mode) are
+        reused, fuzzy hits in "hint" mode are reported alongside the fresh translation,
+        and only the remaining sentences are batched through the model and stored.
+        """
+        pieces = split_sentences(text)
+        if not pieces:
+            return {"translation": "", "confidence": 0.0}
+        sentences = [sentence for sentence, _ in pieces]
+        matches = self.memory.lookup_many(
+            sentences, source_language, target_language, fuzzy=self.fuzzy_mode in ("serve", "hint"),
+            serve_fuzzy=self.fuzzy_mode == "serve"
+        )
+
+        outputs: List[Optional[str]] = [None] * len(sentences)
+        confidences: List[Optional[float]] = [None] * len(sentences)
+        misses, hints = [], []
+        exact_hits = fuzzy_hits = 0
+        for i, match in enumerate(matches):
+            if match is not None and (match.exact or self.fuzzy_mode == "serve"):
+                outputs[i], confidences[i] = match.target_text, match.confidence
+                exact_hits += match.exact
+                fuzzy_hits += not match.exact
+                continue
+            if match is not None:
+                hints.append({"segment": i, **match.to_dict()})
+            misses.append(i)
+
+        if misses:
+            model, tokenizer = self._load_model(model_name)
+            translated = self._perform_batch_translation([sentences[i] for i in misses], model, tokenizer)
+            for i, item in zip(misses, translated):
+                outputs[i], confidences[i] = item["translation"], item["confidence"]
+            self.memory.add_many(
+                [(sentences[i], outputs[i], confidences[i]) for i in misses],
+                source_language, target_language, model=model_name
+            )
+
+        known = [c for c in confidences if c is not None]
+        return {
+            "translation": "".join(output + separator for output, (_, separator) in zip(outputs, pieces)),
+            "confidence": sum(known) / len(known) if known else 0.0,
+            "translation_memory": {
+                "segments": len(sentences),
+                "exact_hits": exact_hits,
+                "fuzzy_hits": fuzzy_hits,
+                "translated": len(misses),
+                "hints": hints
+            }
+        }
+
     def _perform_translation(self, text: str, model, tokenizer) -> Dict[str, Any]:
         """Perform the actual translation."""
         inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
@@ -111,6 +187,35 @@ class TranslationModel:
             "confidence": confidence
         }
 
+    def _perform_batch_translation(self, texts: List[str], model, tokenizer) -> List[Dict[str, Any]]:
+        """
+        Translate sentences in padded generate() calls of at most TM_BATCH_SIZE, grouped by
+        length so little padding is wasted; memory stays bounded however long the document.
+        Results are returned in input order.
+        """
+        batch_size = max(1, settings.TM_BATCH_SIZE)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = tokenizer([texts[i] for i in batch], return_tensors="pt", padding=True,
+                               truncation=True, max_length=512)
+            translated = model.generate(
+                **inputs,
+                max_length=512,
+                num_beams=4,
+                early_stopping=True,
+                return_dict_in_generate=True,
+                output_scores=True
+            )
+            scores = getattr(translated, "sequences_scores", None)
+            for j, (i, sequence) in enumerate(zip(batch, translated.sequences)):
+                results[i] = {
+                    "translation": tokenizer.decode(sequence, skip_special_tokens=True),
+                    "confidence": float(scores[j]) if scores is not None else 0.0
+                }
+        return results
+
     async def get_supported_languages(self) -> List[str]:
         """Get list of supported language codes."""
         languages = set()
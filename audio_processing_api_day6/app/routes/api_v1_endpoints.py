@@ -1,15 +1,24 @@
 from app.schemas.output_schemas import TTSSpeakResponse
+import os
+import shutil
 import time
+import uuid
 from datetime import datetime
-from io import BytesIO
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-import librosa
+import numpy as np
 from fastapi import (
     APIRouter, UploadFile, File, Form, HTTPException,
-    Depends, BackgroundTasks, status
+    Depends, BackgroundTasks, Query, Request, status
 )
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import soundfile as sf
+    HAS_SOUNDFILE = True
+except ImportError:
+    HAS_SOUNDFILE = False
 
 # --- Internal imports ---
 from app.models.asr_model import ASRModel
@@ -17,9 +26,15 @@ from app.models.translation_model import TranslationModel
 from app.models.tts_model import TTSModel
 from app.schemas.input_schemas import *
 from app.schemas.output_schemas import *
+from app.services.event_store import EventStore
+from app.services.job_store import JobStore
+from app.services.job_worker import JobContext, JobWorkerPool
 from app.services.pdf_logger import PDFLogger
+from app.services.similarity_check import SimilarityCheckService
+from app.services.speaker_index import SpeakerIndex
 from app.utils.audio_processing import AudioProcessor
 from app.utils.cache import CacheManager
+from app.utils.lang_detect import LanguageContext
 from app.core.security import get_current_user, require_role, SecurityService
 from app.core.config import get_settings
 
@@ -56,6 +71,9 @@ tts_model = TTSModel()
 pdf_logger = PDFLogger()
 audio_processor = AudioProcessor()
 cache_manager = CacheManager()
+event_store = EventStore()
+similarity_service = SimilarityCheckService()
+speaker_index = SpeakerIndex()
 
 # --- Transcription ---
 @router.post("/transcribe", response_model=TranscriptionResponse, tags=["Audio Processing"])
@@ -67,18 +85,23 @@ async def transcribe_audio(
 ):
     start_time = time.time()
     try:
-        audio_data = await audio.read()
-        audio_processor.validate_audio_file(audio_data, audio.filename)
-        cache_key = cache_manager.generate_audio_hash(audio_data)
-        cached = await cache_manager.get_transcription(cache_key)
-        if cached:
-            cached["processing_time"] = time.time() - start_time
-            cached["cache_hit"] = True
-            return TranscriptionResponse(**cached)
-        enhanced = await audio_processor.enhance_audio(audio_data)
-        audio_io = BytesIO(enhanced)
-        audio_array, sr = librosa.load(audio_io, sr=16000, mono=True)
-        result = await asr_model.transcribe(audio_array, language=request_data.language)
+        # Size limit enforced while reading; the sha256 cache key is computed on the fly
+        with await audio_processor.read_upload(audio) as spooled:
+            cache_key = spooled.sha256
+            cached = await cache_manager.get_transcription(cache_key)
+            if cached:
+                cached["processing_time"] = time.time() - start_time
+                cached["cache_hit"] = True
+                background_tasks.add_task(
+                    event_store.record_event, "transcription", user_id=current_user.get("sub"),
+                    source_language=cached.get("language"), model=asr_model.model_name, cache_hit=True,
+                    processing_time=cached["processing_time"], audio_duration=cached.get("duration"),
+                    filename=audio.filename
+                )
+                return TranscriptionResponse(**cached)
+            # Decode, resample and denoise block by block; ASR sees one window at a time
+            windows = audio_processor.stream_windows(spooled)
+            result = await asr_model.transcribe_windows(windows, language=request_data.language)
         result.update({
             "processing_time": time.time() - start_time,
             "cache_hit": False,
@@ -86,8 +109,21 @@ async def transcribe_audio(
         })
         background_tasks.add_task(cache_manager.cache_transcription, cache_key, result)
         background_tasks.add_task(pdf_logger.log_transcription, audio.filename, result, current_user.get("sub"))
+        background_tasks.add_task(
+            event_store.record_event, "transcription", user_id=current_user.get("sub"),
+            source_language=result.get("language"), model=asr_model.model_name,
+            processing_time=result["processing_time"], audio_duration=result.get("duration"),
+            filename=audio.filename
+        )
         return TranscriptionResponse(**result)
+    except HTTPException:
+        raise
     except Exception as e:
+        await run_in_threadpool(
+            event_store.record_event, "transcription", user_id=current_user.get("sub"), status="error",
+            model=asr_model.model_name, processing_time=time.time() - start_time,
+            filename=audio.filename, extra={"error": str(e)}
+        )
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
 # --- Translation ---
@@ -110,6 +146,11 @@ async def translate_text(
         if cached:
             cached["processing_time"] = time.time() - start_time
             cached["cache_hit"] = True
+            background_tasks.add_task(
+                event_store.record_event, "translation", user_id=current_user.get("sub"),
+                source_language=source, target_language=target, model=cached.get("model_used"),
+                cache_hit=True, processing_time=cached["processing_time"]
+            )
             return TranslationResponse(**cached)
         result = await translation_model.translate(
             text=request.text,
@@ -121,10 +162,20 @@ async def translate_text(
             "cache_hit": False
         })
         background_tasks.add_task(cache_manager.cache_translation, cache_key, result)
+        background_tasks.add_task(
+            event_store.record_event, "translation", user_id=current_user.get("sub"),
+            source_language=source, target_language=target, model=result.get("model_used"),
+            processing_time=result["processing_time"]
+        )
         return TranslationResponse(**result)
     except HTTPException:
         raise
     except Exception as e:
+        await run_in_threadpool(
+            event_store.record_event, "translation", user_id=current_user.get("sub"), status="error",
+            source_language=request.source_language, target_language=request.target_language,
+            processing_time=time.time() - start_time, extra={"error": str(e)}
+        )
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
 
 # --- Speech Synthesis (TTS Only) ---
@@ -147,10 +198,340 @@ async def speak(
         background_tasks.add_task(
             pdf_logger.log_tts_speak, text, result, current_user.get("sub")
         )
+        background_tasks.add_task(
+            event_store.record_event, "tts", user_id=current_user.get("sub"),
+            target_language=target_lang, model=result.get("model_used"),
+            processing_time=result["processing_time"], audio_duration=result.get("duration")
+        )
         return TTSSpeakResponse(**result)
     except Exception as e:
+        await run_in_threadpool(
+            event_store.record_event, "tts", user_id=current_user.get("sub"), status="error",
+            target_language=target_lang, model=tts_model.model_name,
+            processing_time=time.time() - start_time, extra={"error": str(e)}
+        )
         raise HTTPException(status_code=500, detail=f"Speech synthesis failed: {str(e)}")
 
+# --- Batch Speaker Similarity ---
+async def _read_validated(upload: UploadFile) -> bytes:
+    with await audio_processor.read_upload(upload) as spooled:
+        return spooled.read_bytes()
+
+@router.post("/similarity/batch", response_model=BatchSimilarityResponse, tags=["Voice Processing"])
+async def batch_similarity(
+    references: List[UploadFile] = File(..., description="Reference speaker recordings"),
+    candidates: List[UploadFile] = File(..., description="Audios to score against every reference"),
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    start_time = time.time()
+    try:
+        ref_data = [await _read_validated(upload) for upload in references]
+        cand_data = [await _read_validated(upload) for upload in candidates]
+        scored = await similarity_service.similarity_matrix(ref_data, cand_data)
+        results = []
+        for j, upload in enumerate(candidates):
+            column = [row[j] for row in scored["matrix"]]
+            valid = [(score, i) for i, score in enumerate(column) if score is not None]
+            results.append(SimilarityScore(
+                index=j,
+                filename=upload.filename,
+                similarities=column,
+                best_reference=max(valid)[1] if valid else None,
+                success=bool(valid),
+                error=scored["candidate_errors"].get(j)
+            ))
+        processing_time = time.time() - start_time
+        background_tasks.add_task(
+            event_store.record_event, "similarity_batch", user_id=current_user.get("sub"),
+            model="resemblyzer", processing_time=processing_time,
+            extra={"references": len(references), "candidates": len(candidates)}
+        )
+        return BatchSimilarityResponse(
+            references=[u.filename for u in references],
+            results=results,
+            reference_errors=scored["reference_errors"],
+            processing_time=processing_time
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch similarity failed: {str(e)}")
+
+# --- Speaker Index ---
+async def _embed_upload(upload: UploadFile):
+    data = await _read_validated(upload)
+    embedding = (await similarity_service.embed_batch([data]))[0]
+    if not isinstance(embedding, np.ndarray):
+        raise HTTPException(status_code=400, detail=f"Could not extract speaker embedding: {embedding}")
+    return embedding
+
+@router.post("/speakers/enroll", response_model=SpeakerEnrollResponse, tags=["Voice Processing"])
+async def enroll_speaker(
+    speaker_id: str = Form(..., description="Unique speaker identifier"),
+    audio: UploadFile = File(..., description="Reference recording of the speaker"),
+    allow_duplicates: bool = Form(False, description="Enroll even if a near-identical voice exists"),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    start_time = time.time()
+    try:
+        embedding = await _embed_upload(audio)
+        duplicate = None
+        if speaker_id not in speaker_index:
+            nearest = speaker_index.search(embedding, top_k=1)
+            if nearest and nearest[0]["similarity"] >= settings.SPEAKER_DEDUP_THRESHOLD:
+                duplicate = SpeakerMatch(**nearest[0])
+        added = duplicate is None or allow_duplicates
+        if added:
+            speaker_index.add(speaker_id, embedding, metadata={
+                "filename": audio.filename,
+                "enrolled_by": current_user.get("sub"),
+                "enrolled_at": datetime.utcnow().isoformat()
+            })
+        return SpeakerEnrollResponse(
+            speaker_id=speaker_id,
+            added=added,
+            duplicate_of=duplicate,
+            index_size=len(speaker_index),
+            processing_time=time.time() - start_time
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Speaker enrollment failed: {str(e)}")
+
+@router.post("/speakers/identify", response_model=SpeakerIdentifyResponse, tags=["Voice Processing"])
+async def identify_speaker(
+    audio: UploadFile = File(..., description="Recording of the unknown speaker"),
+    top_k: int = Form(5, ge=1, le=100),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    start_time = time.time()
+    try:
+        embedding = await _embed_upload(audio)
+        search_start = time.perf_counter()
+        matches = speaker_index.search(embedding, top_k=top_k)
+        search_time_ms = (time.perf_counter() - search_start) * 1000
+        return SpeakerIdentifyResponse(
+            matches=[SpeakerMatch(**m) for m in matches],
+            index_size=len(speaker_index),
+            search_time_ms=search_time_ms,
+            processing_time=time.time() - start_time
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Speaker identification failed: {str(e)}")
+
+@router.get("/speakers", tags=["Voice Processing"])
+async def list_speakers(current_user: Dict[str, Any] = Depends(get_current_user)):
+    return {"count": len(speaker_index), "speaker_ids": speaker_index.speaker_ids}
+
+@router.delete("/speakers/{speaker_id}", tags=["Voice Processing"])
+async def delete_speaker(speaker_id: str, current_user: Dict[str, Any] = Depends(require_role("admin"))):
+    if not speaker_index.remove(speaker_id):
+        raise HTTPException(status_code=404, detail=f"Unknown speaker: {speaker_id}")
+    return {"deleted": speaker_id, "count": len(speaker_index)}
+
+# --- Asynchronous Jobs ---
+# Handlers run in the job workers' own event loops. Whisper calls go through the ASR
+# replica pool, so concurrent jobs (and /transcribe) share ASR_REPLICAS replicas chunk
+# by chunk instead of queueing whole files.
+def _audio_seconds(path: str) -> Optional[float]:
+    """Duration from the file header, for progress; None when soundfile can't read it."""
+    if not HAS_SOUNDFILE:
+        return None
+    try:
+        return sf.info(path).duration
+    except Exception:
+        return None
+
+async def _transcribe_file(job, ctx: JobContext, share: float, partial_key: Optional[str] = None) -> Dict[str, Any]:
+    """Windowed ASR of a job's input, reporting progress (scaled to `share`) and the transcript so far."""
+    total = _audio_seconds(job.input_path)
+
+    def on_window(done: float, partial: Dict[str, Any]):
+        ctx.report(share * min(done / total, 1.0) if total else 0.0, {partial_key: partial} if partial_key else partial)
+
+    with open(job.input_path, "rb") as audio_file:
+        windows = audio_processor.stream_windows(audio_file, denoise=job.params.get("denoise", True))
+        return await asr_model.transcribe_windows(windows, language=job.params.get("language"), on_window=on_window)
+
+async def _transcribe_job(job, ctx: JobContext) -> Dict[str, Any]:
+    start_time = time.time()
+    result = await _transcribe_file(job, ctx, 1.0)
+    result.update({"processing_time": time.time() - start_time, "cache_hit": False, "user_id": job.user_id})
+    event_store.record_event(
+        "transcription", user_id=job.user_id, source_language=result.get("language"), model=asr_model.model_name,
+        processing_time=result["processing_time"], audio_duration=result.get("duration"),
+        filename=job.params.get("filename"), extra={"job_id": job.id}
+    )
+    return result
+
+async def _pipeline_job(job, ctx: JobContext) -> Dict[str, Any]:
+    start_time = time.time()
+    synthesize = job.params.get("synthesize", False)
+    target = job.params["target_language"]
+    asr_share = 0.8 if synthesize else 0.9
+    transcription = await _transcribe_file(job, ctx, asr_share, "transcription")
+    stages = ["transcription"]
+    partial = {"transcription": transcription}
+    ctx.report(asr_share, partial)
+    translation = await translation_model.translate(
+        transcription["text"], target_language=target, source_language=transcription.get("language"),
+        language_context=LanguageContext.from_asr(transcription)
+    )
+    stages.append("translation")
+    partial["translation"] = translation
+    result = {"transcription": transcription, "translation": translation}
+    if synthesize:
+        ctx.report(0.9, partial)
+        result["speech"] = await tts_model.synthesize(text=translation["translated_text"], language=target)
+        stages.append("synthesis")
+    result.update({"stages_completed": stages, "total_processing_time": time.time() - start_time})
+    event_store.record_event(
+        "pipeline", user_id=job.user_id, source_language=transcription.get("language"), target_language=target,
+        model=asr_model.model_name, processing_time=result["total_processing_time"],
+        audio_duration=transcription.get("duration"), filename=job.params.get("filename"), extra={"job_id": job.id}
+    )
+    return result
+
+job_store = JobStore()
+job_workers = JobWorkerPool(job_store, {"transcribe": _transcribe_job, "pipeline": _pipeline_job})
+
+def _save_spooled(spooled, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    spooled.file.seek(0)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(spooled.file, out)
+
+async def _submit_job(
+    kind: str, audio: UploadFile, params: Dict[str, Any], request: Request, current_user: Dict[str, Any]
+) -> JobStatusResponse:
+    """Store the upload under JOB_DATA_DIR and enqueue it; the caller gets the job id immediately."""
+    job_id = uuid.uuid4().hex
+    with await audio_processor.read_upload(audio, settings.JOB_MAX_UPLOAD_SIZE_MB * 1024 * 1024) as spooled:
+        extension = audio.filename.lower().rsplit(".", 1)[-1]
+        path = os.path.join(settings.JOB_DATA_DIR, f"{job_id}.{extension}")
+        await run_in_threadpool(_save_spooled, spooled, path)
+    params = dict(params, filename=audio.filename)
+    job = await run_in_threadpool(job_store.create, kind, current_user.get("sub"), params, path, job_id)
+    job_workers.notify()
+    return JobStatusResponse(**job.to_status(), status_url=str(request.url_for("get_job", job_id=job.id)))
+
+async def _owned_job(job_id: str, current_user: Dict[str, Any]):
+    """The job if it exists, has not expired and belongs to the caller (admins see all)."""
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None or (job.user_id != current_user.get("sub") and current_user.get("role") != "admin"):
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+@router.post("/jobs/transcribe", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED, tags=["Jobs"])
+async def submit_transcription_job(
+    request: Request,
+    audio: UploadFile = File(...),
+    request_data: TranscriptionRequest = Depends(),
+    denoise: bool = Form(True),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    try:
+        params = {"language": request_data.language, "denoise": denoise}
+        return await _submit_job("transcribe", audio, params, request, current_user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job submission failed: {str(e)}")
+
+@router.post("/jobs/pipeline", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED, tags=["Jobs"])
+async def submit_pipeline_job(
+    request: Request,
+    audio: UploadFile = File(...),
+    target_language: str = Form(..., description="Translation target language code"),
+    source_language: Optional[str] = Form(None, description="Source language hint"),
+    synthesize: bool = Form(False, description="Also synthesize the translation"),
+    denoise: bool = Form(True),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    try:
+        params = {"language": source_language, "target_language": target_language,
+                  "synthesize": synthesize, "denoise": denoise}
+        return await _submit_job("pipeline", audio, params, request, current_user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job submission failed: {str(e)}")
+
+@router.get("/jobs", tags=["Jobs"])
+async def list_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    jobs = await run_in_threadpool(job_store.list_jobs, current_user.get("sub"), limit)
+    return {"count": len(jobs), "jobs": [job.to_status() for job in jobs]}
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
+async def get_job(job_id: str, current_user: Dict[str, Any] = Depends(get_current_user)):
+    job = await _owned_job(job_id, current_user)
+    return JobStatusResponse(**job.to_status())
+
+@router.get("/jobs/{job_id}/partial", tags=["Jobs"])
+async def get_job_partial(job_id: str, current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Results produced so far (e.g. transcript of the windows already decoded)."""
+    job = await _owned_job(job_id, current_user)
+    return {"job_id": job.id, "status": job.status, "progress": job.progress, "partial": job.partial}
+
+@router.get("/jobs/{job_id}/result", tags=["Jobs"])
+async def get_job_result(job_id: str, current_user: Dict[str, Any] = Depends(get_current_user)):
+    job = await _owned_job(job_id, current_user)
+    if job.status != "succeeded":
+        detail = f"Job {job.status}" + (f": {job.error}" if job.error else "")
+        raise HTTPException(status_code=409, detail=detail)
+    return {"job_id": job.id, "kind": job.kind, "expires_at": job.expires_at, "result": job.result}
+
+@router.delete("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
+async def cancel_job(job_id: str, current_user: Dict[str, Any] = Depends(get_current_user)):
+    job = await _owned_job(job_id, current_user)
+    if not await run_in_threadpool(job_store.cancel, job.id):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return JobStatusResponse(**(await run_in_threadpool(job_store.get, job.id)).to_status())
+
+# --- Admin: Usage Statistics ---
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value else None
+
+@router.get("/admin/stats", response_model=UsageStatsResponse, tags=["Admin"])
+async def usage_stats(
+    start: Optional[datetime] = Query(None, description="Range start (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Range end (ISO 8601)"),
+    user_id: Optional[str] = Query(None, description="Restrict to a single user"),
+    current_user: Dict[str, Any] = Depends(require_role("admin"))
+):
+    stats = await run_in_threadpool(event_store.aggregate_stats, _to_epoch(start), _to_epoch(end), user_id)
+    return UsageStatsResponse(**stats)
+
+@router.get("/admin/events", tags=["Admin"])
+async def list_events(
+    start: Optional[datetime] = Query(None, description="Range start (ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Range end (ISO 8601)"),
+    user_id: Optional[str] = Query(None, description="Restrict to a single user"),
+    event_type: Optional[str] = Query(None, description="transcription, translation, tts, ..."),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: Dict[str, Any] = Depends(require_role("admin"))
+):
+    events = await run_in_threadpool(
+        event_store.query_events, _to_epoch(start), _to_epoch(end), user_id, event_type, limit, offset
+    )
+    return {"count": len(events), "events": events}
+
+@router.get("/admin/translation-memory", tags=["Admin"])
+async def translation_memory_stats(current_user: Dict[str, Any] = Depends(require_role("admin"))):
+    if translation_model.memory is None:
+        raise HTTPException(status_code=404, detail="Translation memory is disabled")
+    stats = await run_in_threadpool(translation_model.memory.stats)
+    stats["fuzzy_mode"] = translation_model.fuzzy_mode
+    return stats
+
 # --- Language Info ---
 @router.get("/supported-languages", tags=["Information"])
 async def get_supported_languages():
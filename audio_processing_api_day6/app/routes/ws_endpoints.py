@@ -9,17 +9,21 @@ import time
 from typing import Dict, Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.core.config import get_settings
 from app.models.asr_model import ASRModel
 from app.utils.audio_processing import AudioProcessor
+from app.utils.denoise import StreamingDenoiser
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 class ConnectionManager:
     """Manages WebSocket connections and real-time processing."""
 
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.denoisers: Dict[str, StreamingDenoiser] = {}
         self.asr_model = ASRModel()
         self.audio_processor = AudioProcessor()
 
@@ -34,6 +38,14 @@ class ConnectionManager:
         if client_id in self.active_connections:
             del self.active_connections[client_id]
             logger.info(f"Client {client_id} disconnected")
+        self.denoisers.pop(client_id, None)
+
+    def set_denoise(self, client_id: str, enabled: bool):
+        """Enable or disable per-connection streaming noise suppression (16 kHz PCM16 input)."""
+        if enabled:
+            self.denoisers.setdefault(client_id, StreamingDenoiser(sample_rate=16000))
+        else:
+            self.denoisers.pop(client_id, None)
 
     async def send_personal_message(self, message: str, client_id: str):
         """Send message to specific client."""
@@ -49,13 +61,16 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 @router.websocket("/ws/realtime-transcription/{client_id}")
-async def websocket_transcription(websocket: WebSocket, client_id: str):
+async def websocket_transcription(websocket: WebSocket, client_id: str, denoise: bool = settings.REALTIME_DENOISE):
     """
     Real-time audio transcription via WebSocket.
     Supports streaming audio input with live transcription output.
     Includes confidence scoring and partial results.
+    With `?denoise=true` (or a `set_denoise` command) incoming 16 kHz PCM16 chunks
+    are noise-suppressed on the fly with constant memory per connection.
     """
     await manager.connect(websocket, client_id)
+    manager.set_denoise(client_id, denoise)
 
     try:
         # Send initial connection confirmation
@@ -64,7 +79,8 @@ async def websocket_transcription(websocket: WebSocket, client_id: str):
                 "type": "connection_established",
                 "client_id": client_id,
                 "supported_formats": ["wav", "mp3", "webm"],
-                "sample_rate": 16000
+                "sample_rate": 16000,
+                "denoise": denoise
             }),
             client_id
         )
@@ -79,6 +95,9 @@ async def websocket_transcription(websocket: WebSocket, client_id: str):
                 if "bytes" in data:
                     # Handle binary audio data
                     audio_chunk = data["bytes"]
+                    denoiser = manager.denoisers.get(client_id)
+                    if denoiser is not None:
+                        audio_chunk = denoiser.process_pcm16(audio_chunk)
                     audio_buffer.extend(audio_chunk)
 
                     # Process when buffer reaches threshold (e.g., 1 second of audio)
@@ -155,6 +174,16 @@ async def handle_ws_command(command: Dict[str, Any], client_id: str):
         }
         await manager.send_personal_message(json.dumps(response), client_id)
 
+    elif command_type == "set_denoise":
+        enabled = bool(command.get("enabled", True))
+        manager.set_denoise(client_id, enabled)
+        response = {
+            "type": "denoise_updated",
+            "enabled": enabled,
+            "timestamp": time.time()
+        }
+        await manager.send_personal_message(json.dumps(response), client_id)
+
     elif command_type == "get_status":
         status = {
             "type": "status",
@@ -27,6 +27,9 @@ class TranscriptionResponse(BaseModel):
     words: List[WordTimestamp] = Field(..., description="Word-level timestamps")
     model_info: Dict[str, str] = Field(..., description="Model metadata")
     processing_time: float = Field(..., description="Processing time in seconds")
+    language_context: Optional[Dict[str, Any]] = Field(
+        None, description="Source language for downstream routing: language, probability and source (user/asr/text)"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -63,6 +66,9 @@ class TranslationResponse(BaseModel):
     model_used: str = Field(..., description="Translation model identifier")
     original_text: str = Field(..., description="Original input text")
     processing_time: float = Field(..., description="Processing time in seconds")
+    translation_memory: Optional[Dict[str, Any]] = Field(
+        None, description="Translation memory usage: exact/fuzzy hits, sentences translated, fuzzy hints"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -132,6 +138,115 @@ class PipelineResponse(BaseModel):
         }
     }
 
+class SimilarityScore(BaseModel):
+    """Similarity of one candidate against every reference."""
+    index: int = Field(..., description="Candidate position in the request")
+    filename: Optional[str] = Field(None, description="Candidate file name")
+    similarities: List[Optional[float]] = Field(..., description="Cosine similarity per reference")
+    best_reference: Optional[int] = Field(None, description="Index of the most similar reference")
+    success: bool = Field(..., description="Whether the candidate could be embedded")
+    error: Optional[str] = Field(None, description="Error message if embedding failed")
+
+class BatchSimilarityResponse(BaseModel):
+    """Response schema for batched speaker similarity scoring."""
+    references: List[str] = Field(..., description="Reference file names")
+    results: List[SimilarityScore] = Field(..., description="Scores per candidate")
+    reference_errors: Dict[int, str] = Field(default_factory=dict, description="References that failed")
+    processing_time: float = Field(..., description="Processing time in seconds")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "references": ["speaker_a.wav"],
+                "results": [
+                    {"index": 0, "filename": "clone_001.wav", "similarities": [0.87],
+                     "best_reference": 0, "success": True, "error": None}
+                ],
+                "reference_errors": {},
+                "processing_time": 4.1
+            }
+        }
+    }
+
+class SpeakerMatch(BaseModel):
+    """A known speaker returned by an index lookup."""
+    speaker_id: str = Field(..., description="Enrolled speaker identifier")
+    similarity: float = Field(..., description="Cosine similarity to the query")
+    metadata: Optional[Dict[str, Any]] = Field(None, description="Metadata stored at enrollment")
+
+class SpeakerEnrollResponse(BaseModel):
+    """Response schema for speaker enrollment."""
+    speaker_id: str = Field(..., description="Enrolled speaker identifier")
+    added: bool = Field(..., description="False if skipped as a duplicate")
+    duplicate_of: Optional[SpeakerMatch] = Field(None, description="Closest existing speaker above the dedup threshold")
+    index_size: int = Field(..., description="Number of speakers in the index")
+    processing_time: float = Field(..., description="Processing time in seconds")
+
+class SpeakerIdentifyResponse(BaseModel):
+    """Response schema for "which known speaker is this" lookups."""
+    matches: List[SpeakerMatch] = Field(..., description="Top-k speakers, most similar first")
+    index_size: int = Field(..., description="Number of speakers searched")
+    search_time_ms: float = Field(..., description="Index search time in milliseconds")
+    processing_time: float = Field(..., description="Total processing time in seconds")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "matches": [
+                    {"speaker_id": "narrator_fr_01", "similarity": 0.91, "metadata": {"language": "fr"}},
+                    {"speaker_id": "narrator_fr_07", "similarity": 0.74, "metadata": None}
+                ],
+                "index_size": 1250,
+                "search_time_ms": 0.4,
+                "processing_time": 0.9
+            }
+        }
+    }
+
+class UsageStatsResponse(BaseModel):
+    """Aggregated usage statistics served from the event store."""
+    total_events: int = Field(..., description="Number of recorded requests")
+    error_count: int = Field(..., description="Number of failed requests")
+    cache_hit_rate: float = Field(..., description="Fraction of requests served from cache")
+    avg_processing_time: float = Field(..., description="Mean processing time in seconds")
+    total_audio_seconds: float = Field(..., description="Total audio duration processed")
+    by_event_type: List[Dict[str, Any]] = Field(..., description="Counts and timings per event type")
+    by_language_pair: List[Dict[str, Any]] = Field(..., description="Counts per language pair")
+    by_model: List[Dict[str, Any]] = Field(..., description="Counts and timings per model")
+    by_user: List[Dict[str, Any]] = Field(..., description="Counts per user (top 50)")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "total_events": 120,
+                "error_count": 2,
+                "cache_hit_rate": 0.35,
+                "avg_processing_time": 1.8,
+                "total_audio_seconds": 5400.0,
+                "by_event_type": [
+                    {"event_type": "transcription", "count": 80, "cache_hit_rate": 0.4,
+                     "avg_processing_time": 2.3, "max_processing_time": 14.2}
+                ],
+                "by_language_pair": [{"source_language": "en", "target_language": "fr", "count": 40}],
+                "by_model": [{"model": "base", "count": 80, "avg_processing_time": 2.3}],
+                "by_user": [{"user_id": "test", "count": 95}]
+            }
+        }
+    }
+
+class JobStatusResponse(BaseModel):
+    """State of an asynchronous job; poll until status is succeeded, failed or cancelled."""
+    job_id: str = Field(..., description="Job identifier")
+    kind: str = Field(..., description="Job type (transcribe, pipeline)")
+    status: str = Field(..., description="queued, running, succeeded, failed or cancelled")
+    progress: float = Field(..., description="Fraction of the audio processed (0-1)")
+    error: Optional[str] = Field(None, description="Failure reason")
+    created_at: float = Field(..., description="Submission time (epoch seconds)")
+    started_at: Optional[float] = Field(None, description="Start time (epoch seconds)")
+    finished_at: Optional[float] = Field(None, description="Completion time (epoch seconds)")
+    expires_at: Optional[float] = Field(None, description="When the stored result is deleted (epoch seconds)")
+    status_url: Optional[str] = Field(None, description="URL to poll for this job")
+
 class ErrorResponse(BaseModel):
     """Standard error response schema."""
     error: str = Field(..., description="Error type")
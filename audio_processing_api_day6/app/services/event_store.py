@@ -0,0 +1,203 @@
+"""
+Append-only event store for processed requests.
+Persists one row per request in SQLite (indexed by time, user and event type)
+so usage statistics can be served without rescanning report files.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    event_type TEXT NOT NULL,
+    user_id TEXT,
+    status TEXT NOT NULL DEFAULT 'success',
+    source_language TEXT,
+    target_language TEXT,
+    model TEXT,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    processing_time REAL,
+    audio_duration REAL,
+    filename TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_user_ts ON events (user_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events (event_type, ts);
+"""
+
+_COLUMNS = (
+    "id", "ts", "event_type", "user_id", "status", "source_language", "target_language",
+    "model", "cache_hit", "processing_time", "audio_duration", "filename", "extra"
+)
+
+
+class EventStore:
+    """SQLite-backed audit/event store with time-range and per-user queries."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or settings.EVENT_STORE_PATH
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def record_event(
+        self,
+        event_type: str,
+        user_id: Optional[str] = None,
+        status: str = "success",
+        source_language: Optional[str] = None,
+        target_language: Optional[str] = None,
+        model: Optional[str] = None,
+        cache_hit: bool = False,
+        processing_time: Optional[float] = None,
+        audio_duration: Optional[float] = None,
+        filename: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None
+    ) -> int:
+        """Append a single event and return its row id."""
+        row = (
+            timestamp if timestamp is not None else time.time(),
+            event_type, user_id, status, source_language, target_language, model,
+            int(bool(cache_hit)), processing_time, audio_duration, filename,
+            json.dumps(extra, default=str) if extra else None
+        )
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO events (ts, event_type, user_id, status, source_language, target_language, "
+                "model, cache_hit, processing_time, audio_duration, filename, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row
+            )
+            return cursor.lastrowid
+
+    @staticmethod
+    def _where(
+        start: Optional[float],
+        end: Optional[float],
+        user_id: Optional[str],
+        event_type: Optional[str]
+    ):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(end)
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if event_type is not None:
+            clauses.append("event_type = ?")
+            params.append(event_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query_events(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        user_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Return events in a time range (epoch seconds), newest first."""
+        where, params = self._where(start, end, user_id, event_type)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM events {where} ORDER BY ts DESC LIMIT ? OFFSET ?"
+        with self._connect() as conn:
+            rows = conn.execute(sql, params + [limit, offset]).fetchall()
+        events = []
+        for row in rows:
+            event = dict(zip(_COLUMNS, row))
+            event["cache_hit"] = bool(event["cache_hit"])
+            event["extra"] = json.loads(event["extra"]) if event["extra"] else None
+            events.append(event)
+        return events
+
+    def aggregate_stats(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Aggregate counts, cache hit rates and timings per event type, language pair and user."""
+        where, params = self._where(start, end, user_id, None)
+        with self._connect() as conn:
+            total, errors, cache_hits, avg_time, audio_seconds = conn.execute(
+                f"SELECT COUNT(*), SUM(status != 'success'), SUM(cache_hit), AVG(processing_time), "
+                f"SUM(audio_duration) FROM events {where}",
+                params
+            ).fetchone()
+            by_type = conn.execute(
+                f"SELECT event_type, COUNT(*), SUM(cache_hit), AVG(processing_time), MAX(processing_time) "
+                f"FROM events {where} GROUP BY event_type ORDER BY COUNT(*) DESC",
+                params
+            ).fetchall()
+            by_pair = conn.execute(
+                f"SELECT source_language, target_language, COUNT(*) FROM events {where} "
+                f"GROUP BY source_language, target_language ORDER BY COUNT(*) DESC",
+                params
+            ).fetchall()
+            by_model = conn.execute(
+                f"SELECT model, COUNT(*), AVG(processing_time) FROM events {where} "
+                f"GROUP BY model ORDER BY COUNT(*) DESC",
+                params
+            ).fetchall()
+            by_user = conn.execute(
+                f"SELECT user_id, COUNT(*) FROM events {where} GROUP BY user_id ORDER BY COUNT(*) DESC LIMIT 50",
+                params
+            ).fetchall()
+
+        total = total or 0
+        return {
+            "total_events": total,
+            "error_count": errors or 0,
+            "cache_hit_rate": (cache_hits or 0) / total if total else 0.0,
+            "avg_processing_time": avg_time or 0.0,
+            "total_audio_seconds": audio_seconds or 0.0,
+            "by_event_type": [
+                {
+                    "event_type": event_type,
+                    "count": count,
+                    "cache_hit_rate": (hits or 0) / count if count else 0.0,
+                    "avg_processing_time": avg or 0.0,
+                    "max_processing_time": peak or 0.0
+                }
+                for event_type, count, hits, avg, peak in by_type
+            ],
+            "by_language_pair": [
+                {"source_language": src, "target_language": tgt, "count": count}
+                for src, tgt, count in by_pair
+            ],
+            "by_model": [
+                {"model": model, "count": count, "avg_processing_time": avg or 0.0}
+                for model, count, avg in by_model
+            ],
+            "by_user": [{"user_id": user, "count": count} for user, count in by_user]
+        }
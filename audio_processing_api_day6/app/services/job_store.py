@@ -0,0 +1,293 @@
+"""
+Persistent job queue and result store for long-running audio jobs.
+
+Jobs live in SQLite (one row per job: status, progress, partial and final results,
+expiry), so the queue survives restarts and several API processes on one host can
+share it. Claiming is atomic and fair across users: the next job comes from the user
+with the fewest running jobs, oldest first. A claim is a lease: the job records its
+owner (one worker pool) and `updated_at` serves as the heartbeat. Only jobs whose
+lease went stale are re-queued, and writes from an owner that lost its lease are
+rejected, so a job is never finished twice. A Redis-backed store only needs to provide
+the same public methods to replace this one.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    user_id TEXT,
+    status TEXT NOT NULL,
+    owner TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    params TEXT,
+    input_path TEXT,
+    partial TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    updated_at REAL NOT NULL,
+    finished_at REAL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_user_status ON jobs (user_id, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs (expires_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_updated ON jobs (status, updated_at);
+"""
+
+_COLUMNS = (
+    "id", "kind", "user_id", "status", "owner", "progress", "params", "input_path", "partial", "result",
+    "error", "created_at", "started_at", "updated_at", "finished_at", "expires_at"
+)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    user_id: Optional[str]
+    status: str
+    owner: Optional[str]
+    progress: float
+    params: Dict[str, Any]
+    input_path: Optional[str]
+    partial: Optional[Dict[str, Any]]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    updated_at: float
+    finished_at: Optional[float]
+    expires_at: Optional[float]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_status(self) -> Dict[str, Any]:
+        """Public status view (no payloads or server paths)."""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "expires_at": self.expires_at,
+        }
+
+
+def _row_to_job(row) -> Job:
+    data = dict(zip(_COLUMNS, row))
+    for key in ("params", "partial", "result"):
+        data[key] = json.loads(data[key]) if data[key] else None
+    data["params"] = data["params"] or {}
+    return Job(**data)
+
+
+class JobStore:
+    """SQLite-backed job queue with fair claiming, progress/partial updates and result TTL."""
+
+    def __init__(self, db_path: Optional[str] = None, result_ttl: Optional[float] = None):
+        self.db_path = db_path or settings.JOB_STORE_PATH
+        self.result_ttl = result_ttl if result_ttl is not None else settings.JOB_RESULT_TTL_SECONDS
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if columns and "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def create(
+        self,
+        kind: str,
+        user_id: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        input_path: Optional[str] = None,
+        job_id: Optional[str] = None
+    ) -> Job:
+        """Enqueue a job and return it."""
+        now = time.time()
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, user_id, status, params, input_path, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, user_id, QUEUED, json.dumps(params or {}), input_path, now, now)
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job by id; finished jobs past their expiry are treated as gone."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (job_id, time.time())
+            ).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list_jobs(self, user_id: Optional[str] = None, limit: int = 50) -> List[Job]:
+        query = f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE (expires_at IS NULL OR expires_at > ?)"
+        params: List[Any] = [time.time()]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return [_row_to_job(row) for row in conn.execute(query, params).fetchall()]
+
+    def claim_next(self, owner: str, max_running_per_user: Optional[int] = None) -> Optional[Job]:
+        """
+        Atomically lease the next queued job to `owner`. Fair scheduling: users with fewer
+        running jobs go first, then the oldest job; users at `max_running_per_user` wait.
+        """
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                query = (
+                    "SELECT j.id, (SELECT COUNT(*) FROM jobs r WHERE r.status = ? "
+                    "AND r.user_id IS j.user_id) AS running FROM jobs j WHERE j.status = ? "
+                )
+                params: List[Any] = [RUNNING, QUEUED]
+                if max_running_per_user:
+                    query += "AND running < ? "
+                    params.append(max_running_per_user)
+                query += "ORDER BY running, j.created_at, j.rowid LIMIT 1"
+                row = conn.execute(query, params).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, started_at = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, owner, now, now, row[0])
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row[0])
+
+    def update_progress(
+        self,
+        job_id: str,
+        progress: float,
+        partial: Optional[Dict[str, Any]] = None,
+        owner: Optional[str] = None
+    ) -> bool:
+        """
+        Record progress (0..1) and optionally a partial result, renewing the lease. False if
+        the job is no longer running (cancelled) or, with `owner`, leased to someone else.
+        """
+        assignments, params = ["progress = ?", "updated_at = ?"], [min(max(progress, 0.0), 1.0), time.time()]
+        if partial is not None:
+            assignments.append("partial = ?")
+            params.append(json.dumps(partial, default=str))
+        query = f"UPDATE jobs SET {', '.join(assignments)} WHERE id = ? AND status = ?"
+        params += [job_id, RUNNING]
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(owner)
+        with self._lock, self._connect() as conn:
+            return conn.execute(query, params).rowcount > 0
+
+    def heartbeat(self, job_ids: List[str], owner: str) -> int:
+        """Renew the leases `owner` holds on running jobs; returns how many are still held."""
+        if not job_ids:
+            return 0
+        placeholders = ", ".join("?" for _ in job_ids)
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET updated_at = ? WHERE id IN ({placeholders}) AND status = ? AND owner = ?",
+                (time.time(), *job_ids, RUNNING, owner)
+            )
+            return cursor.rowcount
+
+    def _finish(self, job_id: str, status: str, result=None, error=None, from_states=(RUNNING,), owner=None) -> bool:
+        now = time.time()
+        placeholders = ", ".join("?" for _ in from_states)
+        query = (
+            "UPDATE jobs SET status = ?, result = ?, error = ?, progress = CASE WHEN ? THEN 1.0 ELSE progress END, "
+            f"finished_at = ?, updated_at = ?, expires_at = ? WHERE id = ? AND status IN ({placeholders})"
+        )
+        params = [status, json.dumps(result, default=str) if result is not None else None, error,
+                  status == SUCCEEDED, now, now, now + self.result_ttl, job_id, *from_states]
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(owner)
+        with self._lock, self._connect() as conn:
+            return conn.execute(query, params).rowcount > 0
+
+    def complete(self, job_id: str, result: Dict[str, Any], owner: Optional[str] = None) -> bool:
+        return self._finish(job_id, SUCCEEDED, result=result, owner=owner)
+
+    def fail(self, job_id: str, error: str, owner: Optional[str] = None) -> bool:
+        return self._finish(job_id, FAILED, error=error, owner=owner)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; running handlers stop at their next progress update."""
+        return self._finish(job_id, CANCELLED, from_states=(QUEUED, RUNNING))
+
+    def requeue_stale(self, lease_seconds: float, now: Optional[float] = None) -> int:
+        """Put running jobs whose lease was not renewed for `lease_seconds` back in the queue."""
+        now = now if now is not None else time.time()
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, owner = NULL, progress = 0, partial = NULL, started_at = NULL, "
+                "updated_at = ? WHERE status = ? AND updated_at < ?",
+                (QUEUED, now, RUNNING, now - lease_seconds)
+            )
+            return cursor.rowcount
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Delete finished jobs past their TTL together with any leftover input files."""
+        now = now if now is not None else time.time()
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, input_path FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            ).fetchall()
+            conn.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        for _, path in rows:
+            if path and os.path.exists(path):
+                os.remove(path)
+        return len(rows)
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
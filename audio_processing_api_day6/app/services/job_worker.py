@@ -0,0 +1,159 @@
+"""
+Local worker pool for queued audio jobs.
+
+Each worker is a daemon thread that leases the next job from the JobStore and runs its
+kind's async handler in a private event loop, so long jobs never block the API's loop.
+A heartbeat thread renews the pool's leases every third of JOB_LEASE_SECONDS, and any
+pool re-queues only jobs whose lease went stale (their process died), so several API
+processes can share one store. Handlers report progress through a JobContext; once a
+job is cancelled (or its lease lost) the next report raises JobCancelled and the handler
+unwinds. Finished jobs keep their result until the store's TTL, and expired jobs are
+purged periodically.
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.services.job_store import CANCELLED, Job, JobStore
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler when its job was cancelled or its lease was lost."""
+
+
+class JobContext:
+    """Progress and partial-result reporting for one running job."""
+
+    def __init__(self, store: JobStore, job: Job, owner: Optional[str] = None):
+        self.store = store
+        self.job = job
+        self.owner = owner
+
+    def report(self, progress: float, partial: Optional[Dict[str, Any]] = None) -> None:
+        if not self.store.update_progress(self.job.id, progress, partial, owner=self.owner):
+            raise JobCancelled(self.job.id)
+
+
+JobHandler = Callable[[Job, JobContext], Awaitable[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """Runs queued jobs on `workers` threads; `handlers` maps job kind to an async handler."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: Dict[str, JobHandler],
+        workers: int = settings.JOB_WORKERS,
+        max_running_per_user: int = settings.JOB_MAX_RUNNING_PER_USER,
+        lease_seconds: float = settings.JOB_LEASE_SECONDS,
+        poll_interval: float = 0.5,
+        purge_interval: float = 60.0
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self.max_running_per_user = max_running_per_user or None
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+        # Unique per pool instance: a restarted process must not inherit the old leases
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._active: set = set()
+        self._active_lock = threading.Lock()
+        self._last_maintenance = 0.0
+
+    def start(self) -> None:
+        """Start the workers and the lease heartbeat."""
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was enqueued instead of waiting for the next poll."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._maintain()
+            job = self.store.claim_next(self.owner, self.max_running_per_user)
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self.run_job(job)
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._active_lock:
+                active = list(self._active)
+            try:
+                self.store.heartbeat(active, self.owner)
+            except Exception as e:
+                logger.warning(f"Job heartbeat failed: {e}")
+
+    def _maintain(self) -> None:
+        """Re-queue jobs with stale leases and purge expired results, at most every half lease."""
+        now = time.time()
+        if now - self._last_maintenance < min(self.purge_interval, self.lease_seconds / 2):
+            return
+        self._last_maintenance = now
+        try:
+            requeued = self.store.requeue_stale(self.lease_seconds, now)
+            if requeued:
+                logger.info(f"Re-queued {requeued} job(s) with expired leases")
+            self.store.purge_expired(now)
+        except Exception as e:
+            logger.warning(f"Job maintenance failed: {e}")
+
+    def run_job(self, job: Job) -> None:
+        """Run one leased job to completion, failure or cancellation."""
+        handler = self.handlers.get(job.kind)
+        with self._active_lock:
+            self._active.add(job.id)
+        finished = False
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind '{job.kind}'")
+            result = asyncio.run(handler(job, JobContext(self.store, job, self.owner)))
+            finished = self.store.complete(job.id, result, owner=self.owner)
+        except JobCancelled:
+            current = self.store.get(job.id)
+            finished = current is None or current.status == CANCELLED
+            logger.info(f"Job {job.id} {'cancelled' if finished else 'lost its lease'}")
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}", exc_info=True)
+            finished = self.store.fail(job.id, str(e), owner=self.owner)
+        finally:
+            with self._active_lock:
+                self._active.discard(job.id)
+        # The upload is only needed while the job runs; results stay until the TTL. After a
+        # lost lease another worker owns the job and still needs the input.
+        if finished and job.input_path and os.path.exists(job.input_path):
+            os.remove(job.input_path)
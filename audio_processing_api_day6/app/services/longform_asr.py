@@ -0,0 +1,412 @@
+"""
+Parallel long-form ASR.
+
+Long recordings are split at VAD silences into chunks of at most ~30 s (Whisper's
+window), the chunks are transcribed concurrently on a pool of model replicas, and the
+results are stitched back with global timestamps. Speech runs longer than a chunk are
+hard-split with a short overlap; words transcribed twice in that overlap are dropped
+by timestamp (midpoint of the overlap) and by a word n-gram check at the seam.
+"""
+import asyncio
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.utils.lang_detect import LanguageContext
+from app.utils.vad import detect_speech
+
+settings = get_settings()
+
+_WORD_NORMALIZE = re.compile(r"[^\w']+")
+
+
+@dataclass
+class Chunk:
+    """A [start, end) sample range; `overlaps_previous` marks a hard split inside speech."""
+    start: int
+    end: int
+    overlaps_previous: bool = False
+
+
+def plan_chunks(
+    segments: Sequence[Tuple[int, int]],
+    max_samples: int,
+    overlap_samples: int = 0
+) -> List[Chunk]:
+    """
+    Greedily pack consecutive speech segments into chunks no longer than `max_samples`,
+    cutting only in the silence between segments. A single segment longer than a chunk
+    is split into `max_samples` pieces overlapping by `overlap_samples`.
+    """
+    chunks: List[Chunk] = []
+    current: Optional[Chunk] = None
+    for start, end in segments:
+        if current is not None and end - current.start <= max_samples:
+            current.end = end
+            continue
+        if current is not None:
+            chunks.append(current)
+        overlaps = False
+        while end - start > max_samples:
+            chunks.append(Chunk(start, start + max_samples, overlaps))
+            start += max_samples - overlap_samples
+            overlaps = True
+        current = Chunk(start, end, overlaps)
+    if current is not None:
+        chunks.append(current)
+    return chunks
+
+
+def stream_chunks(
+    windows: Iterable[Tuple[float, np.ndarray]],
+    sample_rate: int,
+    max_samples: int,
+    overlap_samples: int = 0,
+    vad_aggressiveness: int = 2,
+    min_silence_ms: int = 300,
+    padding_ms: int = 200
+) -> Iterator[Tuple[Chunk, np.ndarray]]:
+    """
+    Streaming `plan_chunks`: consume (offset, samples) windows and yield (chunk, audio)
+    pairs in global sample coordinates as soon as their cut points are settled. Audio is
+    buffered until it spans two chunks; VAD then plans that buffer, every chunk but the
+    last is emitted, and planning resumes from the last chunk's start (or, if it ended in
+    silence, from its end), so the buffer never grows past ~2 chunks plus one window.
+    """
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start = 0  # global index of buffer[0]
+    previous_end = 0
+    # Audio younger than this may still join the last speech segment
+    tail = (min_silence_ms + padding_ms) * sample_rate // 1000
+
+    def plan(audio: np.ndarray) -> List[Chunk]:
+        vad = detect_speech(audio, sample_rate, aggressiveness=vad_aggressiveness,
+                            padding_ms=padding_ms, min_silence_ms=min_silence_ms)
+        return plan_chunks(vad.segments, max_samples, overlap_samples)
+
+    def emit(chunk: Chunk):
+        nonlocal previous_end
+        start, end = buffer_start + chunk.start, buffer_start + chunk.end
+        # Overlap is judged globally: re-planned audio can start inside the last emitted chunk
+        global_chunk = Chunk(start, end, overlaps_previous=start < previous_end)
+        previous_end = max(previous_end, end)
+        return global_chunk, buffer[chunk.start:chunk.end].copy()
+
+    for _, window in windows:
+        buffer = np.concatenate([buffer, np.asarray(window, dtype=np.float32)])
+        if len(buffer) < 2 * max_samples:
+            continue
+        chunks = plan(buffer)
+        if not chunks:
+            keep = len(buffer) - tail
+        else:
+            for chunk in chunks[:-1]:
+                yield emit(chunk)
+            last = chunks[-1]
+            if last.end + tail < len(buffer):
+                yield emit(last)
+                keep = max(last.end, len(buffer) - tail)
+            else:
+                keep = last.start
+        buffer_start += keep
+        buffer = buffer[keep:]
+    for chunk in plan(buffer) if len(buffer) else []:
+        yield emit(chunk)
+
+
+def _norm(word: str) -> str:
+    return _WORD_NORMALIZE.sub("", word.lower())
+
+
+def _midpoint(item: Dict[str, Any]) -> float:
+    return (item["start"] + item["end"]) / 2
+
+
+def _trim(result: Dict[str, Any], keep: Callable[[Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+    """Segments restricted to words (or, without word timings, segments) passing `keep`."""
+    trimmed = []
+    for seg in result["segments"]:
+        words = seg.get("words")
+        if words:
+            kept = [w for w in words if keep(w)]
+            if kept:
+                trimmed.append(dict(seg, words=kept, start=kept[0]["start"], end=kept[-1]["end"],
+                                    text=" ".join(w["word"].strip() for w in kept)))
+        elif keep(seg):
+            trimmed.append(seg)
+    return trimmed
+
+
+def _drop_repeated_prefix(previous: List[Dict[str, Any]], current: List[Dict[str, Any]], max_ngram: int = 5):
+    """Remove leading words of `current` that repeat the last words of `previous`."""
+    prev_words = [w for seg in previous for w in seg.get("words", [])]
+    cur_words = [w for seg in current for w in seg.get("words", [])]
+    repeated = 0
+    for n in range(min(max_ngram, len(prev_words), len(cur_words)), 0, -1):
+        if [_norm(w["word"]) for w in prev_words[-n:]] == [_norm(w["word"]) for w in cur_words[:n]]:
+            repeated = n
+            break
+    if not repeated:
+        return current
+    drop = {id(w) for w in cur_words[:repeated]}
+    return _trim({"segments": current}, lambda w: id(w) not in drop)
+
+
+def stitch(chunks: Sequence[Chunk], results: Sequence[Dict[str, Any]], sample_rate: int) -> Dict[str, Any]:
+    """
+    Merge per-chunk results (chunk-local timestamps) into one transcript with global
+    timestamps, de-duplicating words in hard-split overlaps.
+    """
+    shifted = []
+    for chunk, result in zip(chunks, results):
+        offset = chunk.start / sample_rate
+        segments = []
+        for seg in result.get("segments", []):
+            seg = dict(seg, start=seg["start"] + offset, end=seg["end"] + offset)
+            if seg.get("words"):
+                seg["words"] = [dict(w, start=w["start"] + offset, end=w["end"] + offset) for w in seg["words"]]
+            segments.append(seg)
+        shifted.append({"segments": segments})
+
+    stitched: List[List[Dict[str, Any]]] = []
+    for i, (chunk, result) in enumerate(zip(chunks, shifted)):
+        segments = result["segments"]
+        if i and chunk.overlaps_previous:
+            # Each side keeps the words whose midpoint falls on its half of the overlap
+            cut = (chunk.start + chunks[i - 1].end) / 2 / sample_rate
+            stitched[-1] = _trim({"segments": stitched[-1]}, lambda w: _midpoint(w) < cut)
+            segments = _trim(result, lambda w: _midpoint(w) >= cut)
+            segments = _drop_repeated_prefix(stitched[-1], segments)
+        stitched.append(segments)
+
+    segments = [dict(seg, id=i) for i, seg in enumerate(seg for part in stitched for seg in part)]
+    return {
+        "text": " ".join(seg["text"].strip() for seg in segments if seg.get("text", "").strip()),
+        "segments": segments,
+        "words": [w for seg in segments for w in seg.get("words", [])],
+    }
+
+
+class WhisperReplica:
+    """openai-whisper model wrapper: chunk-local segments with word timings."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def detect_language(self, audio: np.ndarray) -> Tuple[str, float]:
+        import whisper
+
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio.astype(np.float32)), n_mels=getattr(self.model.dims, "n_mels", 80)
+        ).to(self.model.device)
+        _, probs = self.model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
+
+    def transcribe_chunk(self, audio: np.ndarray, language: Optional[str]) -> Dict[str, Any]:
+        # Chunks are independent: conditioning on a neighbour's text would serialize them
+        result = self.model.transcribe(audio.astype(np.float32), language=language, word_timestamps=True,
+                                       condition_on_previous_text=False)
+        return {"segments": result.get("segments", [])}
+
+
+class FasterWhisperReplica:
+    """faster-whisper wrapper; one WhisperModel with num_workers=N serves N replicas."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def detect_language(self, audio: np.ndarray) -> Tuple[str, float]:
+        # Language detection runs eagerly; the lazy segment generator is never decoded
+        _, info = self.model.transcribe(audio.astype(np.float32))
+        return info.language, float(info.language_probability)
+
+    def transcribe_chunk(self, audio: np.ndarray, language: Optional[str]) -> Dict[str, Any]:
+        segments, _ = self.model.transcribe(audio.astype(np.float32), language=language, word_timestamps=True,
+                                            condition_on_previous_text=False)
+        return {"segments": [
+            {
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text.strip(),
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": getattr(w, "probability", 0.0)}
+                    for w in (seg.words or [])
+                ],
+            }
+            for seg in segments
+        ]}
+
+
+class ReplicaPool:
+    """
+    Hands out model replicas to concurrent chunk jobs, one job per replica at a time.
+    Replicas are checked out from a thread-safe queue inside the executor thread, so the
+    pool is not tied to an event loop and can serve several loops (e.g. job workers).
+    """
+
+    def __init__(self, replicas: Sequence[Any]):
+        if not replicas:
+            raise ValueError("ReplicaPool needs at least one replica")
+        self.replicas = list(replicas)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.replicas), thread_name_prefix="asr-replica")
+        self._free: "queue.Queue[Any]" = queue.Queue()
+        for replica in self.replicas:
+            self._free.put(replica)
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    @contextmanager
+    def acquire(self):
+        """Block until a replica is free and hold it for the duration of the block."""
+        replica = self._free.get()
+        try:
+            yield replica
+        finally:
+            self._free.put(replica)
+
+    def _call(self, method: str, args: tuple):
+        with self.acquire() as replica:
+            return getattr(replica, method)(*args)
+
+    async def run(self, method: str, *args):
+        """Call `replica.<method>(*args)` on a free replica in the pool's thread executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, method, args)
+
+
+class LongFormTranscriber:
+    """VAD chunking, concurrent chunk transcription and stitching for long recordings."""
+
+    def __init__(
+        self,
+        pool: ReplicaPool,
+        chunk_seconds: float = settings.ASR_CHUNK_SECONDS,
+        overlap_seconds: float = 1.0,
+        vad_aggressiveness: int = 2,
+        min_silence_ms: int = 300,
+        padding_ms: int = 200
+    ):
+        self.pool = pool
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.vad_aggressiveness = vad_aggressiveness
+        self.min_silence_ms = min_silence_ms
+        self.padding_ms = padding_ms
+
+    def plan(self, audio: np.ndarray, sample_rate: int = 16000) -> List[Chunk]:
+        vad = detect_speech(audio, sample_rate, aggressiveness=self.vad_aggressiveness,
+                            padding_ms=self.padding_ms, min_silence_ms=self.min_silence_ms)
+        return plan_chunks(vad.segments, int(self.chunk_seconds * sample_rate),
+                           int(self.overlap_seconds * sample_rate))
+
+    async def transcribe(
+        self,
+        audio: np.ndarray,
+        sample_rate: int = 16000,
+        language: Optional[str] = None
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(None, self.plan, audio, sample_rate)
+        requested = language if language and language != "auto" else None
+        probability = 1.0
+        if requested is None and chunks:
+            # One language for the whole file keeps chunks consistent and skips per-chunk detection
+            first = chunks[0]
+            requested, probability = await self.pool.run("detect_language", audio[first.start:first.end])
+        results = await asyncio.gather(*(
+            self.pool.run("transcribe_chunk", audio[chunk.start:chunk.end], requested) for chunk in chunks
+        ))
+        response = stitch(chunks, results, sample_rate)
+        response.update({
+            "language": requested or language or "auto",
+            "language_probability": probability,
+            "duration": len(audio) / sample_rate,
+            "chunks": len(chunks),
+        })
+        response["language_context"] = LanguageContext.from_asr(response, language).to_dict()
+        return response
+
+    async def transcribe_stream(
+        self,
+        windows: Iterable[Tuple[float, np.ndarray]],
+        sample_rate: int = 16000,
+        language: Optional[str] = None,
+        on_chunk: Optional[Callable[[float, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Long-form transcription of streamed (offset, samples) windows: chunks are cut at
+        silences by `stream_chunks` and dispatched to the replica pool as soon as they are
+        settled, so decoding overlaps with transcription and at most two chunks per replica
+        are held in memory. The window iterator (file decoding, resampling, denoising) and
+        the VAD run in the default thread executor, one chunk at a time, so the event loop
+        stays free for other requests. `on_chunk(seconds_done, partial)` is called whenever
+        the in-order prefix of finished chunks grows; an exception raised there cancels the
+        remaining chunks.
+        """
+        requested = language if language and language != "auto" else None
+        probability = 1.0
+        duration = 0.0
+        max_pending = 2 * len(self.pool)
+        chunks: List[Chunk] = []
+        tasks: List[asyncio.Future] = []
+        results: List[Dict[str, Any]] = []
+
+        def counted():
+            nonlocal duration
+            for offset, window in windows:
+                duration = offset + len(window) / sample_rate
+                yield offset, window
+
+        async def collect(wait: bool) -> None:
+            # Results are consumed in chunk order; `wait` blocks on the oldest pending chunk
+            while len(results) < len(tasks) and (wait or tasks[len(results)].done()):
+                results.append(await tasks[len(results)])
+                wait = False
+                if on_chunk is not None:
+                    partial = stitch(chunks[:len(results)], results, sample_rate)
+                    on_chunk(chunks[len(results) - 1].end / sample_rate,
+                             {"text": partial["text"], "language": requested, "segments": partial["segments"]})
+
+        loop = asyncio.get_running_loop()
+        planned = stream_chunks(
+            counted(), sample_rate, int(self.chunk_seconds * sample_rate),
+            int(self.overlap_seconds * sample_rate), self.vad_aggressiveness,
+            self.min_silence_ms, self.padding_ms
+        )
+        try:
+            while True:
+                item = await loop.run_in_executor(None, next, planned, None)
+                if item is None:
+                    break
+                chunk, audio = item
+                if requested is None:
+                    requested, probability = await self.pool.run("detect_language", audio)
+                chunks.append(chunk)
+                tasks.append(asyncio.ensure_future(self.pool.run("transcribe_chunk", audio, requested)))
+                # Let the new task reach the executor before decoding the next chunk
+                await asyncio.sleep(0)
+                await collect(wait=len(tasks) - len(results) >= max_pending)
+            while len(results) < len(tasks):
+                await collect(wait=True)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        response = stitch(chunks, results, sample_rate)
+        response.update({
+            "language": requested or language or "auto",
+            "language_probability": probability,
+            "duration": duration,
+            "chunks": len(chunks),
+        })
+        response["language_context"] = LanguageContext.from_asr(response, language).to_dict()
+        return response
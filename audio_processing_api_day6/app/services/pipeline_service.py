@@ -4,14 +4,21 @@ Supports word-level diff, color highlighting, and speaker similarity.
 """
 
 import asyncio
-from typing import Dict, Any, Optional
-from faster_whisper import WhisperModel
+import io
+import re
+import threading
+from typing import Dict, Any, Optional, Tuple
+from faster_whisper import WhisperModel, decode_audio
 from transformers import MarianMTModel, MarianTokenizer
 from TTS.api import TTS
 from resemblyzer import VoiceEncoder, preprocess_wav
-from difflib import SequenceMatcher
 import numpy as np
 
+from app.models.translation_model import MARIAN_MODELS
+from app.services.longform_asr import FasterWhisperReplica, LongFormTranscriber, ReplicaPool
+from app.utils import text_alignment
+from app.utils.lang_detect import LanguageContext, resolve_language
+
 # Optional: Vosk integration for Windows/offline ASR
 try:
     from vosk import Model as VoskModel, KaldiRecognizer
@@ -64,13 +71,30 @@ class PipelineService:
         tts_model_name: str = "tts_models/multilingual/multi-dataset/your_tts",
         vosk_model_path: Optional[str] = None,
         elevenlabs_api_key: Optional[str] = None,
-        opennmt_url: Optional[str] = None
+        opennmt_url: Optional[str] = None,
+        asr_replicas: int = 1,
+        longform_threshold_seconds: float = 120.0,
+        translation_models: Optional[Dict[Tuple[str, str], str]] = None
     ):
-        # ASR (Whisper)
-        self.whisper = WhisperModel(whisper_model_name, device=whisper_device, compute_type="int8")
-        # MarianMT
+        # ASR (Whisper); num_workers lets one CTranslate2 model serve concurrent long-form chunks
+        self.whisper = WhisperModel(whisper_model_name, device=whisper_device, compute_type="int8",
+                                    num_workers=max(1, asr_replicas))
+        self.longform_threshold_seconds = longform_threshold_seconds
+        self.longform = LongFormTranscriber(
+            ReplicaPool([FasterWhisperReplica(self.whisper) for _ in range(max(1, asr_replicas))])
+        )
+        # MarianMT: one model per (source, target) pair, routed by the source language. The
+        # default model is loaded eagerly and registered under the pair in its name
+        # (opus-mt-<src>-<tgt>); other pairs load on first use.
+        self.marian_models = dict(translation_models or MARIAN_MODELS)
+        self._marian_loaded: Dict[str, Tuple[Any, Any]] = {}
+        self._marian_lock = threading.Lock()
+        pair = re.search(r"opus-mt-([a-z]+)-([a-z]+)$", translation_model_name)
+        if pair:
+            self.marian_models[(pair.group(1), pair.group(2))] = translation_model_name
         self.trans_tokenizer = MarianTokenizer.from_pretrained(translation_model_name)
         self.trans_model = MarianMTModel.from_pretrained(translation_model_name)
+        self._marian_loaded[translation_model_name] = (self.trans_model, self.trans_tokenizer)
         # TTS (XTTS/YourTTS)
         self.tts = TTS(tts_model_name, progress_bar=False)
         # Resemblyzer for speaker similarity
@@ -84,10 +108,13 @@ class PipelineService:
 
     async def asr_whisper(self, audio_bytes: bytes, language: Optional[str] = None) -> Dict[str, Any]:
         loop = asyncio.get_event_loop()
+        audio = await loop.run_in_executor(None, lambda: decode_audio(io.BytesIO(audio_bytes), sampling_rate=16000))
+        if len(audio) > self.longform_threshold_seconds * 16000:
+            return await self.asr_longform(audio, language)
         segments, info = await loop.run_in_executor(
             None,
             lambda: self.whisper.transcribe(
-                audio_bytes,
+                audio,
                 language=language,
                 word_timestamps=True,
                 vad_filter=True,
@@ -100,6 +127,9 @@ class PipelineService:
             "segments": [seg.text.strip() for seg in segments],
             "language": info.language,
             "language_probability": info.language_probability,
+            "language_context": LanguageContext.from_asr(
+                {"language": info.language, "language_probability": info.language_probability}, language
+            ).to_dict(),
             "duration": info.duration,
             "words": [
                 {
@@ -113,6 +143,19 @@ class PipelineService:
             ]
         }
 
+    async def asr_longform(self, audio: np.ndarray, language: Optional[str] = None) -> Dict[str, Any]:
+        """Long recordings: VAD-split ~30 s chunks transcribed concurrently, stitched with global timestamps."""
+        result = await self.longform.transcribe(audio, 16000, language)
+        return {
+            "text": result["text"],
+            "segments": [seg["text"] for seg in result["segments"]],
+            "language": result["language"],
+            "language_probability": result["language_probability"],
+            "language_context": result["language_context"],
+            "duration": result["duration"],
+            "words": result["words"]
+        }
+
     def asr_vosk(self, audio_bytes: bytes, sample_rate: int = 16000) -> Dict[str, Any]:
         if not self.vosk:
             raise RuntimeError("Vosk model not initialized or not available.")
@@ -131,34 +174,78 @@ class PipelineService:
         text += json.loads(final)["text"]
         return {"text": text.strip()}
 
-    async def translate(self, text: str, target_language: str = "fr", source_language: Optional[str] = None, backend: str = "marianmt") -> Dict[str, Any]:
+    async def translate(
+        self,
+        text: str,
+        target_language: str = "fr",
+        source_language: Optional[str] = None,
+        backend: str = "marianmt",
+        language_context: Optional[LanguageContext] = None
+    ) -> Dict[str, Any]:
         if backend == "opennmt" and self.opennmt:
-            translated = self.opennmt.translate(text, src_lang=source_language or "en", tgt_lang=target_language)
+            source_language = source_language or resolve_language(text, language_context).language
+            translated = self.opennmt.translate(text, src_lang=source_language, tgt_lang=target_language)
             return {
                 "translated_text": translated,
+                "source_language": source_language,
                 "target_language": target_language,
                 "original_text": text
             }
         else:
+            source_language = source_language or resolve_language(text, language_context).language
+            model_name = self.marian_models.get((source_language, target_language))
+            if model_name is None:
+                raise ValueError(
+                    f"Translation pair {source_language}-{target_language} not supported. "
+                    f"Supported pairs: {list(self.marian_models.keys())}"
+                )
             loop = asyncio.get_event_loop()
             result = await loop.run_in_executor(
                 None,
                 self._translate_sync,
                 text,
-                target_language
+                source_language,
+                target_language,
+                model_name
             )
             return result
 
-    def _translate_sync(self, text: str, target_language: str) -> Dict[str, Any]:
-        inputs = self.trans_tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-        output = self.trans_model.generate(**inputs, max_length=512, num_beams=4, early_stopping=True)
-        translated = self.trans_tokenizer.decode(output[0], skip_special_tokens=True)
+    def _load_marian(self, model_name: str):
+        with self._marian_lock:
+            if model_name not in self._marian_loaded:
+                tokenizer = MarianTokenizer.from_pretrained(model_name)
+                model = MarianMTModel.from_pretrained(model_name)
+                self._marian_loaded[model_name] = (model, tokenizer)
+            return self._marian_loaded[model_name]
+
+    def _translate_sync(self, text: str, source_language: str, target_language: str, model_name: str) -> Dict[str, Any]:
+        model, tokenizer = self._load_marian(model_name)
+        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
+        output = model.generate(**inputs, max_length=512, num_beams=4, early_stopping=True)
+        translated = tokenizer.decode(output[0], skip_special_tokens=True)
         return {
             "translated_text": translated,
+            "source_language": source_language,
             "target_language": target_language,
+            "model_used": model_name,
             "original_text": text
         }
 
+    async def transcribe_and_translate(
+        self,
+        audio_bytes: bytes,
+        target_language: str = "fr",
+        language: Optional[str] = None,
+        backend: str = "marianmt"
+    ) -> Dict[str, Any]:
+        """ASR then MT, handing Whisper's detected language to translation instead of re-detecting it."""
+        transcription = await self.asr_whisper(audio_bytes, language=language)
+        context = LanguageContext.from_asr(transcription)
+        translation = await self.translate(
+            transcription["text"], target_language=target_language, backend=backend, language_context=context
+        )
+        return {"transcription": transcription, "translation": translation, "language_context": context.to_dict()}
+
     async def synthesize(self, text: str, language: str = "fr", speaker_wav: Optional[bytes] = None, backend: str = "xtts") -> bytes:
         loop = asyncio.get_event_loop()
         if backend == "elevenlabs" and self.elevenlabs:
@@ -190,47 +277,20 @@ class PipelineService:
         return float(np.dot(emb1_norm, emb2_norm))
 
     def word_level_diff(self, ref_text: str, hyp_text: str) -> list:
-        ref_words = ref_text.strip().split()
-        hyp_words = hyp_text.strip().split()
-        matcher = SequenceMatcher(None, ref_words, hyp_words)
-        diff_result = []
-        for opcode, i1, i2, j1, j2 in matcher.get_opcodes():
-            if opcode == 'equal':
-                for w in ref_words[i1:i2]:
-                    diff_result.append({"word": w, "status": "correct"})
-            elif opcode == 'replace':
-                for w in ref_words[i1:i2]:
-                    diff_result.append({"word": w, "status": "mismatch"})
-                for w in hyp_words[j1:j2]:
-                    diff_result.append({"word": w, "status": "mismatch"})
-            elif opcode == 'delete':
-                for w in ref_words[i1:i2]:
-                    diff_result.append({"word": w, "status": "missing"})
-            elif opcode == 'insert':
-                for w in hyp_words[j1:j2]:
-                    diff_result.append({"word": w, "status": "extra"})
-        return diff_result
+        return text_alignment.word_level_diff(ref_text, hyp_text)
+
+    def word_error_rate(self, ref_text: str, hyp_text: str) -> Dict[str, Any]:
+        return text_alignment.align_texts(ref_text, hyp_text).to_dict()
 
     def colorize_diff(self, diff: list) -> str:
-        html = []
-        for item in diff:
-            word = item["word"]
-            status = item["status"]
-            if status == "correct":
-                html.append(f'<span style="color:green">{word}</span>')
-            elif status == "missing":
-                html.append(f'<span style="color:red;text-decoration:line-through">{word}</span>')
-            elif status == "extra":
-                html.append(f'<span style="color:orange;text-decoration:underline">{word}</span>')
-            elif status == "mismatch":
-                html.append(f'<span style="color:blue;font-style:italic">{word}</span>')
-        return " ".join(html)
+        return text_alignment.colorize_diff(diff)
 
 
 # Example usage (in an async FastAPI endpoint)
 # pipeline = PipelineService()
 # transcription = await pipeline.asr_whisper(audio_bytes)
-# translation = await pipeline.translate(transcription["text"], target_language="fr")
+# translation = await pipeline.translate(transcription["text"], target_language="fr",
+#                                        language_context=LanguageContext.from_asr(transcription))
 # tts_audio = await pipeline.synthesize(translation["translated_text"], language="fr", speaker_wav=reference_audio)
 # similarity = pipeline.speaker_similarity(reference_audio, tts_audio)
 # diff = pipeline.word_level_diff(transcription["text"], translation["translated_text"])
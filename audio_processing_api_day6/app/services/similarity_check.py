@@ -3,49 +3,151 @@ Speaker similarity and word-level difference highlighting service.
 Compares speaker embeddings and highlights transcription mismatches.
 """
 
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence
+
 from resemblyzer import VoiceEncoder, preprocess_wav
+from resemblyzer.audio import wav_to_mel_spectrogram
+import librosa
 import numpy as np
-from typing import List, Dict, Any
-import difflib
+import torch
+
+from app.core.config import get_settings
+from app.utils import text_alignment
+
+settings = get_settings()
+
+# Resemblyzer defaults: ~1.3 partial utterances per second, drop a trailing partial below 75% coverage
+PARTIALS_RATE = 1.3
+PARTIALS_MIN_COVERAGE = 0.75
+
+
+def prepare_partials(audio: bytes) -> np.ndarray:
+    """
+    Decode and preprocess one utterance into its stacked mel partials.
+    Runs in a worker process; returns float32 (n_partials, n_frames, n_mels).
+    """
+    wav, sr = librosa.load(io.BytesIO(audio), sr=None, mono=True)
+    wav = preprocess_wav(wav, source_sr=sr)
+    if len(wav) == 0:
+        raise ValueError("No speech found in audio")
+    wav_slices, mel_slices = VoiceEncoder.compute_partial_slices(len(wav), PARTIALS_RATE, PARTIALS_MIN_COVERAGE)
+    max_wave_length = wav_slices[-1].stop
+    if max_wave_length >= len(wav):
+        wav = np.pad(wav, (0, max_wave_length - len(wav)), "constant")
+    mel = wav_to_mel_spectrogram(wav)
+    return np.stack([mel[s] for s in mel_slices]).astype(np.float32, copy=False)
+
 
 class SimilarityCheckService:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, max_batch_partials: Optional[int] = None):
         self.encoder = VoiceEncoder()
+        self.max_workers = max_workers or settings.SIMILARITY_WORKERS
+        self.max_batch_partials = max_batch_partials or settings.SIMILARITY_MAX_BATCH_PARTIALS
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    async def _prepare_all(self, audio_list: Sequence[bytes]) -> List[Any]:
+        """Decode/preprocess all audios in the process pool; failures are returned as exceptions."""
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        return await asyncio.gather(
+            *(loop.run_in_executor(pool, prepare_partials, audio) for audio in audio_list),
+            return_exceptions=True
+        )
+
+    def _embed_partials(self, partials: List[np.ndarray]) -> np.ndarray:
+        """
+        Embed many utterances at once: all mel partials are stacked and pushed through the
+        encoder in as few forward passes as possible, then averaged per utterance.
+        Returns L2-normalized embeddings of shape (n_utterances, embedding_size).
+        """
+        counts = np.array([len(p) for p in partials])
+        mels = np.concatenate(partials, axis=0)
+        partial_embeds = []
+        with torch.no_grad():
+            for start in range(0, len(mels), self.max_batch_partials):
+                batch = torch.from_numpy(mels[start:start + self.max_batch_partials]).to(self.encoder.device)
+                partial_embeds.append(self.encoder(batch).cpu().numpy())
+        partial_embeds = np.concatenate(partial_embeds, axis=0)
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        raw = np.add.reduceat(partial_embeds, offsets, axis=0) / counts[:, None]
+        return raw / np.linalg.norm(raw, axis=1, keepdims=True)
+
+    async def embed_batch(self, audio_list: Sequence[bytes]) -> List[Any]:
+        """
+        Compute normalized speaker embeddings for many audios.
+        Entries that fail to decode are returned as the raised exception instead of an embedding.
+        """
+        prepared = await self._prepare_all(audio_list)
+        ok = [i for i, p in enumerate(prepared) if not isinstance(p, BaseException)]
+        results: List[Any] = list(prepared)
+        if ok:
+            loop = asyncio.get_running_loop()
+            embeds = await loop.run_in_executor(None, self._embed_partials, [prepared[i] for i in ok])
+            for row, i in enumerate(ok):
+                results[i] = embeds[row]
+        return results
+
+    async def similarity_matrix(
+        self,
+        references: Sequence[bytes],
+        candidates: Sequence[bytes]
+    ) -> Dict[str, Any]:
+        """
+        Score every candidate against every reference with a single matrix multiply.
+        Returns the (n_references, n_candidates) cosine matrix with None for failed inputs,
+        plus per-input error messages.
+        """
+        embeds = await self.embed_batch(list(references) + list(candidates))
+        ref_embeds, cand_embeds = embeds[:len(references)], embeds[len(references):]
+        ref_ok = [i for i, e in enumerate(ref_embeds) if isinstance(e, np.ndarray)]
+        cand_ok = [j for j, e in enumerate(cand_embeds) if isinstance(e, np.ndarray)]
+        matrix: List[List[Optional[float]]] = [[None] * len(candidates) for _ in references]
+        if ref_ok and cand_ok:
+            scores = np.stack([ref_embeds[i] for i in ref_ok]) @ np.stack([cand_embeds[j] for j in cand_ok]).T
+            for r, i in enumerate(ref_ok):
+                for c, j in enumerate(cand_ok):
+                    matrix[i][j] = float(scores[r, c])
+        return {
+            "matrix": matrix,
+            "reference_errors": {i: str(e) for i, e in enumerate(ref_embeds) if not isinstance(e, np.ndarray)},
+            "candidate_errors": {j: str(e) for j, e in enumerate(cand_embeds) if not isinstance(e, np.ndarray)}
+        }
 
     async def compare(self, audio1: bytes, audio2: bytes) -> float:
         """Compute cosine similarity between two audio samples."""
-        wav1 = preprocess_wav(audio1)
-        wav2 = preprocess_wav(audio2)
-        emb1 = self.encoder.embed_utterance(wav1)
-        emb2 = self.encoder.embed_utterance(wav2)
-        emb1_norm = emb1 / np.linalg.norm(emb1)
-        emb2_norm = emb2 / np.linalg.norm(emb2)
-        similarity = float(np.dot(emb1_norm, emb2_norm))
-        return similarity
+        emb1, emb2 = await self.embed_batch([audio1, audio2])
+        for emb in (emb1, emb2):
+            if not isinstance(emb, np.ndarray):
+                raise emb
+        return float(np.dot(emb1, emb2))
 
     async def batch_compare(self, reference_audio: bytes, audio_list: List[bytes]) -> List[Dict[str, Any]]:
         """Batch compare reference audio to a list of audios."""
-        ref_wav = preprocess_wav(reference_audio)
-        ref_emb = self.encoder.embed_utterance(ref_wav)
-        ref_emb_norm = ref_emb / np.linalg.norm(ref_emb)
+        scored = await self.similarity_matrix([reference_audio], audio_list)
+        if scored["reference_errors"]:
+            raise ValueError(f"Reference audio could not be processed: {scored['reference_errors'][0]}")
         results = []
-        for idx, audio in enumerate(audio_list):
-            try:
-                wav = preprocess_wav(audio)
-                emb = self.encoder.embed_utterance(wav)
-                emb_norm = emb / np.linalg.norm(emb)
-                score = float(np.dot(ref_emb_norm, emb_norm))
+        for idx, score in enumerate(scored["matrix"][0]):
+            if score is not None:
                 results.append({
                     "index": idx,
                     "similarity": score,
                     "success": True
                 })
-            except Exception as e:
+            else:
                 results.append({
                     "index": idx,
                     "similarity": None,
                     "success": False,
-                    "error": str(e)
+                    "error": scored["candidate_errors"].get(idx, "unknown error")
                 })
         return results
 
@@ -55,26 +157,11 @@ class SimilarityCheckService:
         Returns a list of dicts: {word, status}
         status: 'correct', 'missing', 'extra', 'mismatch'
         """
-        ref_words = ref_text.strip().split()
-        hyp_words = hyp_text.strip().split()
-        matcher = difflib.SequenceMatcher(None, ref_words, hyp_words)
-        diff_result = []
-        for opcode, i1, i2, j1, j2 in matcher.get_opcodes():
-            if opcode == 'equal':
-                for w in ref_words[i1:i2]:
-                    diff_result.append({"word": w, "status": "correct"})
-            elif opcode == 'replace':
-                for w in ref_words[i1:i2]:
-                    diff_result.append({"word": w, "status": "mismatch"})
-                for w in hyp_words[j1:j2]:
-                    diff_result.append({"word": w, "status": "mismatch"})
-            elif opcode == 'delete':
-                for w in ref_words[i1:i2]:
-                    diff_result.append({"word": w, "status": "missing"})
-            elif opcode == 'insert':
-                for w in hyp_words[j1:j2]:
-                    diff_result.append({"word": w, "status": "extra"})
-        return diff_result
+        return text_alignment.word_level_diff(ref_text, hyp_text)
+
+    def word_error_rate(self, ref_text: str, hyp_text: str) -> Dict[str, Any]:
+        """WER with substitution/deletion/insertion counts from the same alignment."""
+        return text_alignment.align_texts(ref_text, hyp_text).to_dict()
 
     def colorize_diff(self, diff: List[Dict[str, Any]]) -> str:
         """
@@ -84,16 +171,4 @@ class SimilarityCheckService:
         - extra: orange (underline)
         - mismatch: blue (italic)
         """
-        html = []
-        for item in diff:
-            word = item["word"]
-            status = item["status"]
-            if status == "correct":
-                html.append(f'<span style="color:green">{word}</span>')
-            elif status == "missing":
-                html.append(f'<span style="color:red;text-decoration:line-through">{word}</span>')
-            elif status == "extra":
-                html.append(f'<span style="color:orange;text-decoration:underline">{word}</span>')
-            elif status == "mismatch":
-                html.append(f'<span style="color:blue;font-style:italic">{word}</span>')
-        return " ".join(html)
+        return text_alignment.colorize_diff(diff)
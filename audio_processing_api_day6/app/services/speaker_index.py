@@ -0,0 +1,232 @@
+"""
+Persistent speaker-embedding index for voice search and deduplication.
+Stores L2-normalized embeddings in a memory-mapped float32 matrix with a JSON id map,
+and answers top-k nearest-speaker queries by brute-force BLAS or an optional FAISS HNSW index.
+Enrollment is O(1) amortized: the id map is a snapshot plus an append-only journal that is
+compacted once it outgrows the snapshot, and new rows are added to a built HNSW graph in
+place (it is only rebuilt after a removal or an overwritten embedding).
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:
+    HAS_FAISS = False
+
+settings = get_settings()
+
+MATRIX_FILE = "embeddings.f32"
+IDS_FILE = "ids.json"
+JOURNAL_FILE = "ids.journal"
+MIN_COMPACT_ENTRIES = 1024
+
+
+class SpeakerIndex:
+    """Append/update/remove speaker embeddings and search them by cosine similarity."""
+
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        dim: int = 256,
+        initial_capacity: int = 1024,
+        ann_min_size: Optional[int] = None
+    ):
+        self.index_dir = index_dir or settings.SPEAKER_INDEX_DIR
+        self.ann_min_size = ann_min_size if ann_min_size is not None else settings.SPEAKER_INDEX_ANN_MIN_SIZE
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._matrix_path = os.path.join(self.index_dir, MATRIX_FILE)
+        self._ids_path = os.path.join(self.index_dir, IDS_FILE)
+        self._journal_path = os.path.join(self.index_dir, JOURNAL_FILE)
+        self._journal_entries = 0
+        self._lock = threading.RLock()
+        self._ann = None
+
+        if os.path.exists(self._ids_path):
+            with open(self._ids_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.dim = state["dim"]
+            self._ids: List[str] = state["ids"]
+            self._metadata: Dict[str, Dict[str, Any]] = state.get("metadata", {})
+            capacity = os.path.getsize(self._matrix_path) // (4 * self.dim)
+        else:
+            self.dim = dim
+            self._ids, self._metadata = [], {}
+            capacity = initial_capacity
+            with open(self._matrix_path, "wb") as f:
+                f.truncate(capacity * self.dim * 4)
+            self._save_ids()
+        self._rows = {speaker_id: row for row, speaker_id in enumerate(self._ids)}
+        self._replay_journal()
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, speaker_id: str) -> bool:
+        return speaker_id in self._rows
+
+    @property
+    def speaker_ids(self) -> List[str]:
+        return list(self._ids)
+
+    def _save_ids(self):
+        """Write a full id/metadata snapshot and start an empty journal."""
+        tmp_path = self._ids_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "ids": self._ids, "metadata": self._metadata}, f)
+        os.replace(tmp_path, self._ids_path)
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
+        self._journal_entries = 0
+
+    def _journal(self, entry: Dict[str, Any]):
+        """Append one add/remove to the journal; compact once it outgrows the snapshot."""
+        with open(self._journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._journal_entries += 1
+        if self._journal_entries >= max(MIN_COMPACT_ENTRIES, len(self._ids)):
+            self._save_ids()
+
+    def _replay_journal(self):
+        if not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn final line from a crash; its row is simply reused
+                if entry["op"] == "add":
+                    self._add_id(entry["id"], entry.get("metadata"))
+                else:
+                    self._remove_id(entry["id"])
+                self._journal_entries += 1
+
+    def _add_id(self, speaker_id: str, metadata: Optional[Dict[str, Any]]) -> Tuple[int, bool]:
+        """Map `speaker_id` to a row (a new one at the end if unknown); returns (row, is_new)."""
+        row = self._rows.get(speaker_id)
+        is_new = row is None
+        if is_new:
+            row = len(self._ids)
+            self._ids.append(speaker_id)
+            self._rows[speaker_id] = row
+        if metadata is not None:
+            self._metadata[speaker_id] = metadata
+        return row, is_new
+
+    def _remove_id(self, speaker_id: str) -> Optional[Tuple[int, int]]:
+        """Unmap `speaker_id`, moving the last id into its slot; returns (row, last) or None."""
+        row = self._rows.pop(speaker_id, None)
+        if row is None:
+            return None
+        last = len(self._ids) - 1
+        if row != last:
+            moved = self._ids[last]
+            self._ids[row] = moved
+            self._rows[moved] = row
+        self._ids.pop()
+        self._metadata.pop(speaker_id, None)
+        return row, last
+
+    def _grow(self):
+        """Double the backing file and remap it."""
+        capacity = self._matrix.shape[0] * 2
+        self._matrix.flush()
+        del self._matrix
+        with open(self._matrix_path, "r+b") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _normalize(self, embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dim:
+            raise ValueError(f"Expected embedding of size {self.dim}, got {vector.shape[0]}")
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            raise ValueError("Cannot index a zero embedding")
+        return vector / norm
+
+    def add(self, speaker_id: str, embedding: np.ndarray, metadata: Optional[Dict[str, Any]] = None):
+        """Insert a speaker, or overwrite the embedding of an existing one."""
+        vector = self._normalize(embedding)
+        with self._lock:
+            if speaker_id not in self._rows and len(self._ids) == self._matrix.shape[0]:
+                self._grow()
+            row, is_new = self._add_id(speaker_id, metadata)
+            self._matrix[row] = vector
+            self._matrix.flush()
+            self._journal({"op": "add", "id": speaker_id, "metadata": metadata})
+            if self._ann is not None:
+                if is_new and self._ann.ntotal == row:
+                    self._ann.add(vector[None, :])
+                else:
+                    # HNSW cannot replace a vector in place
+                    self._ann = None
+
+    def remove(self, speaker_id: str) -> bool:
+        """Delete a speaker by moving the last row into its slot."""
+        with self._lock:
+            removed = self._remove_id(speaker_id)
+            if removed is None:
+                return False
+            row, last = removed
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+            self._matrix.flush()
+            self._journal({"op": "remove", "id": speaker_id})
+            self._ann = None
+            return True
+
+    def get_metadata(self, speaker_id: str) -> Optional[Dict[str, Any]]:
+        return self._metadata.get(speaker_id)
+
+    def _ann_index(self):
+        if self._ann is None:
+            index = faiss.IndexHNSWFlat(self.dim, 32, faiss.METRIC_INNER_PRODUCT)
+            index.add(np.ascontiguousarray(self._matrix[:len(self._ids)]))
+            self._ann = index
+        return self._ann
+
+    def search(self, embedding: np.ndarray, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Return the top-k most similar speakers, best first."""
+        query = self._normalize(embedding)
+        with self._lock:
+            count = len(self._ids)
+            if count == 0:
+                return []
+            top_k = min(top_k, count)
+            if HAS_FAISS and self.ann_min_size and count >= self.ann_min_size:
+                scores, rows = self._ann_index().search(query[None, :], top_k)
+                hits = [(int(r), float(s)) for r, s in zip(rows[0], scores[0]) if r >= 0]
+            else:
+                scores = self._matrix[:count] @ query
+                rows = np.argpartition(-scores, top_k - 1)[:top_k]
+                rows = rows[np.argsort(-scores[rows])]
+                hits = [(int(r), float(scores[r])) for r in rows]
+            return [
+                {"speaker_id": self._ids[row], "similarity": score, "metadata": self._metadata.get(self._ids[row])}
+                for row, score in hits
+            ]
+
+    def near_duplicates(self, threshold: float = 0.9, block_size: int = 4096) -> List[Tuple[str, str, float]]:
+        """List speaker pairs whose similarity is at least `threshold`, computed block-wise."""
+        with self._lock:
+            count = len(self._ids)
+            matrix = self._matrix[:count]
+            pairs = []
+            for start in range(0, count, block_size):
+                block = matrix[start:start + block_size] @ matrix[start:].T
+                rows, cols = np.nonzero(block >= threshold)
+                for r, c in zip(rows, cols):
+                    i, j = start + int(r), start + int(c)
+                    if j > i:
+                        pairs.append((self._ids[i], self._ids[j], float(block[r, c])))
+            return sorted(pairs, key=lambda pair: -pair[2])
@@ -0,0 +1,330 @@
+"""
+Sentence-level translation memory (TM) consulted before the NMT model.
+Segments are stored in SQLite under a hash of the whitespace/Unicode-normalized source,
+so exact repeats are a single indexed lookup. Near-duplicates are found through a
+MinHash LSH index over character shingles (band buckets stored alongside the segments)
+and ranked by word-level edit similarity from the shared alignment utility.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.observability import TRANSLATION_MEMORY_LOOKUPS
+from app.utils.text_alignment import align_words
+
+settings = get_settings()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_language TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    source_hash TEXT NOT NULL,
+    source_text TEXT NOT NULL,
+    target_text TEXT NOT NULL,
+    confidence REAL,
+    model TEXT,
+    created_at REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_segments_pair_hash
+    ON segments (source_language, target_language, source_hash);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    pair TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    segment_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_lookup ON lsh_buckets (pair, band, bucket);
+"""
+
+# Sentence boundaries: whitespace after terminal punctuation, or any run containing a line break
+_SENTENCE_RE = re.compile(r"(?<=[.!?。！？])\s+|\s*\n\s*")
+_WS_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+# Mersenne-style prime below 2**32 so (a * x) stays within uint64
+_PRIME = np.uint64(4294967291)
+
+
+def normalize_segment(text: str) -> str:
+    """NFKC-normalize and collapse whitespace; this is the exact-match key."""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def split_sentences(text: str) -> List[Tuple[str, str]]:
+    """
+    Split text into (sentence, separator) pairs for TM lookup, where the separator is the
+    whitespace that followed the sentence ("\n" for line breaks), so that joining
+    `sentence + separator` over translated pairs keeps the paragraph layout.
+    """
+    pieces, start = [], 0
+    for boundary in _SENTENCE_RE.finditer(text):
+        sentence = text[start:boundary.start()].strip()
+        if sentence:
+            pieces.append((sentence, "\n" * boundary.group().count("\n") or " "))
+        start = boundary.end()
+    tail = text[start:].strip()
+    if tail:
+        pieces.append((tail, ""))
+    elif pieces:
+        pieces[-1] = (pieces[-1][0], "")
+    return pieces
+
+
+def segment_similarity(a: str, b: str) -> float:
+    """1 - word edit distance / longer length, on casefolded word and punctuation tokens."""
+    a_words = _WORD_RE.findall(a.casefold())
+    b_words = _WORD_RE.findall(b.casefold())
+    longest = max(len(a_words), len(b_words))
+    if longest == 0:
+        return 1.0
+    return 1.0 - align_words(a_words, b_words).errors / longest
+
+
+@dataclass
+class TMMatch:
+    """A translation memory hit for one source segment."""
+    source_text: str
+    target_text: str
+    similarity: float
+    exact: bool
+    confidence: Optional[float] = None
+    model: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class MinHasher:
+    """MinHash signatures over character shingles, banded for LSH bucketing."""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 4, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """crc32 hashes of the casefolded character n-grams (the whole text if shorter)."""
+        text = normalize_segment(text).casefold()
+        k = self.shingle_size
+        grams = {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> np.ndarray:
+        """Minimum of each of the `num_perm` universal hashes over the shingle set."""
+        x = self.shingles(text)
+        hashed = ((x[:, None] * self._a) % _PRIME + self._b) % _PRIME
+        return hashed.min(axis=0)
+
+    def band_buckets(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit bucket id per band (fits an SQLite INTEGER)."""
+        rows = signature.reshape(self.bands, self.rows)
+        return [
+            int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), "little", signed=True)
+            for row in rows
+        ]
+
+
+class TranslationMemory:
+    """SQLite-backed translation memory with exact and MinHash-LSH fuzzy lookup."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        fuzzy_threshold: Optional[float] = None,
+        max_candidates: int = 50,
+        num_perm: int = 64,
+        bands: int = 16
+    ):
+        self.db_path = db_path or settings.TRANSLATION_MEMORY_PATH
+        self.fuzzy_threshold = fuzzy_threshold if fuzzy_threshold is not None else settings.TM_FUZZY_THRESHOLD
+        self.max_candidates = max_candidates
+        self.hasher = MinHasher(num_perm=num_perm, bands=bands)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _hash(normalized: str) -> str:
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pair(source_language: str, target_language: str) -> str:
+        return f"{source_language}-{target_language}"
+
+    def add(
+        self,
+        source_text: str,
+        target_text: str,
+        source_language: str,
+        target_language: str,
+        confidence: Optional[float] = None,
+        model: Optional[str] = None
+    ) -> int:
+        """Store (or overwrite) one segment translation and return its id."""
+        return self.add_many([(source_text, target_text, confidence)], source_language, target_language, model)[0]
+
+    def add_many(
+        self,
+        entries: Iterable[Tuple[str, str, Optional[float]]],
+        source_language: str,
+        target_language: str,
+        model: Optional[str] = None
+    ) -> List[int]:
+        """Store (source, target, confidence) segments in one transaction; returns their ids."""
+        pair = self._pair(source_language, target_language)
+        ids = []
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            for source_text, target_text, confidence in entries:
+                normalized = normalize_segment(source_text)
+                if not normalized:
+                    continue
+                source_hash = self._hash(normalized)
+                row = conn.execute(
+                    "SELECT id FROM segments WHERE source_language = ? AND target_language = ? AND source_hash = ?",
+                    (source_language, target_language, source_hash)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE segments SET target_text = ?, confidence = ?, model = ?, created_at = ? WHERE id = ?",
+                        (target_text, confidence, model, now, row[0])
+                    )
+                    ids.append(row[0])
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO segments (source_language, target_language, source_hash, source_text, "
+                    "target_text, confidence, model, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (source_language, target_language, source_hash, normalized, target_text, confidence, model, now)
+                )
+                segment_id = cursor.lastrowid
+                buckets = self.hasher.band_buckets(self.hasher.signature(normalized))
+                conn.executemany(
+                    "INSERT INTO lsh_buckets (pair, band, bucket, segment_id) VALUES (?, ?, ?, ?)",
+                    [(pair, band, bucket, segment_id) for band, bucket in enumerate(buckets)]
+                )
+                ids.append(segment_id)
+        return ids
+
+    def _fuzzy_candidates(self, conn: sqlite3.Connection, pair: str, normalized: str) -> List[tuple]:
+        """Segments sharing at least one LSH band bucket, most shared bands first."""
+        buckets = self.hasher.band_buckets(self.hasher.signature(normalized))
+        clauses = " OR ".join(["(band = ? AND bucket = ?)"] * len(buckets))
+        params: List[Any] = [pair]
+        for band, bucket in enumerate(buckets):
+            params += [band, bucket]
+        params.append(self.max_candidates)
+        return conn.execute(
+            f"SELECT s.id, s.source_text, s.target_text, s.confidence, s.model FROM "
+            f"(SELECT segment_id, COUNT(*) AS shared FROM lsh_buckets WHERE pair = ? AND ({clauses}) "
+            f"GROUP BY segment_id ORDER BY shared DESC LIMIT ?) c JOIN segments s ON s.id = c.segment_id",
+            params
+        ).fetchall()
+
+    def lookup_many(
+        self,
+        texts: Sequence[str],
+        source_language: str,
+        target_language: str,
+        fuzzy: bool = True,
+        min_similarity: Optional[float] = None,
+        serve_fuzzy: bool = True
+    ) -> List[Optional[TMMatch]]:
+        """
+        Look up each segment: exact normalized-hash hit first, then (if `fuzzy`) the best
+        LSH candidate whose similarity reaches `min_similarity`. None marks a miss. With
+        `serve_fuzzy=False` fuzzy matches are only hints: they are counted as `hint`
+        lookups instead of `fuzzy` hits and do not bump the segment's hit count.
+        """
+        threshold = self.fuzzy_threshold if min_similarity is None else min_similarity
+        pair = self._pair(source_language, target_language)
+        matches: List[Optional[TMMatch]] = []
+        hit_ids: List[int] = []
+        with self._connect() as conn:
+            for text in texts:
+                normalized = normalize_segment(text)
+                match, match_id = None, None
+                row = conn.execute(
+                    "SELECT id, source_text, target_text, confidence, model FROM segments "
+                    "WHERE source_language = ? AND target_language = ? AND source_hash = ?",
+                    (source_language, target_language, self._hash(normalized))
+                ).fetchone()
+                if row:
+                    match_id = row[0]
+                    match = TMMatch(row[1], row[2], 1.0, True, row[3], row[4])
+                elif fuzzy and normalized:
+                    best = None
+                    for candidate in self._fuzzy_candidates(conn, pair, normalized):
+                        score = segment_similarity(normalized, candidate[1])
+                        if score >= threshold and (best is None or score > best[0]):
+                            best = (score, candidate)
+                    if best:
+                        score, candidate = best
+                        match_id = candidate[0]
+                        match = TMMatch(candidate[1], candidate[2], score, False, candidate[3], candidate[4])
+                served = match is not None and (match.exact or serve_fuzzy)
+                TRANSLATION_MEMORY_LOOKUPS.labels(
+                    "miss" if match is None else "exact" if match.exact else "fuzzy" if served else "hint"
+                ).inc()
+                matches.append(match)
+                if served:
+                    hit_ids.append(match_id)
+            if hit_ids:
+                conn.executemany("UPDATE segments SET hit_count = hit_count + 1 WHERE id = ?", [(i,) for i in hit_ids])
+        return matches
+
+    def lookup(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        fuzzy: bool = True,
+        min_similarity: Optional[float] = None
+    ) -> Optional[TMMatch]:
+        """Look up a single segment; see `lookup_many`."""
+        return self.lookup_many([text], source_language, target_language, fuzzy, min_similarity)[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Segment and hit counts per language pair."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT source_language, target_language, COUNT(*), COALESCE(SUM(hit_count), 0) "
+                "FROM segments GROUP BY source_language, target_language"
+            ).fetchall()
+        pairs = [{"pair": f"{src}-{tgt}", "segments": count, "hits": hits} for src, tgt, count, hits in rows]
+        return {
+            "segments": sum(p["segments"] for p in pairs),
+            "hits": sum(p["hits"] for p in pairs),
+            "pairs": pairs
+        }
@@ -1,15 +1,11 @@
 import io
 import wave
 import numpy as np
-from typing import Tuple, Optional, List, Dict, Any
-from fastapi import HTTPException
+from typing import Tuple, Optional, List, Dict, Any, BinaryIO, Iterator, Union
+from fastapi import HTTPException, UploadFile
 from app.core.config import get_settings
-
-try:
-    import noisereduce as nr
-    HAS_NOISEREDUCE = True
-except ImportError:
-    HAS_NOISEREDUCE = False
+from app.utils.audio_stream import SpooledUpload, decode_blocks, iter_windows, spool_upload
+from app.utils.denoise import StreamingDenoiser, reduce_noise
 
 try:
     import librosa
@@ -32,20 +28,64 @@ class AudioProcessor:
                 status_code=413,
                 detail=f"File size exceeds {settings.MAX_UPLOAD_SIZE_MB}MB limit"
             )
-        file_ext = filename.lower().split('.')[-1]
+        self.validate_format(filename)
+
+    def validate_format(self, filename: str):
+        file_ext = (filename or "").lower().split('.')[-1]
         if file_ext not in self.allowed_formats:
             raise HTTPException(
                 status_code=415,
                 detail=f"Unsupported format. Allowed: {', '.join(self.allowed_formats)}"
             )
 
+    async def read_upload(self, upload: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+        """
+        Stream an upload into a spooled temporary file (memory up to
+        UPLOAD_SPOOL_THRESHOLD_MB, then disk), enforcing the size limit (default
+        MAX_UPLOAD_SIZE_MB) while reading and hashing incrementally. The caller closes
+        the returned SpooledUpload.
+        """
+        self.validate_format(upload.filename)
+        return await spool_upload(
+            upload, max_bytes or self.max_file_size, settings.UPLOAD_SPOOL_THRESHOLD_MB * 1024 * 1024
+        )
+
+    def stream_windows(
+        self,
+        source: Union[SpooledUpload, BinaryIO],
+        window_seconds: float = settings.ASR_WINDOW_SECONDS,
+        denoise: bool = True
+    ) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Decode and resample a spooled upload (or any seekable binary file) block by block,
+        optionally denoise it with the streaming denoiser, and yield (offset_seconds,
+        samples) windows at 16 kHz.
+        """
+        blocks = decode_blocks(getattr(source, "file", source), self.target_sr)
+        if denoise:
+            blocks = self._denoise_blocks(blocks)
+        return iter_windows(blocks, self.target_sr, window_seconds)
+
+    def _denoise_blocks(self, blocks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        """Streaming denoise with the denoiser's latency removed, so samples stay aligned."""
+        denoiser = StreamingDenoiser(self.target_sr)
+        skip = denoiser.latency
+        for block in blocks:
+            out = denoiser.process(block)
+            if skip:
+                dropped = min(skip, len(out))
+                out, skip = out[dropped:], skip - dropped
+            if len(out):
+                yield out
+        tail = denoiser.flush()[skip:]
+        if len(tail):
+            yield tail
+
     async def enhance_audio(self, audio_data: bytes, filename: str = None) -> bytes:
         try:
             audio_array, sr = self._decode_audio(audio_data, filename)
-            if HAS_NOISEREDUCE:
-                reduced_array = nr.reduce_noise(y=audio_array, sr=sr)
-            else:
-                reduced_array = audio_array
+            # Block-wise spectral gating: bounded working memory instead of full-length copies
+            reduced_array = reduce_noise(audio_array, sr)
             normalized_array = self._normalize_audio(reduced_array)
             return self._encode_wav(normalized_array, sr=self.target_sr)
         except Exception:
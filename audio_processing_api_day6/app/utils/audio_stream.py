@@ -0,0 +1,290 @@
+"""
+Bounded-memory audio ingestion: streamed uploads, block-wise decoding and resampling.
+
+Uploads are read in chunks into a SpooledTemporaryFile (in memory up to a threshold,
+then on disk) while the size limit is enforced and the SHA-256 is computed on the fly.
+Decoding then yields fixed-size mono blocks (soundfile for WAV/FLAC/OGG/MP3, ffmpeg for
+everything else) through a stateful polyphase resampler, and `iter_windows` regroups the
+blocks into fixed-length windows for ASR, so peak memory per request is bounded by a few
+windows regardless of file length.
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+from math import gcd
+from typing import BinaryIO, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, UploadFile
+
+try:
+    import soundfile as sf
+    HAS_SOUNDFILE = True
+except ImportError:
+    HAS_SOUNDFILE = False
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class SpooledUpload:
+    """An upload spooled to a temporary file, with its size and SHA-256 digest."""
+    file: BinaryIO
+    filename: str
+    size: int
+    sha256: str
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the spool rolled over from memory to a temporary file."""
+        return bool(getattr(self.file, "_rolled", False))
+
+    def read_bytes(self) -> bytes:
+        """Whole payload as bytes, for consumers that still need it in memory."""
+        self.file.seek(0)
+        data = self.file.read()
+        self.file.seek(0)
+        return data
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def spool_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    spool_threshold: int,
+    chunk_size: int = READ_CHUNK_SIZE
+) -> SpooledUpload:
+    """
+    Copy an upload into a SpooledTemporaryFile chunk by chunk. Raises 413 as soon as
+    more than `max_bytes` have been read instead of after buffering the whole body.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File size exceeds {max_bytes // (1024 * 1024)}MB limit"
+                )
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return SpooledUpload(spool, upload.filename or "", size, digest.hexdigest())
+
+
+class StreamingResampler:
+    """
+    Stateful polyphase FIR resampler (Kaiser-windowed sinc). Blocks of any size go in;
+    the concatenated output equals resampling the whole signal at once, time-aligned
+    (group delay removed) and `ceil(n_in * target / source)` samples long after `flush()`.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int, half_width: int = 16, beta: float = 8.0):
+        divisor = gcd(orig_sr, target_sr)
+        self.up = target_sr // divisor
+        self.down = orig_sr // divisor
+        self.passthrough = self.up == self.down
+        if self.passthrough:
+            return
+        n_taps = 2 * half_width * max(self.up, self.down) + 1
+        cutoff = 1.0 / max(self.up, self.down)
+        t = np.arange(n_taps) - (n_taps - 1) / 2
+        h = self.up * cutoff * np.sinc(cutoff * t) * np.kaiser(n_taps, beta)
+        self.taps = -(-n_taps // self.up)
+        h = np.pad(h, (0, self.taps * self.up - n_taps))
+        # phases[p, k] multiplies input x[i - k] for outputs at phase p; reversed for dot products
+        self.phases = h.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+        self.delay = (n_taps - 1) // 2 / self.down
+        self.reset()
+
+    def reset(self) -> None:
+        if self.passthrough:
+            return
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._consumed = 0  # global index of the first sample after the history
+        self._next_out = int(round(self.delay))
+        self._emitted = 0
+        self._n_in = 0
+
+    def _produce(self, block: np.ndarray) -> np.ndarray:
+        buffer = np.concatenate([self._history, block])
+        end = self._consumed + len(block)  # global input samples available: [.., end)
+        # Outputs n need input index (n * down) // up < end
+        last = max(self._next_out, -(-end * self.up // self.down))
+        position = np.arange(self._next_out, last) * self.down
+        index, phase = position // self.up, position % self.up
+        # Window [index - taps + 1, index] starts at buffer position index - consumed
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps)[index - self._consumed]
+        out = np.einsum("ij,ij->i", windows, self.phases[phase]).astype(np.float32)
+        self._next_out = last
+        self._history = buffer[len(buffer) - (self.taps - 1):]
+        self._consumed = end
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        block = np.asarray(block, dtype=np.float32)
+        if self.passthrough:
+            return block
+        self._n_in += len(block)
+        out = self._produce(block)
+        self._emitted += len(out)
+        return out
+
+    def flush(self) -> np.ndarray:
+        """Feed zeros through the filter tail and trim to the exact output length."""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._n_in * self.up // self.down)
+        tail = self._produce(np.zeros(self.taps + self.down, dtype=np.float32))
+        tail = tail[:max(0, total - self._emitted)]
+        self.reset()
+        return tail
+
+
+def _soundfile_blocks(file: BinaryIO, block_seconds: float) -> Tuple[int, Iterator[np.ndarray]]:
+    info = sf.SoundFile(file)
+    block_frames = max(1, int(block_seconds * info.samplerate))
+
+    def blocks():
+        with info:
+            for block in info.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+                yield block.mean(axis=1) if block.shape[1] > 1 else block[:, 0]
+    return info.samplerate, blocks()
+
+
+def _seekable_path(file: BinaryIO) -> Tuple[Optional[str], Tuple[int, ...]]:
+    """
+    A path ffmpeg can open (and seek) for `file`, plus file descriptors to pass to it.
+    Spooled uploads are rolled over to disk first; unlinked temporary files are reached
+    through /dev/fd. Returns (None, ()) when the data only exists in memory.
+    """
+    if hasattr(file, "rollover"):
+        file.rollover()
+        file = file._file
+    name = getattr(file, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, ()
+    if isinstance(name, int) and os.path.exists(f"/dev/fd/{name}"):
+        return f"/dev/fd/{name}", (name,)
+    return None, ()
+
+
+def _ffmpeg_blocks(file: BinaryIO, target_sr: int, block_frames: int) -> Iterator[np.ndarray]:
+    """
+    Decode any ffmpeg-readable file to mono float32 at `target_sr`, streamed out through a
+    pipe. The input is opened by path when possible: containers such as MP4/M4A with the
+    moov atom at the end cannot be demuxed from a non-seekable pipe.
+    """
+    path, pass_fds = _seekable_path(file)
+    process = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", path or "pipe:0",
+         "-f", "s16le", "-ac", "1", "-ar", str(target_sr), "pipe:1"],
+        stdin=subprocess.DEVNULL if path else subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, pass_fds=pass_fds
+    )
+
+    def feed():
+        try:
+            for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), b""):
+                process.stdin.write(chunk)
+        except (BrokenPipeError, ValueError):
+            pass
+        finally:
+            process.stdin.close()
+
+    writer = None
+    if path is None:
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+    remainder = b""
+    try:
+        while True:
+            data = process.stdout.read(block_frames * 2)
+            if not data:
+                break
+            # Pipe reads may split a sample; carry the odd byte into the next read
+            data = remainder + data
+            usable = len(data) - len(data) % 2
+            remainder = data[usable:]
+            yield np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+    finally:
+        process.stdout.close()
+        process.wait()
+        if writer is not None:
+            writer.join()
+    if process.returncode:
+        raise HTTPException(status_code=415, detail="Could not decode audio stream")
+
+
+def decode_blocks(
+    file: BinaryIO,
+    target_sr: int = 16000,
+    block_seconds: float = 1.0
+) -> Iterator[np.ndarray]:
+    """Yield mono float32 blocks at `target_sr`; memory is bounded by one block."""
+    file.seek(0)
+    blocks = None
+    if HAS_SOUNDFILE:
+        try:
+            orig_sr, blocks = _soundfile_blocks(file, block_seconds)
+        except Exception:
+            file.seek(0)
+    if blocks is None:
+        if shutil.which("ffmpeg") is None:
+            raise HTTPException(status_code=415, detail="Unsupported or undecodable audio (ffmpeg not available)")
+        yield from _ffmpeg_blocks(file, target_sr, int(block_seconds * target_sr))
+        return
+    resampler = StreamingResampler(orig_sr, target_sr)
+    for block in blocks:
+        out = resampler.process(block)
+        if len(out):
+            yield out
+    tail = resampler.flush()
+    if len(tail):
+        yield tail
+
+
+def iter_windows(
+    blocks: Iterable[np.ndarray],
+    sample_rate: int = 16000,
+    window_seconds: float = 30.0
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """Regroup blocks into (start_seconds, window) pairs of `window_seconds` (last one shorter)."""
+    window_samples = int(window_seconds * sample_rate)
+    window = np.empty(window_samples, dtype=np.float32)
+    filled = 0
+    start = 0
+    for block in blocks:
+        while len(block):
+            take = min(len(block), window_samples - filled)
+            window[filled:filled + take] = block[:take]
+            filled += take
+            block = block[take:]
+            if filled == window_samples:
+                yield start / sample_rate, window.copy()
+                start += filled
+                filled = 0
+    if filled:
+        yield start / sample_rate, window[:filled].copy()
+
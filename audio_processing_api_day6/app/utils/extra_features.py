@@ -1,5 +1,10 @@
+from typing import Optional, Union
+
+import numpy as np
 import webrtcvad
-from langdetect import detect
+
+from app.utils.lang_detect import LanguageContext, resolve_language
+from app.utils.vad import VadResult, detect_speech, voiced_audio
 
 class NoiseSuppressor:
     def __init__(self, aggressiveness=3):
@@ -12,7 +17,32 @@ class NoiseSuppressor:
 
     def filter_speech(self, audio_frames: list, sample_rate: int) -> list:
         """Filter and return only speech frames from the list of audio frames."""
-        return [frame for frame in audio_frames if self.is_speech(frame, sample_rate)]
+        mask = self.speech_mask(audio_frames, sample_rate)
+        return [frame for frame, keep in zip(audio_frames, mask) if keep]
+
+    def speech_mask(self, audio_frames: list, sample_rate: int) -> np.ndarray:
+        """Boolean speech decision for each pre-split frame (memoryview, no copies)."""
+        return np.fromiter(
+            (self.vad.is_speech(memoryview(frame), sample_rate) for frame in audio_frames),
+            dtype=bool, count=len(audio_frames)
+        )
+
+    def detect(
+        self,
+        audio: Union[np.ndarray, bytes],
+        sample_rate: int,
+        frame_ms: int = 30,
+        padding_ms: int = 0,
+        min_silence_ms: int = 0
+    ) -> VadResult:
+        """Frame mask and merged speech segments for a whole signal (float, int16 or PCM bytes)."""
+        return detect_speech(audio, sample_rate, frame_ms=frame_ms, padding_ms=padding_ms,
+                             min_silence_ms=min_silence_ms, vad=self.vad)
+
+    def filter_audio(self, audio: np.ndarray, sample_rate: int, padding_ms: int = 0, min_silence_ms: int = 0) -> np.ndarray:
+        """Return only the speech samples of a whole signal, gathered in one NumPy pass."""
+        result = self.detect(audio, sample_rate, padding_ms=padding_ms, min_silence_ms=min_silence_ms)
+        return voiced_audio(audio, result, padded=bool(padding_ms or min_silence_ms))
 
 class SpeakerDiarizer:
     def diarize(self, audio_path: str):
@@ -34,12 +64,13 @@ class LanguageRouter:
         """
         self.translation_models = translation_models
 
-    def route(self, text: str):
+    def route(self, text: str, context: Optional[LanguageContext] = None):
         """
         Detect source language and return the appropriate translation model.
+        A reliable `context` from ASR is used as-is instead of detecting from text.
         Defaults to English model if language is unsupported.
         """
-        src_lang = detect(text)
+        src_lang = resolve_language(text, context).language
         if src_lang not in self.translation_models:
             src_lang = "en"  # Default to English if unsupported
         return self.translation_models[src_lang]
@@ -0,0 +1,350 @@
+"""
+Fast batched language identification.
+
+Texts are scored with a hashed character n-gram (1-3) naive Bayes model whose
+log-probability tables live in a NumPy matrix (languages x buckets). A whole batch is
+hashed in one vectorized pass over the concatenated code points and scored with a
+single sparse matrix product. CJK scripts are resolved directly from code point ranges,
+short strings are memoized, and every result carries a confidence (posterior) score.
+
+Tables are trained from any labelled text (`NgramLanguageIdentifier.train`) or built
+offline from the n-gram profiles shipped with langdetect, and cached as an .npz file.
+A fastText language ID model (e.g. lid.176.ftz) is used instead when one is configured
+and the `fasttext` package is installed.
+"""
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from app.core.config import get_settings
+
+try:
+    import fasttext
+    HAS_FASTTEXT = True
+except ImportError:
+    HAS_FASTTEXT = False
+
+try:
+    import langdetect
+    from langdetect import DetectorFactory, detect_langs
+    DetectorFactory.seed = 0  # deterministic fallback
+    HAS_LANGDETECT = True
+except ImportError:
+    HAS_LANGDETECT = False
+
+settings = get_settings()
+
+NGRAM_ORDERS = (1, 2, 3)
+_HASH_MULT = np.uint64(0x100000001B3)          # FNV-style multiplier, wraps mod 2**64
+_HASH_MIX = np.uint64(0x9E3779B97F4A7C15)      # Fibonacci hashing constant
+_NON_LETTERS = re.compile(r"[\W\d_]+")
+
+# langdetect splits Chinese by script variant; callers route on the ISO 639-1 code
+_LANGUAGE_ALIASES = {"zh-cn": "zh", "zh-tw": "zh"}
+
+
+class LanguageGuess(NamedTuple):
+    """Detected language code and its confidence in [0, 1]."""
+    language: str
+    confidence: float
+
+
+def _prepare(text: str) -> str:
+    """Lowercase, map digits/punctuation to word boundaries and pad with spaces."""
+    letters = _NON_LETTERS.sub(" ", text.lower()).strip()
+    return f" {letters} " if letters else ""
+
+
+def _code_points(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+
+def _hash_windows(codes: np.ndarray, order: int) -> np.ndarray:
+    """Hash every length-`order` window of `codes` (rows of a 2-D array hash column-wise)."""
+    if codes.ndim == 1:
+        count = len(codes) - order + 1
+        columns = [codes[j:j + count] for j in range(order)]
+    else:
+        columns = [codes[:, j] for j in range(order)]
+    h = np.full(len(columns[0]), order, dtype=np.uint64)
+    for column in columns:
+        h = h * _HASH_MULT + column
+    return h
+
+
+def _buckets(hashes: np.ndarray, bits: int) -> np.ndarray:
+    return ((hashes * _HASH_MIX) >> np.uint64(64 - bits)).astype(np.int64)
+
+
+def _script_counts(codes: np.ndarray, text_ids: np.ndarray, n_texts: int) -> Dict[str, np.ndarray]:
+    """Per-text counts of letters, Han, kana and Hangul code points."""
+    def count(mask):
+        return np.bincount(text_ids[mask], minlength=n_texts)
+
+    kana = (codes >= 0x3040) & (codes <= 0x30FF)
+    hangul = ((codes >= 0xAC00) & (codes <= 0xD7AF)) | ((codes >= 0x1100) & (codes <= 0x11FF))
+    han = ((codes >= 0x4E00) & (codes <= 0x9FFF)) | ((codes >= 0x3400) & (codes <= 0x4DBF))
+    return {
+        "letters": count(codes != 0x20),
+        "han": count(han),
+        "kana": count(kana),
+        "hangul": count(hangul)
+    }
+
+
+class NgramLanguageIdentifier:
+    """Hashed character n-gram naive Bayes language identifier with NumPy tables."""
+
+    def __init__(self, languages: Sequence[str], log_probs: np.ndarray):
+        self.languages = [_LANGUAGE_ALIASES.get(lang, lang) for lang in languages]
+        self.log_probs = np.ascontiguousarray(log_probs, dtype=np.float32)
+        self.bits = int(np.log2(self.log_probs.shape[1]))
+        # (buckets x languages) so a (texts x buckets) count matrix scores in one product
+        self._table = np.ascontiguousarray(self.log_probs.T)
+
+    @classmethod
+    def from_counts(
+        cls,
+        counts: Dict[str, Dict[str, float]],
+        totals: Dict[str, Sequence[float]],
+        bits: int = 16,
+        smoothing: float = 1e-5
+    ) -> "NgramLanguageIdentifier":
+        """
+        Build tables from per-language n-gram counts. `totals[lang][n - 1]` is the number of
+        n-grams of order n seen for that language; each count becomes a per-order relative
+        frequency, and the same additive `smoothing` for every language keeps corpus size
+        from biasing unseen n-grams.
+        """
+        languages = sorted(counts)
+        n_buckets = 1 << bits
+        log_probs = np.empty((len(languages), n_buckets), dtype=np.float32)
+        for row, lang in enumerate(languages):
+            by_order = {order: ([], []) for order in NGRAM_ORDERS}
+            for gram, count in counts[lang].items():
+                if len(gram) in by_order:
+                    by_order[len(gram)][0].append(gram)
+                    by_order[len(gram)][1].append(count)
+            bucket_probs = np.zeros(n_buckets, dtype=np.float64)
+            for order, (grams, values) in by_order.items():
+                total = totals[lang][order - 1]
+                if not grams or not total:
+                    continue
+                codes = np.stack([_code_points(g) for g in grams])
+                np.add.at(bucket_probs, _buckets(_hash_windows(codes, order), bits), np.asarray(values) / total)
+            log_probs[row] = np.log(bucket_probs + smoothing)
+        return cls(languages, log_probs)
+
+    @classmethod
+    def train(
+        cls,
+        samples: Dict[str, Iterable[str]],
+        bits: int = 16,
+        smoothing: float = 1e-5
+    ) -> "NgramLanguageIdentifier":
+        """Train tables from raw text per language, e.g. {"en": [...], "fr": [...]}."""
+        counts, totals = {}, {}
+        for lang, texts in samples.items():
+            grams: Counter = Counter()
+            for text in texts:
+                prepared = _prepare(text)
+                for order in NGRAM_ORDERS:
+                    grams.update(prepared[i:i + order] for i in range(len(prepared) - order + 1))
+            counts[lang] = grams
+            totals[lang] = [sum(c for g, c in grams.items() if len(g) == order) for order in NGRAM_ORDERS]
+        return cls.from_counts(counts, totals, bits=bits, smoothing=smoothing)
+
+    @classmethod
+    def from_langdetect_profiles(
+        cls,
+        languages: Optional[Sequence[str]] = None,
+        bits: int = 16,
+        smoothing: float = 1e-5
+    ) -> "NgramLanguageIdentifier":
+        """Build tables offline from the n-gram frequency profiles bundled with langdetect."""
+        if not HAS_LANGDETECT:
+            raise ImportError("langdetect is required to build n-gram tables from its profiles")
+        profile_dir = os.path.join(os.path.dirname(langdetect.__file__), "profiles")
+        names = languages or sorted(os.listdir(profile_dir))
+        counts, totals = {}, {}
+        for name in names:
+            with open(os.path.join(profile_dir, name), "r", encoding="utf-8") as f:
+                profile = json.load(f)
+            grams: Counter = Counter()
+            for gram, count in profile["freq"].items():
+                grams[gram.lower()] += count  # profiles are case-sensitive; scoring is not
+            counts[profile["name"]] = grams
+            totals[profile["name"]] = profile["n_words"]
+        return cls.from_counts(counts, totals, bits=bits, smoothing=smoothing)
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path, languages=np.array(self.languages), log_probs=self.log_probs)
+
+    @classmethod
+    def load(cls, path: str) -> "NgramLanguageIdentifier":
+        with np.load(path) as data:
+            return cls([str(lang) for lang in data["languages"]], data["log_probs"])
+
+    def detect_batch(self, texts: Sequence[str], default: str = "en") -> List[LanguageGuess]:
+        """Detect the language of every text in one vectorized pass."""
+        if not texts:
+            return []
+        prepared = [_prepare(text) for text in texts]
+        lengths = np.fromiter((len(p) for p in prepared), dtype=np.int64, count=len(prepared))
+        codes = _code_points("".join(prepared))
+        text_ids = np.repeat(np.arange(len(prepared)), lengths)
+        scripts = _script_counts(codes, text_ids, len(prepared))
+
+        rows, cols = [], []
+        for order in NGRAM_ORDERS:
+            if len(codes) < order:
+                continue
+            hashes = _hash_windows(codes, order)
+            # Keep windows that stay inside one text; skip the bare word-boundary unigram
+            valid = text_ids[:len(hashes)] == text_ids[order - 1:]
+            if order == 1:
+                valid &= codes != 0x20
+            rows.append(text_ids[:len(hashes)][valid])
+            cols.append(_buckets(hashes[valid], self.bits))
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(prepared), self._table.shape[0])
+        )
+        scores = np.asarray(counts @ self._table)
+
+        # Posterior over languages (uniform prior)
+        scores -= scores.max(axis=1, keepdims=True)
+        posterior = np.exp(scores)
+        posterior /= posterior.sum(axis=1, keepdims=True)
+        best = posterior.argmax(axis=1)
+        n_grams = np.bincount(rows, minlength=len(prepared))
+
+        results = []
+        for i in range(len(prepared)):
+            cjk = scripts["han"][i] + scripts["kana"][i] + scripts["hangul"][i]
+            letters = scripts["letters"][i]
+            if letters and cjk * 2 >= letters:
+                if scripts["kana"][i]:
+                    lang = "ja"
+                elif scripts["hangul"][i] > scripts["han"][i]:
+                    lang = "ko"
+                else:
+                    lang = "zh"
+                results.append(LanguageGuess(lang, float(cjk / letters)))
+            elif n_grams[i] == 0:
+                results.append(LanguageGuess(default, 0.0))
+            else:
+                results.append(LanguageGuess(self.languages[best[i]], float(posterior[i, best[i]])))
+        return results
+
+
+class FastLanguageIdentifier:
+    """
+    Batched language ID front-end: fastText when configured, else the n-gram tables,
+    else langdetect; results for short strings are kept in an LRU cache.
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        fasttext_model: Optional[str] = None,
+        ngram: Optional[NgramLanguageIdentifier] = None,
+        cache_size: int = 10000,
+        cache_max_chars: int = 256,
+        default: str = "en"
+    ):
+        self.default = default
+        self.cache_size = cache_size
+        self.cache_max_chars = cache_max_chars
+        self._cache: "OrderedDict[str, LanguageGuess]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fasttext = None
+        self._ngram = None
+
+        fasttext_model = fasttext_model if fasttext_model is not None else settings.LANGID_FASTTEXT_MODEL
+        model_path = model_path or settings.LANGID_MODEL_PATH
+        if ngram is not None:
+            self._ngram = ngram
+            self.backend = "ngram"
+        elif fasttext_model and HAS_FASTTEXT and os.path.exists(fasttext_model):
+            self._fasttext = fasttext.load_model(fasttext_model)
+            self.backend = "fasttext"
+        elif os.path.exists(model_path):
+            self._ngram = NgramLanguageIdentifier.load(model_path)
+            self.backend = "ngram"
+        elif HAS_LANGDETECT:
+            self._ngram = NgramLanguageIdentifier.from_langdetect_profiles()
+            try:
+                self._ngram.save(model_path)
+            except OSError:
+                pass  # Read-only deployments rebuild the tables on start-up
+            self.backend = "ngram"
+        else:
+            self.backend = "none"
+
+    def _detect_uncached(self, texts: List[str]) -> List[LanguageGuess]:
+        if self._fasttext is not None:
+            labels, probs = self._fasttext.predict([t.replace("\n", " ") for t in texts], k=1)
+            return [
+                LanguageGuess(_LANGUAGE_ALIASES.get(l[0].replace("__label__", ""), l[0].replace("__label__", "")),
+                              float(min(p[0], 1.0)))
+                if l else LanguageGuess(self.default, 0.0)
+                for l, p in zip(labels, probs)
+            ]
+        if self._ngram is not None:
+            return self._ngram.detect_batch(texts, default=self.default)
+        return [LanguageGuess(self.default, 0.0) for _ in texts]
+
+    def detect_batch(self, texts: Sequence[str]) -> List[LanguageGuess]:
+        """Detect languages for a list of texts, reusing cached results for short strings."""
+        results: List[Optional[LanguageGuess]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                cached = self._cache.get(text) if len(text) <= self.cache_max_chars else None
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    results[i] = cached
+                else:
+                    pending.setdefault(text, []).append(i)
+        if pending:
+            unique = list(pending)
+            for text, guess in zip(unique, self._detect_uncached(unique)):
+                for i in pending[text]:
+                    results[i] = guess
+            with self._lock:
+                for text in unique:
+                    if len(text) <= self.cache_max_chars:
+                        self._cache[text] = results[pending[text][0]]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+    def detect(self, text: str) -> LanguageGuess:
+        return self.detect_batch([text])[0]
+
+
+@lru_cache()
+def get_language_identifier() -> FastLanguageIdentifier:
+    """Process-wide identifier (tables are loaded or built once)."""
+    return FastLanguageIdentifier()
+
+
+def langdetect_guess(text: str, default: str = "en") -> LanguageGuess:
+    """Reference langdetect result, kept for benchmarking and comparison."""
+    try:
+        top = detect_langs(text)[0]
+        return LanguageGuess(_LANGUAGE_ALIASES.get(top.lang, top.lang), float(top.prob))
+    except Exception:
+        return LanguageGuess(default, 0.0)
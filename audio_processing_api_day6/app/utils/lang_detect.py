@@ -1,12 +1,73 @@
 """
 Batch language detection and translation model routing utility.
 Designed for multimodal AI, speech recognition, and translation pipelines.
+Detection is backed by the vectorized n-gram identifier in app.utils.fast_langid.
 """
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from langdetect import detect, DetectorFactory
+from app.core.config import get_settings
+from app.utils.fast_langid import get_language_identifier
 
-# Ensure deterministic language detection
-DetectorFactory.seed = 0
+settings = get_settings()
+
+@dataclass(frozen=True)
+class LanguageContext:
+    """
+    Source language of a piece of text and where it came from, passed from ASR to
+    routing/translation so the text does not have to be re-detected.
+    `source` is "user" (explicitly requested), "asr" (Whisper's posterior), "text"
+    (text-based detection) or "default".
+    """
+    language: str
+    probability: Optional[float] = None
+    source: str = "asr"
+
+    @classmethod
+    def from_asr(cls, result: Dict[str, Any], requested_language: Optional[str] = None) -> "LanguageContext":
+        """Build a context from an ASR result dict ('language' / 'language_probability')."""
+        if result.get("language_context"):
+            return cls(**result["language_context"])
+        if requested_language and requested_language != "auto":
+            return cls(requested_language, 1.0, "user")
+        return cls(result.get("language") or "auto", result.get("language_probability"), "asr")
+
+    def is_reliable(self, min_confidence: Optional[float] = None) -> bool:
+        """True if the language is known and its probability reaches the threshold."""
+        threshold = settings.LANGUAGE_CONTEXT_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        if not self.language or self.language == "auto":
+            return False
+        return self.source == "user" or (self.probability is not None and self.probability >= threshold)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def resolve_language(
+    text: str,
+    context: Optional[LanguageContext] = None,
+    min_confidence: Optional[float] = None
+) -> LanguageContext:
+    """
+    Return `context` when it is reliable; otherwise detect the language from the text.
+    This keeps text detection off the hot path whenever ASR already knows the language.
+    """
+    if context is not None and context.is_reliable(min_confidence):
+        return context
+    language, probability = detect_text_lang_with_confidence(text)
+    return LanguageContext(language, probability, "text")
+
+def resolve_languages(
+    texts: Sequence[str],
+    contexts: Optional[Sequence[Optional[LanguageContext]]] = None,
+    min_confidence: Optional[float] = None
+) -> List[LanguageContext]:
+    """Batch version of `resolve_language`: only texts without a reliable context are detected."""
+    contexts = list(contexts) if contexts is not None else [None] * len(texts)
+    pending = [i for i, ctx in enumerate(contexts) if ctx is None or not ctx.is_reliable(min_confidence)]
+    resolved = list(contexts)
+    for i, (language, probability) in zip(pending, batch_detect_lang([texts[i] for i in pending], with_confidence=True)):
+        resolved[i] = LanguageContext(language, probability, "text")
+    return resolved
 
 def detect_text_lang(text: str) -> str:
     """
@@ -14,17 +75,29 @@ def detect_text_lang(text: str) -> str:
     Returns a two-letter language code (e.g., 'en', 'fr').
     Falls back to 'en' if detection fails.
     """
+    return detect_text_lang_with_confidence(text)[0]
+
+def detect_text_lang_with_confidence(text: str) -> Tuple[str, float]:
+    """
+    Detect the language of a single text string together with its confidence (0-1).
+    Falls back to ('en', 0.0) if detection fails.
+    """
     try:
-        return detect(text)
+        return tuple(get_language_identifier().detect(text))
     except Exception:
-        return "en"
+        return "en", 0.0
 
-def batch_detect_lang(texts):
+def batch_detect_lang(texts, with_confidence: bool = False) -> List:
     """
-    Detect languages for a list of texts.
-    Returns a list of detected language codes.
+    Detect languages for a list of texts in a single vectorized pass.
+    Returns a list of detected language codes, or (code, confidence) pairs
+    when `with_confidence` is True.
     """
-    return [detect_text_lang(text) for text in texts]
+    try:
+        guesses = get_language_identifier().detect_batch(list(texts))
+    except Exception:
+        guesses = [("en", 0.0) for _ in texts]
+    return [tuple(g) if with_confidence else g[0] for g in guesses]
 
 class TranslationRouter:
     """
@@ -36,16 +109,20 @@ class TranslationRouter:
     def __init__(self, translation_models: dict):
         self.translation_models = translation_models
 
-    def route(self, text: str):
-        lang = detect_text_lang(text)
+    def route(self, text: str, context: Optional[LanguageContext] = None):
+        """
+        Return the model for the text's language; a reliable `context` (e.g. from ASR)
+        makes this a plain dictionary lookup without text detection.
+        """
+        lang = resolve_language(text, context).language
         return self.translation_models.get(lang, self.translation_models.get("en"))
 
-    def batch_route(self, texts):
+    def batch_route(self, texts, contexts: Optional[Sequence[Optional[LanguageContext]]] = None):
         """
         For a list of texts, returns a list of translation models (one per text).
+        Texts with a reliable context are not re-detected.
         """
-        langs = batch_detect_lang(texts)
         return [
-            self.translation_models.get(lang, self.translation_models.get("en"))
-            for lang in langs
+            self.translation_models.get(ctx.language, self.translation_models.get("en"))
+            for ctx in resolve_languages(texts, contexts)
         ]
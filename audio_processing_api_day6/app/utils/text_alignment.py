@@ -0,0 +1,254 @@
+"""
+Word-level transcript alignment shared by the pipeline and similarity services.
+
+Words are interned to integer ids and aligned with a banded Levenshtein dynamic program
+(Ukkonen cut-off, band doubled until the distance fits), vectorized with NumPy one
+reference word at a time. The same pass yields the word diff and the WER components
+(substitutions, deletions, insertions). Renderers stream HTML/JSON in chunks.
+"""
+import html
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EQUAL = "equal"
+SUBSTITUTE = "substitute"
+DELETE = "delete"
+INSERT = "insert"
+
+_INF = 1 << 29
+_DIAG, _UP, _LEFT = 0, 1, 2
+
+
+@dataclass
+class AlignmentResult:
+    """Alignment of a reference and hypothesis word sequence with WER components."""
+    ref_words: List[str]
+    hyp_words: List[str]
+    ops: List[Tuple[str, int, int]]
+    hits: int
+    substitutions: int
+    deletions: int
+    insertions: int
+
+    @property
+    def errors(self) -> int:
+        return self.substitutions + self.deletions + self.insertions
+
+    @property
+    def wer(self) -> float:
+        if not self.ref_words:
+            return float(self.errors > 0)
+        return self.errors / len(self.ref_words)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "wer": self.wer,
+            "hits": self.hits,
+            "substitutions": self.substitutions,
+            "deletions": self.deletions,
+            "insertions": self.insertions,
+            "reference_length": len(self.ref_words),
+            "hypothesis_length": len(self.hyp_words)
+        }
+
+
+def intern_words(*sequences: Sequence[str]) -> List[np.ndarray]:
+    """Map words to dense int32 ids shared across all sequences."""
+    vocab: Dict[str, int] = {}
+    return [
+        np.fromiter((vocab.setdefault(w, len(vocab)) for w in words), dtype=np.int32, count=len(words))
+        for words in sequences
+    ]
+
+
+def _banded_codes(ref: np.ndarray, hyp: np.ndarray, k: int) -> Tuple[np.ndarray, int, int]:
+    """
+    Levenshtein DP restricted to the diagonals a path of cost <= k can visit.
+    Returns (backtrace codes indexed by [row, diagonal - t_lo], t_lo, banded distance).
+    The banded distance is an upper bound, and exact whenever it is <= k.
+    """
+    n, m = len(ref), len(hyp)
+    d = m - n
+    slack = (k - abs(d)) // 2
+    t_lo = min(0, d) - slack
+    width = max(0, d) - t_lo + slack + 1
+    idx = np.arange(width, dtype=np.int32)
+
+    # Out-of-range hypothesis positions never match (-1); cells left of column 0 start at
+    # _INF and stay unreachable, cells right of column m are never read back.
+    pad = width + 1
+    hyp_p = np.full(m + 2 * pad, -1, dtype=np.int32)
+    hyp_p[pad:pad + m] = hyp
+    prev = np.where(idx + t_lo >= 0, idx + t_lo, _INF).astype(np.int32)
+    codes = np.empty((n + 1, width), dtype=np.uint8)
+    codes[0] = _LEFT
+    up = np.empty(width, dtype=np.int32)
+    up[-1] = _INF
+    for i in range(1, n + 1):
+        start = pad + i + t_lo - 1
+        np.add(prev[1:], 1, out=up[:-1])
+        diag = prev + (hyp_p[start:start + width] != ref[i - 1])
+        cur = np.minimum(up, diag)
+        cur -= idx
+        np.minimum.accumulate(cur, out=cur)
+        cur += idx
+        not_diag = cur != diag
+        np.add(not_diag, not_diag & (cur != up), out=codes[i], dtype=np.uint8)
+        prev = cur
+    return codes, t_lo, int(prev[d - t_lo])
+
+
+def _edit_ops(ref: np.ndarray, hyp: np.ndarray) -> List[Tuple[str, int, int]]:
+    """Optimal edit script between two id sequences (no common prefix/suffix trimming)."""
+    n, m = len(ref), len(hyp)
+    if n == 0:
+        return [(INSERT, -1, j) for j in range(m)]
+    if m == 0:
+        return [(DELETE, i, -1) for i in range(n)]
+    # Widen the band until it provably contains an optimal path (distance <= k). Each pass
+    # also bounds the distance from above, which caps the next band width.
+    k = max(abs(m - n), 32)
+    codes, t_lo, distance = _banded_codes(ref, hyp, k)
+    while distance > k:
+        k = min(distance, 4 * k)
+        codes, t_lo, distance = _banded_codes(ref, hyp, k)
+
+    ops = []
+    i, j = n, m
+    col = (m - n) - t_lo
+    while i > 0 or j > 0:
+        code = codes[i, col]
+        if code == _DIAG:
+            ops.append((EQUAL if ref[i - 1] == hyp[j - 1] else SUBSTITUTE, i - 1, j - 1))
+            i -= 1
+            j -= 1
+        elif code == _UP:
+            ops.append((DELETE, i - 1, -1))
+            i -= 1
+            col += 1
+        else:
+            ops.append((INSERT, -1, j - 1))
+            j -= 1
+            col -= 1
+    ops.reverse()
+    return ops
+
+
+def align_words(ref_words: Sequence[str], hyp_words: Sequence[str]) -> AlignmentResult:
+    """Align two word sequences and count hits, substitutions, deletions and insertions."""
+    ref_words, hyp_words = list(ref_words), list(hyp_words)
+    ref, hyp = intern_words(ref_words, hyp_words)
+    n, m = len(ref), len(hyp)
+
+    # Equal prefix/suffix never needs the DP
+    shortest = min(n, m)
+    mismatch = np.flatnonzero(ref[:shortest] != hyp[:shortest])
+    prefix = int(mismatch[0]) if len(mismatch) else shortest
+    tail_mismatch = np.flatnonzero(ref[::-1][:shortest - prefix] != hyp[::-1][:shortest - prefix])
+    suffix = int(tail_mismatch[0]) if len(tail_mismatch) else shortest - prefix
+
+    middle = _edit_ops(ref[prefix:n - suffix], hyp[prefix:m - suffix])
+    ops = [(EQUAL, i, i) for i in range(prefix)]
+    ops.extend(
+        (op, i + prefix if i >= 0 else -1, j + prefix if j >= 0 else -1) for op, i, j in middle
+    )
+    ops.extend((EQUAL, n - suffix + x, m - suffix + x) for x in range(suffix))
+
+    counts = {EQUAL: 0, SUBSTITUTE: 0, DELETE: 0, INSERT: 0}
+    for op, _, _ in ops:
+        counts[op] += 1
+    return AlignmentResult(
+        ref_words=ref_words,
+        hyp_words=hyp_words,
+        ops=ops,
+        hits=counts[EQUAL],
+        substitutions=counts[SUBSTITUTE],
+        deletions=counts[DELETE],
+        insertions=counts[INSERT]
+    )
+
+
+def align_texts(ref_text: str, hyp_text: str) -> AlignmentResult:
+    """Whitespace-tokenize and align two transcripts."""
+    return align_words(ref_text.strip().split(), hyp_text.strip().split())
+
+
+def diff_from_alignment(alignment: AlignmentResult) -> List[Dict[str, Any]]:
+    """
+    Convert an alignment to the {word, status} diff format.
+    status: 'correct', 'missing', 'extra', 'mismatch'; a run of substitutions lists the
+    reference words followed by the hypothesis words.
+    """
+    ref_words, hyp_words = alignment.ref_words, alignment.hyp_words
+    diff: List[Dict[str, Any]] = []
+    pending_hyp: List[str] = []
+    for op, i, j in alignment.ops:
+        if op != SUBSTITUTE and pending_hyp:
+            diff.extend({"word": w, "status": "mismatch"} for w in pending_hyp)
+            pending_hyp = []
+        if op == EQUAL:
+            diff.append({"word": ref_words[i], "status": "correct"})
+        elif op == SUBSTITUTE:
+            diff.append({"word": ref_words[i], "status": "mismatch"})
+            pending_hyp.append(hyp_words[j])
+        elif op == DELETE:
+            diff.append({"word": ref_words[i], "status": "missing"})
+        else:
+            diff.append({"word": hyp_words[j], "status": "extra"})
+    diff.extend({"word": w, "status": "mismatch"} for w in pending_hyp)
+    return diff
+
+
+def word_level_diff(ref_text: str, hyp_text: str) -> List[Dict[str, Any]]:
+    """Highlight word-level differences between two texts."""
+    return diff_from_alignment(align_texts(ref_text, hyp_text))
+
+
+_SPAN_TEMPLATES = {
+    "correct": '<span style="color:green">{}</span>',
+    "missing": '<span style="color:red;text-decoration:line-through">{}</span>',
+    "extra": '<span style="color:orange;text-decoration:underline">{}</span>',
+    "mismatch": '<span style="color:blue;font-style:italic">{}</span>'
+}
+
+
+def iter_html(diff: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Stream the color-highlighted HTML for a diff in chunks of `chunk_size` words:
+    correct: green, missing: red (strikethrough), extra: orange (underline), mismatch: blue (italic).
+    """
+    chunk: List[str] = []
+    first = True
+    for item in diff:
+        template = _SPAN_TEMPLATES.get(item["status"])
+        if template is None:
+            continue
+        chunk.append(template.format(html.escape(item["word"])))
+        if len(chunk) >= chunk_size:
+            yield ("" if first else " ") + " ".join(chunk)
+            first, chunk = False, []
+    if chunk:
+        yield ("" if first else " ") + " ".join(chunk)
+
+
+def colorize_diff(diff: Iterable[Dict[str, Any]]) -> str:
+    """Return the full HTML string for a diff."""
+    return "".join(iter_html(diff))
+
+
+def iter_json(diff: Iterable[Dict[str, Any]], chunk_size: int = 1000) -> Iterator[str]:
+    """Stream a diff as a JSON array in chunks of `chunk_size` entries."""
+    yield "["
+    chunk: List[str] = []
+    first = True
+    for item in diff:
+        chunk.append(json.dumps(item, ensure_ascii=False))
+        if len(chunk) >= chunk_size:
+            yield ("" if first else ",") + ",".join(chunk)
+            first, chunk = False, []
+    if chunk:
+        yield ("" if first else ",") + ",".join(chunk)
+    yield "]"
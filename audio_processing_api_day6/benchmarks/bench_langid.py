@@ -0,0 +1,122 @@
+"""
+Benchmark the batched n-gram language identifier against per-text langdetect
+on mixed English/French/German/Spanish/Chinese sentences (accuracy and throughput).
+
+Usage:
+    python -m benchmarks.bench_langid --texts 2000
+"""
+import argparse
+import random
+import time
+
+from app.utils.fast_langid import FastLanguageIdentifier, NgramLanguageIdentifier, langdetect_guess
+
+SENTENCES = {
+    "en": [
+        "Please restart the application after installing the update.",
+        "Your order has been shipped and will arrive on Thursday.",
+        "The meeting was moved to the large conference room.",
+        "How do I reset my password if I no longer have access to my email?",
+        "We could not process your payment, please check your card details.",
+        "The weather forecast says it will rain all weekend.",
+    ],
+    "fr": [
+        "Veuillez redémarrer l'application après avoir installé la mise à jour.",
+        "Votre commande a été expédiée et arrivera jeudi.",
+        "La réunion a été déplacée dans la grande salle de conférence.",
+        "Comment réinitialiser mon mot de passe si je n'ai plus accès à mes e-mails ?",
+        "Nous n'avons pas pu traiter votre paiement, vérifiez les informations de votre carte.",
+        "La météo annonce de la pluie tout le week-end.",
+    ],
+    "de": [
+        "Bitte starten Sie die Anwendung nach der Installation des Updates neu.",
+        "Ihre Bestellung wurde versandt und kommt am Donnerstag an.",
+        "Die Besprechung wurde in den großen Konferenzraum verlegt.",
+        "Wie setze ich mein Passwort zurück, wenn ich keinen Zugriff mehr auf meine E-Mails habe?",
+        "Wir konnten Ihre Zahlung nicht verarbeiten, bitte prüfen Sie Ihre Kartendaten.",
+        "Laut Wetterbericht regnet es das ganze Wochenende.",
+    ],
+    "es": [
+        "Reinicie la aplicación después de instalar la actualización.",
+        "Su pedido ha sido enviado y llegará el jueves.",
+        "La reunión se trasladó a la sala de conferencias grande.",
+        "¿Cómo restablezco mi contraseña si ya no tengo acceso a mi correo?",
+        "No pudimos procesar su pago, revise los datos de su tarjeta.",
+        "El pronóstico dice que lloverá todo el fin de semana.",
+    ],
+    "zh": [
+        "安装更新后请重新启动应用程序。",
+        "您的订单已发货，将于星期四到达。",
+        "会议已改到大会议室举行。",
+        "如果我无法再访问电子邮件，如何重置密码？",
+        "我们无法处理您的付款，请检查您的银行卡信息。",
+        "天气预报说整个周末都会下雨。",
+    ],
+}
+
+
+def make_corpus(n_texts: int, seed: int = 0):
+    """Random labelled sentences, sometimes truncated to a few words like chat messages."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n_texts):
+        lang = rng.choice(list(SENTENCES))
+        text = rng.choice(SENTENCES[lang])
+        if lang != "zh" and rng.random() < 0.3:
+            words = text.split()
+            start = rng.randrange(max(1, len(words) - 4))
+            text = " ".join(words[start:start + rng.randint(3, 6)])
+        # Make most texts unique so the memoization cache does not flatter the results
+        if rng.random() < 0.8:
+            text = f"{text} #{rng.randrange(10 ** 6)}"
+        corpus.append((lang, text))
+    return corpus
+
+
+def accuracy(labels, guesses) -> float:
+    return sum(label == guess.language for label, guess in zip(labels, guesses)) / len(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.texts)
+    labels = [lang for lang, _ in corpus]
+    texts = [text for _, text in corpus]
+
+    start = time.perf_counter()
+    reference = [langdetect_guess(text) for text in texts]
+    langdetect_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ngram = NgramLanguageIdentifier.from_langdetect_profiles()
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    guesses = []
+    for i in range(0, len(texts), args.batch_size):
+        guesses.extend(ngram.detect_batch(texts[i:i + args.batch_size]))
+    ngram_s = time.perf_counter() - start
+
+    cached = FastLanguageIdentifier(ngram=ngram)
+    cached.detect_batch(texts)
+    start = time.perf_counter()
+    repeat = cached.detect_batch(texts)
+    cached_s = time.perf_counter() - start
+
+    print(f"texts: {len(texts)}, table build: {build_s:.2f}s (cached to .npz after the first run)")
+    print(f"{'engine':<22} | {'seconds':>8} | {'texts/s':>9} | {'accuracy':>8}")
+    for name, seconds, result in (
+        ("langdetect (per text)", langdetect_s, reference),
+        ("ngram (batched)", ngram_s, guesses),
+        ("ngram (memoized)", cached_s, repeat),
+    ):
+        print(f"{name:<22} | {seconds:>8.3f} | {len(texts) / seconds:>9.0f} | {accuracy(labels, result):>8.3f}")
+    agreement = sum(a.language == b.language for a, b in zip(reference, guesses)) / len(texts)
+    print(f"agreement with langdetect: {agreement:.3f}")
+
+
+if __name__ == "__main__":
+    main()
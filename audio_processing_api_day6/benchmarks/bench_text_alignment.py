@@ -0,0 +1,78 @@
+"""
+Benchmark the shared word alignment against the previous difflib-based diff
+on long, repetitive synthetic transcripts.
+
+Usage:
+    python -m benchmarks.bench_text_alignment --words 10000 20000 --error-rate 0.1
+"""
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+from app.utils.text_alignment import align_words, colorize_diff, diff_from_alignment
+
+try:
+    import jiwer
+except ImportError:
+    jiwer = None
+
+# Small vocabulary so the transcript is highly repetitive, like long meetings
+VOCAB = ("the so we can uh you know i think that is right yes okay let's move on to the next "
+         "item on the agenda and then we will come back to it later").split()
+
+
+def make_pair(n_words: int, error_rate: float, seed: int = 0):
+    rng = random.Random(seed)
+    ref = [rng.choice(VOCAB) for _ in range(n_words)]
+    hyp = []
+    for word in ref:
+        r = rng.random()
+        if r < error_rate / 3:
+            continue
+        if r < 2 * error_rate / 3:
+            hyp.append(rng.choice(VOCAB))
+        elif r < error_rate:
+            hyp.extend([word, rng.choice(VOCAB)])
+        else:
+            hyp.append(word)
+    return ref, hyp
+
+
+def difflib_errors(ref, hyp) -> int:
+    errors = 0
+    for opcode, i1, i2, j1, j2 in SequenceMatcher(None, ref, hyp).get_opcodes():
+        if opcode == "replace":
+            errors += max(i2 - i1, j2 - j1)
+        elif opcode == "delete":
+            errors += i2 - i1
+        elif opcode == "insert":
+            errors += j2 - j1
+    return errors
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, nargs="+", default=[10000, 20000])
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"{'words':>7} | {'align s':>8} | {'render s':>8} | {'difflib s':>9} | {'WER':>6} | {'difflib WER':>11} | {'jiwer WER':>9}")
+    for n_words in args.words:
+        ref, hyp = make_pair(n_words, args.error_rate)
+        alignment, align_time = timed(align_words, ref, hyp)
+        _, render_time = timed(lambda a: colorize_diff(diff_from_alignment(a)), alignment)
+        legacy_errors, difflib_time = timed(difflib_errors, ref, hyp)
+        jiwer_wer = jiwer.wer(" ".join(ref), " ".join(hyp)) if jiwer else float("nan")
+        print(f"{n_words:>7} | {align_time:>8.3f} | {render_time:>8.3f} | {difflib_time:>9.3f} | "
+              f"{alignment.wer:>6.3f} | {legacy_errors / len(ref):>11.3f} | {jiwer_wer:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Streaming ingestion tests: spooled uploads, block-wise resampling and ASR windowing.
+"""
+import asyncio
+import hashlib
+import io
+
+import numpy as np
+import pytest
+import soundfile as sf
+from fastapi import HTTPException, UploadFile
+
+from app.utils.audio_stream import StreamingResampler, _seekable_path, decode_blocks, iter_windows, spool_upload
+
+
+def _upload(data: bytes, filename: str = "clip.wav") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+class TestAudioStream:
+    """Test suite for bounded-memory upload handling."""
+
+    def test_spool_hashes_and_rolls_over(self):
+        """Test the incremental sha256 and the spill to disk past the threshold."""
+        data = bytes(range(256)) * 1000
+        spooled = asyncio.run(spool_upload(_upload(data), max_bytes=1 << 20, spool_threshold=64 * 1024,
+                                           chunk_size=10000))
+        with spooled:
+            assert spooled.size == len(data)
+            assert spooled.sha256 == hashlib.sha256(data).hexdigest()
+            assert spooled.on_disk
+            assert spooled.read_bytes() == data
+
+    def test_size_limit_enforced_while_reading(self):
+        """Test 413 is raised once the limit is crossed, before the rest is read."""
+        source = io.BytesIO(b"x" * 500_000)
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(spool_upload(UploadFile(source, filename="big.wav"), max_bytes=100_000,
+                                     spool_threshold=1 << 20, chunk_size=50_000))
+        assert exc.value.status_code == 413
+        assert source.tell() < 200_000
+
+    @pytest.mark.parametrize("orig_sr", [8000, 22050, 44100, 48000])
+    def test_resampler_is_block_invariant(self, orig_sr):
+        """Test blockwise output has the exact length and matches a one-shot pass."""
+        rng = np.random.default_rng(0)
+        signal = (np.sin(2 * np.pi * 300 * np.arange(2 * orig_sr) / orig_sr)
+                  + 0.1 * rng.standard_normal(2 * orig_sr)).astype(np.float32)
+        one_shot = StreamingResampler(orig_sr, 16000)
+        whole = np.concatenate([one_shot.process(signal), one_shot.flush()])
+        blocked = StreamingResampler(orig_sr, 16000)
+        parts = [blocked.process(block) for block in np.array_split(signal, 13)] + [blocked.flush()]
+        assert len(whole) == 32000
+        np.testing.assert_allclose(np.concatenate(parts), whole, atol=1e-5)
+        # A clean 300 Hz tone keeps its phase: compare against the analytic resampled signal
+        tone = np.sin(2 * np.pi * 300 * np.arange(2 * orig_sr) / orig_sr)
+        resampler = StreamingResampler(orig_sr, 16000)
+        resampled = np.concatenate([resampler.process(tone), resampler.flush()])
+        expected = np.sin(2 * np.pi * 300 * np.arange(32000) / 16000)
+        assert np.abs(resampled[500:-500] - expected[500:-500]).max() < 0.01
+
+    def test_decode_into_windows(self):
+        """Test a stereo 44.1 kHz WAV decodes to 16 kHz mono windows with offsets."""
+        sr = 44100
+        tone = (0.5 * np.sin(2 * np.pi * 440 * np.arange(int(sr * 7.5)) / sr)).astype(np.float32)
+        buffer = io.BytesIO()
+        sf.write(buffer, np.stack([tone, tone], axis=1), sr, format="WAV")
+        windows = list(iter_windows(decode_blocks(buffer, 16000, block_seconds=0.5), 16000, window_seconds=3))
+        assert [(offset, len(window)) for offset, window in windows] == [(0.0, 48000), (3.0, 48000), (6.0, 24000)]
+        assert all(window.dtype == np.float32 for _, window in windows)
+
+    def test_ffmpeg_gets_a_seekable_path(self):
+        """Test spooled uploads are handed to ffmpeg as a readable path instead of a pipe."""
+        data = b"\x00moov" * 1000
+        spooled = asyncio.run(spool_upload(_upload(data, "clip.m4a"), max_bytes=1 << 20, spool_threshold=1 << 20))
+        with spooled:
+            path, _ = _seekable_path(spooled.file)
+            assert spooled.on_disk and path is not None
+            with open(path, "rb") as f:
+                assert f.read() == data
+        assert _seekable_path(io.BytesIO(data)) == (None, ())
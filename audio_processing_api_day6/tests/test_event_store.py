@@ -0,0 +1,47 @@
+"""
+Event store tests: append, time-range/user queries and aggregation.
+"""
+from app.services.event_store import EventStore
+
+
+class TestEventStore:
+    """Test suite for the SQLite-backed event store."""
+
+    def _store(self, tmp_path):
+        store = EventStore(str(tmp_path / "events.db"))
+        store.record_event("transcription", user_id="alice", source_language="en", model="base",
+                           processing_time=2.0, audio_duration=30.0, timestamp=100.0)
+        store.record_event("transcription", user_id="bob", source_language="fr", model="base",
+                           cache_hit=True, processing_time=0.1, audio_duration=10.0, timestamp=200.0)
+        store.record_event("translation", user_id="alice", source_language="en", target_language="fr",
+                           model="Helsinki-NLP/opus-mt-en-fr", processing_time=0.5, timestamp=300.0)
+        store.record_event("tts", user_id="alice", status="error", extra={"error": "boom"}, timestamp=400.0)
+        return store
+
+    def test_query_by_time_range_and_user(self, tmp_path):
+        """Test time-range and per-user filtering, newest first."""
+        store = self._store(tmp_path)
+        events = store.query_events(start=150.0, end=400.0)
+        assert [e["ts"] for e in events] == [300.0, 200.0]
+        alice = store.query_events(user_id="alice")
+        assert len(alice) == 3
+        assert alice[0]["extra"] == {"error": "boom"}
+        assert store.query_events(event_type="transcription", user_id="bob")[0]["cache_hit"] is True
+
+    def test_aggregate_stats(self, tmp_path):
+        """Test aggregated counts, cache hit rate and per-type breakdown."""
+        stats = self._store(tmp_path).aggregate_stats()
+        assert stats["total_events"] == 4
+        assert stats["error_count"] == 1
+        assert stats["cache_hit_rate"] == 0.25
+        assert stats["total_audio_seconds"] == 40.0
+        by_type = {row["event_type"]: row for row in stats["by_event_type"]}
+        assert by_type["transcription"]["count"] == 2
+        assert by_type["transcription"]["cache_hit_rate"] == 0.5
+
+    def test_aggregate_stats_empty_range(self, tmp_path):
+        """Test aggregation over a range with no events."""
+        stats = self._store(tmp_path).aggregate_stats(start=1000.0)
+        assert stats["total_events"] == 0
+        assert stats["cache_hit_rate"] == 0.0
+        assert stats["by_event_type"] == []
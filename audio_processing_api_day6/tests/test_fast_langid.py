@@ -0,0 +1,50 @@
+"""
+Fast language identification tests: trained tables, batching, CJK shortcut and caching.
+"""
+from app.utils.fast_langid import FastLanguageIdentifier, NgramLanguageIdentifier
+
+
+class TestFastLangId:
+    """Test suite for the vectorized n-gram language identifier."""
+
+    def test_profiles_detect_mixed_batch(self):
+        """Test a mixed batch against tables built from the langdetect profiles."""
+        identifier = NgramLanguageIdentifier.from_langdetect_profiles(["en", "fr", "de", "es", "zh-cn"], bits=14)
+        texts = [
+            "Your order has been shipped and will arrive on Thursday.",
+            "Votre commande a été expédiée et arrivera jeudi.",
+            "Ihre Bestellung wurde versandt und kommt am Donnerstag an.",
+            "Su pedido ha sido enviado y llegará el jueves.",
+            "您的订单已发货，将于星期四到达。",
+            "12345 !!!"
+        ]
+        guesses = identifier.detect_batch(texts)
+        assert [g.language for g in guesses] == ["en", "fr", "de", "es", "zh", "en"]
+        assert all(g.confidence > 0.5 for g in guesses[:5])
+        assert guesses[5].confidence == 0.0
+        # Batching must not change per-text results
+        assert identifier.detect_batch(texts[1:2]) == guesses[1:2]
+
+    def test_train_save_and_load(self, tmp_path):
+        """Test training from raw samples and the .npz round trip."""
+        identifier = NgramLanguageIdentifier.train({
+            "en": ["the cat sat on the mat", "there is the house"],
+            "nl": ["de kat zat op de mat", "daar is het huis"]
+        }, bits=12)
+        path = str(tmp_path / "langid.npz")
+        identifier.save(path)
+        loaded = NgramLanguageIdentifier.load(path)
+        assert loaded.languages == ["en", "nl"]
+        assert loaded.detect_batch(["the mat", "het huis"]) == identifier.detect_batch(["the mat", "het huis"])
+        assert [g.language for g in loaded.detect_batch(["the mat", "het huis"])] == ["en", "nl"]
+
+    def test_short_strings_are_memoized(self):
+        """Test repeated short strings are answered from the LRU cache."""
+        identifier = NgramLanguageIdentifier.train({"en": ["hello world"], "es": ["hola mundo"]}, bits=10)
+        fast = FastLanguageIdentifier(ngram=identifier, cache_size=2, cache_max_chars=20)
+        first = fast.detect_batch(["hello", "hola", "hello"])
+        assert first[0] == first[2] and first[0].language == "en"
+        assert set(fast._cache) == {"hello", "hola"}
+        fast.detect("hello world again, but longer than twenty characters")
+        fast.detect("mundo")
+        assert len(fast._cache) == 2 and "hello" not in fast._cache
@@ -0,0 +1,135 @@
+"""
+Async job tests: fair claiming, leases, progress and partial results, TTL expiry and the worker pool.
+"""
+import time
+
+from app.services.job_store import JobStore
+from app.services.job_worker import JobWorkerPool
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestJobs:
+    """Test suite for the SQLite job store and local worker pool."""
+
+    def test_claim_is_fair_across_users(self, tmp_path):
+        """Test a user with a running job waits behind users with none, then FIFO."""
+        store = JobStore(str(tmp_path / "jobs.db"))
+        a1 = store.create("transcribe", user_id="alice")
+        a2 = store.create("transcribe", user_id="alice")
+        b1 = store.create("transcribe", user_id="bob")
+        assert store.claim_next("w1").id == a1.id
+        assert store.claim_next("w1").id == b1.id
+        assert store.claim_next("w1", max_running_per_user=1) is None
+        assert store.claim_next("w1").id == a2.id
+        assert store.counts() == {"running": 3}
+
+    def test_progress_partial_and_cancel(self, tmp_path):
+        """Test progress/partial updates while running and that cancellation stops them."""
+        store = JobStore(str(tmp_path / "jobs.db"))
+        job = store.create("transcribe", user_id="alice", params={"language": "en"})
+        assert not store.update_progress(job.id, 0.5)  # still queued
+        store.claim_next("w1")
+        assert store.update_progress(job.id, 0.25, {"text": "hello"})
+        current = store.get(job.id)
+        assert current.status == "running" and current.progress == 0.25
+        assert current.partial == {"text": "hello"} and current.params == {"language": "en"}
+        assert store.cancel(job.id)
+        assert not store.update_progress(job.id, 0.5)
+        assert not store.cancel(job.id)
+        assert store.get(job.id).status == "cancelled"
+
+    def test_only_stale_leases_are_requeued(self, tmp_path):
+        """Test live leases stay put, stale ones are re-queued and the old owner's writes are rejected."""
+        store = JobStore(str(tmp_path / "jobs.db"))
+        job = store.create("transcribe", user_id="alice")
+        leased = store.claim_next("w1")
+        assert leased.owner == "w1"
+        assert store.requeue_stale(lease_seconds=60) == 0
+        assert store.heartbeat([job.id], "w2") == 0
+        assert store.heartbeat([job.id], "w1") == 1
+        assert store.requeue_stale(lease_seconds=60, now=time.time() + 120) == 1
+        requeued = store.get(job.id)
+        assert requeued.status == "queued" and requeued.owner is None
+        assert store.claim_next("w2").owner == "w2"
+        assert not store.update_progress(job.id, 0.5, owner="w1")
+        assert not store.complete(job.id, {"text": "stale"}, owner="w1")
+        assert store.complete(job.id, {"text": "fresh"}, owner="w2")
+        assert store.get(job.id).result == {"text": "fresh"}
+
+    def test_results_expire(self, tmp_path):
+        """Test finished jobs vanish after the TTL and their input files are removed."""
+        store = JobStore(str(tmp_path / "jobs.db"), result_ttl=60)
+        upload = tmp_path / "input.wav"
+        upload.write_bytes(b"RIFF")
+        job = store.create("transcribe", user_id="alice", input_path=str(upload))
+        store.claim_next("w1")
+        assert store.complete(job.id, {"text": "done"})
+        finished = store.get(job.id)
+        assert finished.result == {"text": "done"} and finished.progress == 1.0
+        assert store.purge_expired() == 0
+        assert store.purge_expired(now=finished.expires_at + 1) == 1
+        assert store.get(job.id) is None and not upload.exists()
+
+    def test_worker_pool_runs_handlers(self, tmp_path):
+        """Test workers run handlers, record progress, results and failures, and clean inputs."""
+        store = JobStore(str(tmp_path / "jobs.db"))
+        seen = []
+
+        async def transcribe(job, ctx):
+            for i in range(1, 5):
+                ctx.report(i / 4, {"windows": i})
+                seen.append(store.get(job.id).progress)
+            return {"text": job.params["text"]}
+
+        async def broken(job, ctx):
+            raise RuntimeError("decoder exploded")
+
+        upload = tmp_path / "input.wav"
+        upload.write_bytes(b"RIFF")
+        ok = store.create("transcribe", user_id="alice", params={"text": "hi"}, input_path=str(upload))
+        bad = store.create("pipeline", user_id="bob")
+        pool = JobWorkerPool(store, {"transcribe": transcribe, "pipeline": broken}, workers=2, poll_interval=0.05)
+        pool.start()
+        try:
+            assert _wait_for(lambda: all(store.get(j.id).finished for j in (ok, bad)))
+        finally:
+            pool.stop()
+        done = store.get(ok.id)
+        assert done.status == "succeeded" and done.result == {"text": "hi"}
+        assert done.partial == {"windows": 4} and seen == [0.25, 0.5, 0.75, 1.0]
+        assert not upload.exists()
+        failed = store.get(bad.id)
+        assert failed.status == "failed" and failed.error == "decoder exploded"
+
+    def test_heartbeat_keeps_silent_jobs_leased(self, tmp_path):
+        """Test a job that reports nothing for several lease periods runs exactly once."""
+        store = JobStore(str(tmp_path / "jobs.db"))
+        runs = []
+
+        async def slow(job, ctx):
+            runs.append(job.id)
+            time.sleep(1.0)
+            return {"runs": len(runs)}
+
+        job = store.create("transcribe", user_id="alice")
+        pools = [
+            JobWorkerPool(store, {"transcribe": slow}, workers=1, lease_seconds=0.3, poll_interval=0.05)
+            for _ in range(2)
+        ]
+        for pool in pools:
+            pool.start()
+        try:
+            assert _wait_for(lambda: store.get(job.id).finished)
+        finally:
+            for pool in pools:
+                pool.stop()
+        done = store.get(job.id)
+        assert done.status == "succeeded" and runs == [job.id]
@@ -0,0 +1,42 @@
+"""
+Language context tests: ASR-provided languages skip text detection during routing.
+"""
+from app.utils import lang_detect
+from app.utils.lang_detect import LanguageContext, TranslationRouter, resolve_language, resolve_languages
+
+
+class TestLanguageContext:
+    """Test suite for propagating the ASR language into translation routing."""
+
+    def test_from_asr(self):
+        """Test contexts built from ASR results, explicit requests and nested contexts."""
+        asr = {"text": "bonjour", "language": "fr", "language_probability": 0.97}
+        assert LanguageContext.from_asr(asr) == LanguageContext("fr", 0.97, "asr")
+        assert LanguageContext.from_asr(asr, requested_language="de") == LanguageContext("de", 1.0, "user")
+        assert LanguageContext.from_asr(asr, requested_language="auto").source == "asr"
+        nested = {"language_context": {"language": "es", "probability": 0.8, "source": "asr"}}
+        assert LanguageContext.from_asr(nested).language == "es"
+        assert not LanguageContext("auto", 0.99).is_reliable()
+        assert not LanguageContext("fr", None).is_reliable()
+
+    def test_reliable_context_skips_detection(self, monkeypatch):
+        """Test text detection only runs for missing or low-confidence contexts."""
+        calls = []
+
+        def fake_batch(texts, with_confidence=False):
+            calls.append(list(texts))
+            return [("de", 0.9) for _ in texts]
+
+        monkeypatch.setattr(lang_detect, "batch_detect_lang", fake_batch)
+        monkeypatch.setattr(lang_detect, "detect_text_lang_with_confidence", lambda text: ("de", 0.9))
+
+        confident = LanguageContext("fr", 0.95)
+        assert resolve_language("hello", confident, min_confidence=0.7) is confident
+        assert resolve_language("hello", LanguageContext("fr", 0.4), min_confidence=0.7).source == "text"
+
+        router = TranslationRouter({"en": "en-model", "fr": "fr-model", "de": "de-model"})
+        assert router.route("anything", confident) == "fr-model"
+        models = router.batch_route(["a", "b", "c"], [confident, None, LanguageContext("fr", 0.1)])
+        assert models == ["fr-model", "de-model", "de-model"]
+        assert calls == [["b", "c"]]
+        assert [ctx.source for ctx in resolve_languages(["x"], [confident])] == ["asr"]
@@ -0,0 +1,162 @@
+"""
+Long-form ASR tests: silence-aligned chunking, concurrent replicas and stitching.
+"""
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from app.services.longform_asr import Chunk, LongFormTranscriber, ReplicaPool, plan_chunks, stitch, stream_chunks
+from app.utils.audio_stream import iter_windows
+
+SR = 16000
+
+
+class FakeReplica:
+    """Emits one word per second of chunk audio; tracks how many chunks run at once."""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def detect_language(self, audio):
+        return "en", 0.9
+
+    def transcribe_chunk(self, audio, language):
+        with FakeReplica.lock:
+            FakeReplica.active += 1
+            FakeReplica.peak = max(FakeReplica.peak, FakeReplica.active)
+        time.sleep(0.05)
+        with FakeReplica.lock:
+            FakeReplica.active -= 1
+        seconds = len(audio) // SR
+        words = [{"word": f"w{i}", "start": i + 0.1, "end": i + 0.6} for i in range(seconds)]
+        return {"segments": [{"start": 0.0, "end": float(seconds), "text": " ".join(w["word"] for w in words),
+                              "words": words}] if words else []}
+
+
+def _speech_with_pauses(sr: int = SR) -> np.ndarray:
+    """Noise bursts of 12 s separated by 1 s pauses, 100 s total."""
+    rng = np.random.default_rng(0)
+    audio = np.zeros(100 * sr, dtype=np.float32)
+    for start in range(0, 100, 13):
+        audio[start * sr:min(start + 12, 100) * sr] = rng.normal(scale=0.3, size=(min(start + 12, 100) - start) * sr)
+    return np.clip(audio, -1.0, 1.0)
+
+
+class TestLongFormAsr:
+    """Test suite for parallel long-form transcription."""
+
+    def test_plan_cuts_in_silence(self):
+        """Test segments are packed up to the limit and long runs are split with overlap."""
+        chunks = plan_chunks([(0, 10), (12, 20), (25, 40), (41, 100)], max_samples=30, overlap_samples=5)
+        assert [(c.start, c.end, c.overlaps_previous) for c in chunks] == [
+            (0, 20, False), (25, 40, False), (41, 71, False), (66, 96, True), (91, 100, True)
+        ]
+        assert plan_chunks([], 30) == []
+
+    def test_streamed_chunks_cut_in_silence(self):
+        """Test chunks planned from 7 s windows end in pauses and carry the right audio."""
+        audio = _speech_with_pauses()
+        bursts = [(s * SR, min(s + 12, 100) * SR) for s in range(0, 100, 13)]
+        chunks = list(stream_chunks(iter_windows([audio], SR, window_seconds=7), SR, 30 * SR, SR))
+        assert len(chunks) >= 4
+        for chunk, samples in chunks:
+            assert chunk.end - chunk.start <= 30 * SR and not chunk.overlaps_previous
+            assert np.array_equal(samples, audio[chunk.start:chunk.end])
+            assert not any(start < chunk.end < end for start, end in bursts)
+        covered = np.zeros(len(audio), dtype=bool)
+        for chunk, _ in chunks:
+            covered[chunk.start:chunk.end] = True
+        assert all(covered[start:end].all() for start, end in bursts)
+
+    def test_streamed_chunks_split_long_speech_with_overlap(self):
+        """Test continuous speech is hard-split into overlapping chunks across window boundaries."""
+        audio = np.clip(np.random.default_rng(1).normal(scale=0.3, size=95 * SR), -1, 1).astype(np.float32)
+        chunks = [chunk for chunk, _ in stream_chunks(iter_windows([audio], SR, window_seconds=7), SR, 30 * SR, SR)]
+        assert [(c.start // SR, c.end // SR, c.overlaps_previous) for c in chunks] == [
+            (0, 30, False), (29, 59, True), (58, 88, True), (87, 95, True)
+        ]
+
+    def test_stitch_offsets_and_overlap_dedup(self):
+        """Test global timestamps and that overlap words are kept exactly once."""
+        chunks = [Chunk(0, 10 * SR), Chunk(8 * SR, 18 * SR, overlaps_previous=True)]
+        first = {"segments": [{"start": 0.0, "end": 10.0, "text": "", "words": [
+            {"word": "a", "start": 7.0, "end": 7.5}, {"word": "b", "start": 8.2, "end": 8.6},
+            {"word": "c", "start": 9.2, "end": 9.6}]}]}
+        second = {"segments": [{"start": 0.0, "end": 10.0, "text": "", "words": [
+            {"word": "b", "start": 0.2, "end": 0.6}, {"word": "c", "start": 1.2, "end": 1.6},
+            {"word": "d", "start": 2.0, "end": 2.5}]}]}
+        result = stitch(chunks, [first, second], SR)
+        assert [w["word"] for w in result["words"]] == ["a", "b", "c", "d"]
+        assert [w["start"] for w in result["words"]] == [7.0, 8.2, 9.2, 10.0]
+        assert result["text"] == "a b c d"
+
+    def test_chunks_run_concurrently(self):
+        """Test chunks are spread over the replicas and stitched in order."""
+        FakeReplica.peak = 0
+        transcriber = LongFormTranscriber(ReplicaPool([FakeReplica() for _ in range(4)]), chunk_seconds=30)
+        audio = _speech_with_pauses()
+        chunks = transcriber.plan(audio)
+        assert all(c.end - c.start <= 30 * SR for c in chunks) and len(chunks) >= 4
+        result = asyncio.run(transcriber.transcribe(audio))
+        assert FakeReplica.peak > 1
+        starts = [w["start"] for w in result["words"]]
+        assert starts == sorted(starts) and result["language"] == "en"
+        assert result["chunks"] == len(chunks) and result["duration"] == 100.0
+
+    def test_pool_serves_several_event_loops(self):
+        """Test one transcriber works across separate asyncio.run calls (job workers)."""
+        transcriber = LongFormTranscriber(ReplicaPool([FakeReplica() for _ in range(2)]), chunk_seconds=30)
+        audio = _speech_with_pauses()
+        first = asyncio.run(transcriber.transcribe(audio))
+        second = asyncio.run(transcriber.transcribe(audio))
+        assert first["text"] == second["text"] and first["text"]
+
+    def test_streamed_windows_run_concurrently(self):
+        """Test streamed windows are chunked, transcribed in parallel and reported in order."""
+        FakeReplica.peak = 0
+        transcriber = LongFormTranscriber(ReplicaPool([FakeReplica() for _ in range(4)]), chunk_seconds=30)
+        audio = _speech_with_pauses()
+        progress = []
+        result = asyncio.run(transcriber.transcribe_stream(
+            iter_windows([audio], SR, window_seconds=5), SR,
+            on_chunk=lambda done, partial: progress.append((done, partial["text"]))
+        ))
+        assert FakeReplica.peak > 1
+        assert result["text"] == asyncio.run(transcriber.transcribe(audio))["text"]
+        assert result["duration"] == 100.0 and len(progress) == result["chunks"]
+        assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+        assert progress[-1][1] == result["text"]
+
+    def test_window_decoding_does_not_block_the_event_loop(self):
+        """Test slow window producers run off the loop, so other coroutines keep running."""
+        transcriber = LongFormTranscriber(ReplicaPool([FakeReplica() for _ in range(2)]), chunk_seconds=30)
+        audio = _speech_with_pauses()
+        producer_threads = []
+
+        def slow_windows():
+            for offset, window in iter_windows([audio], SR, window_seconds=5):
+                producer_threads.append(threading.get_ident())
+                time.sleep(0.01)  # stands in for a blocking file/ffmpeg read
+                yield offset, window
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.005)
+                    ticks += 1
+
+            task = asyncio.ensure_future(ticker())
+            result = await transcriber.transcribe_stream(slow_windows(), SR)
+            task.cancel()
+            return result, ticks, threading.get_ident()
+
+        result, ticks, main_thread = asyncio.run(main())
+        assert result["duration"] == 100.0
+        assert main_thread not in producer_threads
+        assert ticks >= 10
@@ -0,0 +1,97 @@
+"""
+Speaker index tests: persistence, growth, search, removal and incremental ANN updates.
+"""
+import numpy as np
+
+from app.services import speaker_index as speaker_index_module
+from app.services.speaker_index import SpeakerIndex
+
+
+class _FlatIndex:
+    """Exact inner-product stand-in for faiss.IndexHNSWFlat that counts builds and adds."""
+
+    builds = 0
+
+    def __init__(self, dim, m, metric):
+        type(self).builds += 1
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.adds = 0
+
+    @property
+    def ntotal(self):
+        return self.vectors.shape[0]
+
+    def add(self, vectors):
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.adds += 1
+
+    def search(self, queries, k):
+        scores = queries @ self.vectors.T
+        rows = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(scores, rows, axis=1), rows
+
+
+class TestSpeakerIndex:
+    """Test suite for the memory-mapped speaker embedding index."""
+
+    def test_search_survives_growth_and_reopen(self, tmp_path):
+        """Test top-k search after the backing matrix grows and the index is reopened."""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(10, 8)).astype(np.float32)
+        index = SpeakerIndex(str(tmp_path), dim=8, initial_capacity=4, ann_min_size=0)
+        for i, vector in enumerate(vectors):
+            index.add(f"spk{i}", vector, metadata={"n": i})
+
+        reopened = SpeakerIndex(str(tmp_path), ann_min_size=0)
+        assert len(reopened) == 10
+        matches = reopened.search(vectors[7] * 3.0, top_k=3)
+        assert matches[0]["speaker_id"] == "spk7"
+        assert abs(matches[0]["similarity"] - 1.0) < 1e-5
+        assert matches[0]["metadata"] == {"n": 7}
+        assert matches[0]["similarity"] >= matches[1]["similarity"] >= matches[2]["similarity"]
+
+    def test_remove_and_duplicates(self, tmp_path):
+        """Test removal keeps the id map consistent and near-duplicates are reported."""
+        index = SpeakerIndex(str(tmp_path), dim=3, ann_min_size=0)
+        index.add("a", np.array([1.0, 0.0, 0.0]))
+        index.add("b", np.array([0.0, 1.0, 0.0]))
+        index.add("c", np.array([0.99, 0.05, 0.0]))
+        assert index.near_duplicates(threshold=0.95)[0][:2] == ("a", "c")
+
+        assert index.remove("a")
+        assert not index.remove("a")
+        assert index.speaker_ids == ["c", "b"]
+        assert index.search(np.array([0.0, 1.0, 0.0]), top_k=1)[0]["speaker_id"] == "b"
+
+    def test_journal_replays_after_reopen(self, tmp_path):
+        """Test adds, overwrites and removals logged since the last snapshot survive a reopen."""
+        index = SpeakerIndex(str(tmp_path), dim=3, ann_min_size=0)
+        index.add("a", np.array([1.0, 0.0, 0.0]), metadata={"n": 1})
+        index.add("b", np.array([0.0, 1.0, 0.0]))
+        index.add("c", np.array([0.0, 0.0, 1.0]))
+        index.add("a", np.array([1.0, 1.0, 0.0]), metadata={"n": 2})
+        index.remove("b")
+        assert (tmp_path / "ids.journal").exists()
+
+        reopened = SpeakerIndex(str(tmp_path), ann_min_size=0)
+        assert reopened.speaker_ids == ["a", "c"] and reopened.get_metadata("a") == {"n": 2}
+        assert reopened.search(np.array([0.0, 0.0, 1.0]), top_k=1)[0]["speaker_id"] == "c"
+
+    def test_ann_is_extended_not_rebuilt_on_enroll(self, tmp_path, monkeypatch):
+        """Test new speakers are added to a built ANN index; removals force a rebuild."""
+        fake_faiss = type("faiss", (), {"IndexHNSWFlat": _FlatIndex, "METRIC_INNER_PRODUCT": 0})
+        monkeypatch.setattr(speaker_index_module, "faiss", fake_faiss, raising=False)
+        monkeypatch.setattr(speaker_index_module, "HAS_FAISS", True)
+        _FlatIndex.builds = 0
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(20, 8)).astype(np.float32)
+        index = SpeakerIndex(str(tmp_path), dim=8, ann_min_size=5)
+        for i, vector in enumerate(vectors):
+            index.search(vector, top_k=1)
+            index.add(f"spk{i}", vector)
+        assert _FlatIndex.builds == 1 and index._ann.ntotal == 20
+        assert index.search(vectors[12], top_k=1)[0]["speaker_id"] == "spk12"
+
+        index.remove("spk3")
+        assert index.search(vectors[19], top_k=1)[0]["speaker_id"] == "spk19"
+        assert _FlatIndex.builds == 2
@@ -0,0 +1,47 @@
+"""
+Word alignment tests: WER components, diff format and streaming renderers.
+"""
+import json
+import random
+
+from app.utils.text_alignment import align_texts, align_words, colorize_diff, iter_json, word_level_diff
+
+
+def levenshtein(a, b):
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i]
+        for j, y in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return prev[-1]
+
+
+class TestTextAlignment:
+    """Test suite for the shared banded Levenshtein alignment."""
+
+    def test_wer_components(self):
+        """Test substitution, deletion and insertion counts on a small example."""
+        result = align_texts("the cat sat on the mat", "the bat sat the mat now")
+        assert (result.hits, result.substitutions, result.deletions, result.insertions) == (4, 1, 1, 1)
+        assert abs(result.wer - 0.5) < 1e-9
+
+    def test_matches_reference_distance_on_repetitive_text(self):
+        """Test that edit distance is optimal on random repetitive sequences."""
+        rng = random.Random(0)
+        for _ in range(200):
+            ref = [rng.choice("abc") for _ in range(rng.randint(0, 80))]
+            hyp = [rng.choice("abcd") for _ in range(rng.randint(0, 80))]
+            result = align_words(ref, hyp)
+            assert result.errors == levenshtein(ref, hyp)
+            assert [ref[i] for _, i, _ in result.ops if i >= 0] == ref
+            assert [hyp[j] for _, _, j in result.ops if j >= 0] == hyp
+
+    def test_diff_format_and_renderers(self):
+        """Test the {word, status} diff and the HTML/JSON renderers."""
+        diff = word_level_diff("a <b> c", "a x c d")
+        assert [d["status"] for d in diff] == ["correct", "mismatch", "mismatch", "correct", "extra"]
+        html = colorize_diff(diff)
+        assert "&lt;b&gt;" in html
+        assert html.count("<span") == 5
+        assert json.loads("".join(iter_json(diff, chunk_size=2))) == diff
@@ -0,0 +1,72 @@
+"""
+Translation memory tests: exact and fuzzy lookup, persistence and sentence splitting.
+"""
+from app.services.translation_memory import TranslationMemory, segment_similarity, split_sentences
+
+
+class TestTranslationMemory:
+    """Test suite for the SQLite/MinHash translation memory."""
+
+    def test_exact_hit_ignores_whitespace(self, tmp_path):
+        """Test exact lookup on the normalized source and isolation between language pairs."""
+        tm = TranslationMemory(str(tmp_path / "tm.db"))
+        tm.add("Reset your password from the account page.", "Réinitialisez votre mot de passe.", "en", "fr",
+               confidence=-0.2, model="opus")
+
+        match = tm.lookup("  Reset your password   from the account page. ", "en", "fr")
+        assert match.exact and match.similarity == 1.0
+        assert match.target_text == "Réinitialisez votre mot de passe."
+        assert match.confidence == -0.2
+        assert tm.lookup("Reset your password from the account page.", "en", "de") is None
+
+    def test_fuzzy_hit_and_miss(self, tmp_path):
+        """Test near-duplicates are found through LSH and unrelated sentences miss."""
+        tm = TranslationMemory(str(tmp_path / "tm.db"), fuzzy_threshold=0.8)
+        tm.add_many([
+            ("Click the Save button to keep your changes to the document.", "Cliquez sur Enregistrer.", None),
+            ("The invoice is sent by email at the end of each month.", "La facture est envoyée.", None)
+        ], "en", "fr")
+
+        match = tm.lookup("Click the Save button to keep your changes to the report.", "en", "fr")
+        assert match is not None and not match.exact
+        assert match.target_text == "Cliquez sur Enregistrer."
+        assert 0.8 <= match.similarity < 1.0
+        assert tm.lookup("Click the Save button to keep your changes to the report.", "en", "fr", fuzzy=False) is None
+        assert tm.lookup("Our office is closed on public holidays.", "en", "fr") is None
+
+    def test_persistence_and_stats(self, tmp_path):
+        """Test segments survive reopening, updates overwrite, and hits are counted."""
+        path = str(tmp_path / "tm.db")
+        tm = TranslationMemory(path)
+        first = tm.add("Hello world.", "Bonjour le monde.", "en", "fr")
+        assert tm.add("Hello  world.", "Salut le monde.", "en", "fr") == first
+
+        reopened = TranslationMemory(path)
+        assert reopened.lookup("Hello world.", "en", "fr").target_text == "Salut le monde."
+        stats = reopened.stats()
+        assert stats["segments"] == 1 and stats["hits"] == 1
+        assert stats["pairs"][0]["pair"] == "en-fr"
+
+    def test_split_sentences_keeps_layout(self):
+        """Test sentence splitting keeps the separators needed to rebuild paragraphs."""
+        pieces = split_sentences("Hello there. How are you?\n\nFine!")
+        assert pieces == [("Hello there.", " "), ("How are you?", "\n\n"), ("Fine!", "")]
+        assert "".join(s + sep for s, sep in pieces) == "Hello there. How are you?\n\nFine!"
+        assert segment_similarity("The cat sat.", "the cat sat.") == 1.0
+
+    def test_hint_matches_are_not_counted_as_hits(self, tmp_path):
+        """Test fuzzy matches used only as hints are counted as `hint`, not served `fuzzy` hits."""
+        from app.core.observability import TRANSLATION_MEMORY_LOOKUPS
+
+        def count(result):
+            return TRANSLATION_MEMORY_LOOKUPS.labels(result)._value.get()
+
+        tm = TranslationMemory(str(tmp_path / "tm.db"), fuzzy_threshold=0.8)
+        tm.add("Click the Save button to keep your changes to the document.", "Cliquez sur Enregistrer.", "en", "fr")
+        query = "Click the Save button to keep your changes to the report."
+        fuzzy, hint = count("fuzzy"), count("hint")
+        assert tm.lookup_many([query], "en", "fr", serve_fuzzy=False)[0] is not None
+        assert (count("fuzzy"), count("hint")) == (fuzzy, hint + 1)
+        assert tm.stats()["hits"] == 0
+        tm.lookup_many([query], "en", "fr")
+        assert (count("fuzzy"), count("hint")) == (fuzzy + 1, hint + 1)
@@ -0,0 +1,67 @@
+"""
+VAD tests: frame masks, segment merging and equivalence with per-frame filtering.
+"""
+import numpy as np
+import webrtcvad
+
+from app.utils.extra_features import NoiseSuppressor
+from app.utils.vad import detect_speech, merge_segments, to_int16, voiced_audio
+
+
+def _bursty_signal(sr: int = 16000) -> np.ndarray:
+    """Silence with two loud noise bursts."""
+    rng = np.random.default_rng(0)
+    audio = np.zeros(3 * sr, dtype=np.float32)
+    audio[int(0.5 * sr):int(1.2 * sr)] = rng.normal(scale=0.3, size=int(0.7 * sr))
+    audio[int(1.5 * sr):int(2.4 * sr)] = rng.normal(scale=0.3, size=int(0.9 * sr))
+    return np.clip(audio, -1.0, 1.0)
+
+
+class TestVad:
+    """Test suite for the shared WebRTC VAD helpers."""
+
+    def test_matches_per_frame_loop(self):
+        """Test the gathered voiced audio equals a per-frame extend loop on the same PCM."""
+        sr, audio = 16000, _bursty_signal()
+        vad = webrtcvad.Vad(2)
+        frame_length = 480
+        expected = []
+        for i in range(0, len(audio) - frame_length + 1, frame_length):
+            frame = audio[i:i + frame_length]
+            pcm = np.clip(np.rint(frame * 32768.0), -32768, 32767).astype(np.int16).tobytes()
+            if vad.is_speech(pcm, sr):
+                expected.extend(frame)
+
+        result = detect_speech(audio, sr, aggressiveness=2)
+        assert np.array_equal(voiced_audio(audio, result), np.array(expected, dtype=np.float32))
+        assert 1 <= len(result.segments) <= 4
+        assert result.frame_mask.sum() * frame_length == len(expected)
+
+    def test_int16_conversion_vs_legacy_truncation(self):
+        """Test rounding stays within 1 LSB of the legacy cast and +1.0 saturates instead of wrapping."""
+        audio = np.concatenate([_bursty_signal(), [1.0, -1.0]]).astype(np.float32)
+        legacy = (audio * 32768).astype(np.int16).astype(np.int32)
+        pcm = to_int16(audio).astype(np.int32)
+        in_range = audio < 1.0
+        assert np.abs(pcm[in_range] - legacy[in_range]).max() <= 1
+        assert (pcm[~in_range] == 32767).all() and (legacy[~in_range] == -32768).all()
+        assert pcm[-1] == legacy[-1] == -32768
+
+    def test_merge_segments_padding_and_hangover(self):
+        """Test padding extends segments and short pauses are bridged."""
+        mask = np.array([0, 1, 1, 0, 0, 1, 0, 0, 0, 0, 1], dtype=bool)
+        assert merge_segments(mask, 10, 110) == [(10, 30), (50, 60), (100, 110)]
+        assert merge_segments(mask, 10, 110, min_gap_frames=3) == [(10, 60), (100, 110)]
+        assert merge_segments(mask, 10, 105, padding_frames=1) == [(0, 70), (90, 105)]
+
+    def test_noise_suppressor_frames_and_signal(self):
+        """Test NoiseSuppressor keeps its frame API and filters whole signals."""
+        sr, audio = 16000, _bursty_signal()
+        suppressor = NoiseSuppressor(aggressiveness=2)
+        pcm = np.clip(np.rint(audio * 32768.0), -32768, 32767).astype(np.int16).tobytes()
+        frames = [pcm[i:i + 960] for i in range(0, len(pcm) - 959, 960)]
+        kept = suppressor.filter_speech(frames, sr)
+        assert len(kept) == int(suppressor.speech_mask(frames, sr).sum()) > 0
+        assert len(suppressor.filter_audio(audio, sr)) == len(kept) * 480
+        padded = suppressor.filter_audio(audio, sr, padding_ms=90)
+        assert len(padded) > len(kept) * 480
@@ -0,0 +1,92 @@
+"""
+Benchmark the compiled idiom rewriter against the legacy per-phrase implementation
+on book-length input, with the shipped en-zh lexicon and with larger synthetic
+lexicons (the legacy cost grows with the number of idioms, the compiled one does not).
+
+Usage (from the project root):
+  python benchmarks/bench_context_optimizer.py --chars 2000000 --lexicon-sizes 500 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.context_optimizer import apply_lexicon, compile_lexicon, load_idioms
+
+FILLER = (
+    "The committee met again on Tuesday to review the budget for the coming year. "
+    "Several members raised concerns about the timeline, and the chair asked for a revised plan. "
+    "After a long discussion the proposal was approved with minor changes. "
+)
+
+
+def legacy_optimize_context(text, idioms):
+    """The previous implementation: lowercase, then `in` + `str.replace` per phrase."""
+    text_lower = text.lower()
+    for phrase, replacement in idioms.items():
+        if phrase in text_lower:
+            text_lower = text_lower.replace(phrase, replacement)
+    return text_lower
+
+
+def build_text(n_chars, idioms, seed=0):
+    """Filler prose with an idiom sentence roughly every 500 characters."""
+    rng = random.Random(seed)
+    phrases = list(idioms)
+    parts, size = [], 0
+    while size < n_chars:
+        part = FILLER + f"Honestly, it was {rng.choice(phrases).capitalize()} for everyone. "
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+
+def synthetic_lexicon(base, size, seed=1):
+    """Extend `base` to `size` entries with made-up three-word phrases."""
+    rng = random.Random(seed)
+    syllables = ["ka", "lo", "mi", "ru", "zen", "tor", "vel", "qua", "dri", "fos"]
+    lexicon = dict(base)
+    while len(lexicon) < size:
+        phrase = " ".join("".join(rng.choice(syllables) for _ in range(3)) for _ in range(3))
+        lexicon[phrase] = f"<{len(lexicon)}>"
+    return lexicon
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark idiom replacement on long inputs")
+    parser.add_argument("--chars", type=int, default=2_000_000, help="Approximate input length")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--lexicon-sizes", type=int, nargs="*", default=[500, 2000],
+                        help="Synthetic lexicon sizes to test in addition to the shipped one")
+    args = parser.parse_args()
+
+    idioms = load_idioms()["en-zh"]
+    text = build_text(args.chars, idioms)
+    print(f"Input: {len(text):,} chars")
+    print(f"{'idioms':>7} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8} {'same output':>12}")
+
+    for size in [len(idioms)] + args.lexicon_sizes:
+        lexicon = synthetic_lexicon(idioms, size)
+        compiled = compile_lexicon(lexicon)  # compiled once per process in the app, so not timed
+        legacy_s, legacy_out = best_of(lambda: legacy_optimize_context(text, lexicon), args.repeat)
+        compiled_s, compiled_out = best_of(lambda: apply_lexicon(text, compiled), args.repeat)
+        # The legacy version lowercases everything; compare on lowercased output
+        same = compiled_out.lower() == legacy_out
+        print(f"{len(lexicon):>7} {legacy_s * 1000:>10.1f} {compiled_s * 1000:>12.1f} "
+              f"{legacy_s / compiled_s:>7.1f}x {str(same):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Compare NLLB translation backends (PyTorch fp32 vs CTranslate2 int8) on every pair in
+config.SUPPORTED_LANGUAGE_PAIRS: peak memory, load time, per-sentence latency and BLEU.
+
+Each backend runs in its own subprocess so peak RSS is measured in isolation.
+
+Usage (from the project root):
+  python -m models.ctranslate2_model                 # one-time int8 conversion
+  python benchmarks/bench_translation_backends.py
+  python benchmarks/bench_translation_backends.py --data my_pairs.jsonl --beams 4
+where my_pairs.jsonl holds {"en": "...", "zh": "..."} lines.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+BACKENDS = ["transformers", "ctranslate2"]
+
+# Small built-in parallel set; pass --data for a real test set
+DEFAULT_PAIRS = [
+    {"en": "The weather is very nice today.", "zh": "今天天气很好。"},
+    {"en": "I would like to book a table for two people.", "zh": "我想预订一张两人桌。"},
+    {"en": "Where is the nearest subway station?", "zh": "最近的地铁站在哪里？"},
+    {"en": "This project uses speech recognition and machine translation.", "zh": "这个项目使用语音识别和机器翻译。"},
+    {"en": "Please send me the report before Friday.", "zh": "请在星期五之前把报告发给我。"},
+    {"en": "He has been learning Chinese for three years.", "zh": "他学习中文已经三年了。"},
+    {"en": "The meeting was postponed because of the storm.", "zh": "会议因为暴风雨而推迟了。"},
+    {"en": "Thank you very much for your help.", "zh": "非常感谢你的帮助。"},
+]
+
+
+def load_pairs(path):
+    if not path:
+        return DEFAULT_PAIRS
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_backend(backend, pairs, beams, length_penalty):
+    """Child mode: load one backend, translate every pair direction, print JSON."""
+    import sacrebleu
+    import config
+    from models import create_translator
+
+    rss_before = peak_rss_mb()
+    t0 = time.perf_counter()
+    translator = create_translator(backend, num_beams=beams, length_penalty=length_penalty)
+    load_s = time.perf_counter() - t0
+    report = {"backend": backend, "load_s": load_s, "pairs": {}}
+
+    for src, tgt in config.SUPPORTED_LANGUAGE_PAIRS:
+        sources = [p[src] for p in pairs]
+        references = [p[tgt] for p in pairs]
+        translator.translate(sources[0], src, tgt)   # warm-up
+        latencies, hypotheses = [], []
+        for sentence in sources:
+            start = time.perf_counter()
+            hypotheses.append(translator.translate(sentence, src, tgt))
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        translator.translate_batch(sources, src, tgt)
+        batch_s = time.perf_counter() - start
+        bleu = sacrebleu.corpus_bleu(hypotheses, [references], tokenize="zh" if tgt == "zh" else "13a")
+        report["pairs"][f"{src}-{tgt}"] = {
+            "bleu": bleu.score,
+            "latency_mean_s": statistics.mean(latencies),
+            "latency_p50_s": statistics.median(latencies),
+            "batched_sentences_per_s": len(sources) / batch_s,
+            "samples": hypotheses[:3]
+        }
+    report["model_rss_mb"] = peak_rss_mb() - rss_before
+    report["peak_rss_mb"] = peak_rss_mb()
+    print(json.dumps(report, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NLLB translation backends")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--data", default=None, help="JSONL file with en/zh sentence pairs")
+    parser.add_argument("--beams", type=int, default=None, help="Beam size (default: config.NUM_BEAMS)")
+    parser.add_argument("--length-penalty", type=float, default=None)
+    parser.add_argument("--output", default="outputs/benchmarks/translation_backends.json")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.data)
+    if args.child:
+        run_backend(args.child, pairs, args.beams, args.length_penalty)
+        return
+
+    reports = []
+    for backend in args.backends:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", backend]
+        for flag, value in (("--data", args.data), ("--beams", args.beams), ("--length-penalty", args.length_penalty)):
+            if value is not None:
+                cmd += [flag, str(value)]
+        proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"[{backend}] failed:\n{proc.stderr.strip()[-2000:]}")
+            continue
+        reports.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{'backend':<14} {'pair':<6} {'BLEU':>6} {'mean s':>8} {'p50 s':>8} {'batch sent/s':>13} {'peak MB':>8} {'load s':>7}")
+    for report in reports:
+        for pair, stats in report["pairs"].items():
+            print(f"{report['backend']:<14} {pair:<6} {stats['bleu']:>6.1f} {stats['latency_mean_s']:>8.3f} "
+                  f"{stats['latency_p50_s']:>8.3f} {stats['batched_sentences_per_s']:>13.2f} "
+                  f"{report['peak_rss_mb']:>8.0f} {report['load_s']:>7.1f}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(reports, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
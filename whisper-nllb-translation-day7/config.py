@@ -1,3 +1,5 @@
+import os
+
 # Supported language pairs for translation (source_lang, target_lang)
 SUPPORTED_LANGUAGE_PAIRS = [
     ("en", "zh"),
@@ -7,3 +9,28 @@ SUPPORTED_LANGUAGE_PAIRS = [
 # Default source and target languages
 DEFAULT_SOURCE_LANG = "en"
 DEFAULT_TARGET_LANG = "zh"
+
+# Whisper ASR model size used by utils/whisper_integration.py
+WHISPER_MODEL_NAME = os.environ.get("WHISPER_MODEL_NAME", "large")
+
+# ASR backend: "faster-whisper" (CTranslate2 int8, batched, VAD) or "whisper" (openai-whisper)
+ASR_BACKEND = os.environ.get("ASR_BACKEND", "faster-whisper")
+FASTER_WHISPER_COMPUTE_TYPE = "int8"
+ASR_BATCH_SIZE = 8
+ASR_VAD_FILTER = True
+
+# NLLB translation model and decoding settings
+NLLB_MODEL_NAME = "facebook/nllb-200-1.3B"
+NUM_BEAMS = 5
+LENGTH_PENALTY = 1.0
+
+# Translation backend: "transformers" (PyTorch fp32) or "ctranslate2" (int8 on CPU)
+TRANSLATION_BACKEND = os.environ.get("TRANSLATION_BACKEND", "transformers")
+
+# Where the converted CTranslate2 model is cached (created on first use)
+CT2_MODEL_DIR = os.environ.get("CT2_MODEL_DIR", os.path.join("models", "ct2", "nllb-200-1.3B-int8"))
+CT2_COMPUTE_TYPE = "int8"
+
+# Whisper's language probability above which the detected language is trusted as-is
+# (text-based detection only runs below it)
+LANGUAGE_CONFIDENCE_THRESHOLD = 0.7
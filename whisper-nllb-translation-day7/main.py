@@ -1,6 +1,6 @@
 from utils.whisper_integration import transcribe_audio
 from utils.context_optimizer import optimize_context
-from models.huggingface_model import Translator
+from utils.model_registry import registry
 
 def translate_pipeline(audio_file, src_lang, tgt_lang):
     """
@@ -9,9 +9,9 @@ def translate_pipeline(audio_file, src_lang, tgt_lang):
     2) Optimize context for better translation.
     3) Translate optimized text.
     """
-    transcript = transcribe_audio(audio_file)
+    transcript = transcribe_audio(audio_file)["text"]
     optimized_text = optimize_context(transcript, src_lang, tgt_lang)
-    translator = Translator()
+    translator = registry.get("translator")
     translation = translator.translate(optimized_text, src_lang, tgt_lang)
     
     return {
@@ -0,0 +1,16 @@
+import config
+
+
+def create_translator(backend=None, **kwargs):
+    """
+    Build the NLLB translator for `backend`:
+    "transformers" (PyTorch, fp32) or "ctranslate2" (int8); defaults to config.TRANSLATION_BACKEND.
+    """
+    backend = backend or config.TRANSLATION_BACKEND
+    if backend == "ctranslate2":
+        from models.ctranslate2_model import CTranslate2Translator
+        return CTranslate2Translator(**kwargs)
+    if backend == "transformers":
+        from models.huggingface_model import Translator
+        return Translator(**kwargs)
+    raise ValueError(f"Unknown translation backend: {backend}")
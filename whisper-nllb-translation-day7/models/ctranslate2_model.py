@@ -0,0 +1,76 @@
+import os
+
+import config
+from models.huggingface_model import Translator
+
+try:
+    import ctranslate2
+except ImportError:
+    ctranslate2 = None
+
+def convert_model(model_name: str = None, output_dir: str = None, quantization: str = None) -> str:
+    """
+    Convert the Hugging Face NLLB checkpoint to a CTranslate2 model directory (once).
+
+    The converted weights are cached in `output_dir` (config.CT2_MODEL_DIR by default);
+    later calls return immediately if the directory already holds a converted model.
+    """
+    if ctranslate2 is None:
+        raise ImportError("Please install ctranslate2: pip install ctranslate2")
+    model_name = model_name or config.NLLB_MODEL_NAME
+    output_dir = output_dir or config.CT2_MODEL_DIR
+    quantization = quantization or config.CT2_COMPUTE_TYPE
+
+    if os.path.isfile(os.path.join(output_dir, "model.bin")):
+        return output_dir
+    os.makedirs(os.path.dirname(output_dir) or ".", exist_ok=True)
+    converter = ctranslate2.converters.TransformersConverter(model_name)
+    converter.convert(output_dir, quantization=quantization)
+    return output_dir
+
+class CTranslate2Translator(Translator):
+    """
+    NLLB translator running on CTranslate2 with int8 weights (about 1.4 GB instead of
+    ~5 GB fp32 for the 1.3B model, and several times faster beam search on CPU).
+    Segmentation, batching and reassembly are inherited from Translator.
+    """
+
+    def __init__(self, model_dir: str = None, compute_type: str = None, **kwargs):
+        self.model_dir = model_dir or config.CT2_MODEL_DIR
+        self.compute_type = compute_type or config.CT2_COMPUTE_TYPE
+        super().__init__(**kwargs)
+
+    def _load_model(self):
+        convert_model(self.model_name, self.model_dir, self.compute_type)
+        self.model = ctranslate2.Translator(
+            self.model_dir,
+            device=self.device,
+            compute_type=self.compute_type,
+            inter_threads=1,
+            intra_threads=0          # 0 = use all physical cores
+        )
+
+    def _generate(self, batch_ids, tgt_code: str):
+        """Beam-search one batch with CTranslate2, forcing the target language token."""
+        sources = [self.tokenizer.convert_ids_to_tokens(ids) for ids in batch_ids]
+        longest = max(len(ids) for ids in batch_ids)
+        results = self.model.translate_batch(
+            sources,
+            target_prefix=[[tgt_code]] * len(sources),
+            beam_size=self.num_beams,
+            length_penalty=self.length_penalty,
+            max_batch_size=self.batch_size,
+            max_decoding_length=min(512, 2 * longest + 16)
+        )
+        outputs = []
+        for result in results:
+            # Drop the forced target-language token before decoding
+            tokens = result.hypotheses[0][1:]
+            outputs.append(self.tokenizer.decode(
+                self.tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True
+            ))
+        return outputs
+
+if __name__ == "__main__":
+    # One-time conversion: python -m models.ctranslate2_model
+    print(f"Converted model available at: {convert_model()}")
@@ -1,36 +1,104 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
+import config
+from utils.text_segmentation import segment_text, reassemble
+
 class Translator:
     """
     Translator using Facebook's NLLB 1.3B model for English <-> Chinese translations.
+    Long documents are split into sentence-packed chunks and translated in
+    length-bucketed batches, so nothing is truncated at the model's input limit.
     """
 
-    def __init__(self):
+    # Language code map for NLLB model
+    lang_code_map = {
+        ("en", "zh"): ("eng_Latn", "zho_Hans"),
+        ("zh", "en"): ("zho_Hans", "eng_Latn"),
+    }
+
+    def __init__(self, max_chunk_tokens: int = 200, batch_size: int = 8,
+                 num_beams: int = None, length_penalty: float = None):
         # Use GPU if available else CPU
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        
+
         # Model name
-        self.model_name = "facebook/nllb-200-1.3B"
-        
+        self.model_name = config.NLLB_MODEL_NAME
+
         # Load tokenizer and model to device
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+        self._load_model()
+
+        # Chunking and decoding settings
+        self.max_chunk_tokens = max_chunk_tokens
+        self.batch_size = batch_size
+        self.num_beams = num_beams or config.NUM_BEAMS
+        self.length_penalty = length_penalty if length_penalty is not None else config.LENGTH_PENALTY
+
+    def _load_model(self):
         self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name).to(self.device)
 
-        # Language code map for NLLB model
-        self.lang_code_map = {
-            ("en", "zh"): ("eng_Latn", "zho_Hans"),
-            ("zh", "en"): ("zho_Hans", "eng_Latn"),
-        }
+    def _count_tokens(self, text: str) -> int:
+        return len(self.tokenizer.tokenize(text))
+
+    def translate_batch(self, texts, src_lang: str, tgt_lang: str, progress_callback=None):
+        """
+        Translate a list of short texts (sentences or chunks), returning translations in input order.
 
-    def translate(self, text: str, src_lang: str, tgt_lang: str) -> str:
+        Texts are sorted by token length and generated `batch_size` at a time, so each
+        batch pads to similar lengths. `progress_callback(done, total, translations)` is
+        called after every batch; `translations` holds None for pending items.
+        """
+        # Validate language pair
+        if (src_lang, tgt_lang) not in self.lang_code_map:
+            raise ValueError(f"Unsupported language pair: {src_lang}-{tgt_lang}")
+
+        # Get model language codes
+        src_code, tgt_code = self.lang_code_map[(src_lang, tgt_lang)]
+        self.tokenizer.src_lang = src_code
+
+        encoded = [self.tokenizer(text)["input_ids"] for text in texts]
+        order = sorted(range(len(texts)), key=lambda i: len(encoded[i]))
+        translations = [None] * len(texts)
+        done = 0
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            decoded = self._generate([encoded[i] for i in batch_idx], tgt_code)
+            for i, text in zip(batch_idx, decoded):
+                translations[i] = text
+            done += len(batch_idx)
+            if progress_callback is not None:
+                progress_callback(done, len(texts), translations)
+        return translations
+
+    def _generate(self, batch_ids, tgt_code: str):
+        """Beam-search one padded batch of token ids and return the decoded strings."""
+        inputs = self.tokenizer.pad({"input_ids": batch_ids}, return_tensors="pt").to(self.device)
+        longest = inputs["input_ids"].shape[1]
+
+        # Generate translation with no grad for efficiency
+        with torch.no_grad():
+            generated_tokens = self.model.generate(
+                **inputs,
+                forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(tgt_code),
+                max_length=min(512, 2 * longest + 16),
+                num_beams=self.num_beams,   # Beam search for better quality
+                length_penalty=self.length_penalty,
+                early_stopping=True
+            )
+        return self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
+
+    def translate(self, text: str, src_lang: str, tgt_lang: str, progress_callback=None) -> str:
         """
         Translate text from src_lang to tgt_lang.
 
         Args:
-            text (str): Input text to translate.
+            text (str): Input text to translate; may be a multi-paragraph document.
             src_lang (str): Source language code ('en' or 'zh').
             tgt_lang (str): Target language code ('en' or 'zh').
+            progress_callback (callable, optional): Called as
+                progress_callback(done_chunks, total_chunks, partial_translation)
+                after each batch, with the translated chunks reassembled so far.
 
         Returns:
             str: Translated text.
@@ -46,26 +114,15 @@ class Translator:
         if (src_lang, tgt_lang) not in self.lang_code_map:
             raise ValueError(f"Unsupported language pair: {src_lang}-{tgt_lang}")
 
-        # Get model language codes
-        src_code, tgt_code = self.lang_code_map[(src_lang, tgt_lang)]
-        self.tokenizer.src_lang = src_code
-
-        # Tokenize input text
-        inputs = self.tokenizer(text, return_tensors="pt", padding=True).to(self.device)
-
-        # Generate translation with no grad for efficiency
-        with torch.no_grad():
-            generated_tokens = self.model.generate(
-                **inputs,
-                forced_bos_token_id=self.tokenizer.lang_code_to_id[tgt_code],
-                max_length=512,
-                num_beams=5,             # Beam search for better quality
-                early_stopping=True
-            )
-
-        # Decode generated tokens to string
-        translated_text = self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
-
-        return translated_text
+        # Split into paragraph/sentence chunks that fit the model comfortably
+        segments = segment_text(text, max_tokens=self.max_chunk_tokens, count_tokens=self._count_tokens)
+        chunks = [chunk for chunk, _ in segments]
+        paragraph_ends = [end for _, end in segments]
 
+        on_batch = None
+        if progress_callback is not None:
+            def on_batch(done, total, translations):
+                progress_callback(done, total, reassemble(translations, paragraph_ends, tgt_lang))
 
+        translations = self.translate_batch(chunks, src_lang, tgt_lang, progress_callback=on_batch)
+        return reassemble(translations, paragraph_ends, tgt_lang)
@@ -1,7 +1,10 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils.whisper_integration import transcribe_audio
+import config
+from utils.whisper_integration import ASR_MODELS, transcribe_audio
+from utils.language_context import LanguageContext, detect_text_language, resolve_language, translation_pair
+from utils.model_registry import registry
 
 import os
 import sys
@@ -13,7 +16,6 @@ from datetime import datetime
 import torch
 import pandas as pd
 import streamlit as st
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 
 try:
     import PyPDF2
@@ -26,49 +28,20 @@ except ImportError:
 
 torch.classes.__path__ = []
 
-# ----- Translator class -----
-class Translator:
-    def __init__(self):
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model_name = "facebook/nllb-200-1.3B"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name).to(self.device)
-
-        self.lang_code_map = {
-            ("en", "zh"): ("eng_Latn", "zho_Hans"),
-            ("zh", "en"): ("zho_Hans", "eng_Latn"),
-        }
-
-    def translate(self, text: str, src_lang: str, tgt_lang: str) -> str:
-        if (src_lang, tgt_lang) not in self.lang_code_map:
-            raise ValueError(f"Unsupported language pair: {src_lang}-{tgt_lang}")
-
-        src_code, tgt_code = self.lang_code_map[(src_lang, tgt_lang)]
-        self.tokenizer.src_lang = src_code
+# ----- Shared models -----
+# Models are held in a process-level registry, so reruns and other sessions reuse
+# them instead of reloading; the preload thread is started once per process.
+@st.cache_resource(show_spinner=False)
+def start_model_preload():
+    return registry.preload(["translator", ASR_MODELS[config.ASR_BACKEND]])
 
-        inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True).to(self.device)
-        generated_tokens = self.model.generate(
-            **inputs,
-            forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(tgt_code),
-            max_length=512,
-            num_beams=4,
-            early_stopping=True
-        )
-        output = self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
-        return output
-
-translator = Translator()
+def get_translator():
+    return registry.get("translator")
 
 # ----- Helper functions -----
-def detect_language(text: str) -> str:
-    chinese_chars = sum(1 for c in text if "\u4e00" <= c <= "\u9fff")
-    total = len(text.replace(' ', ''))
-    if total == 0:
-        return "unknown"
-    return "zh" if (chinese_chars / total) > 0.3 else "en"
-
 def clean_text(text: str) -> str:
-    return re.sub(r"\W{3,}", " ", text).strip()
+    # Collapse runs of symbols (e.g. PDF artefacts) but keep line and paragraph breaks
+    return re.sub(r"[^\w\s]{3,}", " ", text).strip()
 
 def save_json(data: dict, folder: str, prefix: str, filename: str) -> str:
     os.makedirs(folder, exist_ok=True)
@@ -131,12 +104,12 @@ def save_text_results(original: str, translation: str, src: str, tgt: str):
         "target_language": tgt,
         "original_text": original,
         "translation": translation,
-        "detected_language": detect_language(original)
+        "detected_language": detect_text_language(original)
     }
     json_path = save_json(out, "outputs/text_translations", "text_translation", "text")
     return json_path
 
-def translate_text_only(text: str, src: str, tgt: str) -> str:
+def translate_text_only(text: str, src: str, tgt: str, progress_callback=None) -> str:
     txt = clean_text(text)
     try:
         from utils.context_optimizer import optimize_context
@@ -144,7 +117,7 @@ def translate_text_only(text: str, src: str, tgt: str) -> str:
     except ImportError:
         pass
     try:
-        return translator.translate(txt, src, tgt)
+        return get_translator().translate(txt, src, tgt, progress_callback=progress_callback)
     except Exception as e:
         return f"[Translation error: {e}]"
 
@@ -171,6 +144,7 @@ def read_uploaded_file(uploaded_file) -> str:
 
 # ----- Streamlit UI -----
 st.set_page_config(page_title="English ↔ Chinese Speech & Text Translator", layout="wide")
+start_model_preload()
 
 st.markdown("""
 <style>
@@ -187,7 +161,7 @@ tab1, tab2, tab3 = st.tabs(["🎵 Audio Translation", "📝 Text/File Translatio
 with tab1:
     st.header("Audio → Text & Translation")
 
-    src = st.selectbox("Source Language", ["en", "zh"], key="audio_src")
+    src = st.selectbox("Source Language (used when Whisper is unsure)", ["en", "zh"], key="audio_src")
     tgt = "zh" if src == "en" else "en"
 
     audio_file = st.file_uploader("Upload audio (wav, mp3, m4a)", type=["wav", "mp3", "m4a"], key="audio_uploader")
@@ -203,7 +177,12 @@ with tab1:
                 except ImportError:
                     result = {"text": "[Transcription not implemented]"}
                 transcript_text = result.get("text", "") if isinstance(result, dict) else result
-                detected = detect_language(transcript_text)
+                # Reuse Whisper's language posterior; detect from text only when it is low
+                asr_context = LanguageContext.from_asr(result) if isinstance(result, dict) else None
+                context = resolve_language(transcript_text, asr_context)
+                detected = context.language
+                if context.source == "asr":
+                    src, tgt = translation_pair(context, default_src=src)
                 translation = translate_text_only(transcript_text, src, tgt)
                 json_file, csv_file = save_audio_results(result if isinstance(result, dict) else {"text": transcript_text}, translation, src, tgt, audio_file.name)
 
@@ -252,9 +231,21 @@ with tab2:
 
     if st.button("Translate Text"):
         if combined_text:
+            progress_bar = st.progress(0.0, text="Translating...")
+            partial_output = st.empty()
+
+            def show_progress(done, total, partial):
+                progress_bar.progress(done / total, text=f"Translated {done}/{total} segments")
+                partial_output.markdown(
+                    f"<div style='font-family:Microsoft YaHei; white-space:pre-wrap;'>{partial}</div>",
+                    unsafe_allow_html=True
+                )
+
             with st.spinner("Translating..."):
-                detected = detect_language(combined_text)
-                translation = translate_text_only(combined_text, text_src, text_tgt)
+                detected = detect_text_language(combined_text)
+                translation = translate_text_only(combined_text, text_src, text_tgt, progress_callback=show_progress)
+                progress_bar.empty()
+                partial_output.empty()
                 json_file = save_text_results(combined_text, translation, text_src, text_tgt)
             st.success("Translated!")
             t1, t2 = st.columns(2)
@@ -325,5 +316,14 @@ with st.sidebar:
 - Hugging Face NLLB MT model translation  
 - JSON/CSV exports and downloads  
 """)
+    st.markdown("### Models")
+    report = registry.memory_report()
+    st.metric("Process memory (MB)", f"{report['process_rss_mb']:.0f}")
+    st.dataframe(pd.DataFrame(report["models"]).drop(columns=["error"]), use_container_width=True, hide_index=True)
+    for model in report["models"]:
+        if model["error"]:
+            st.error(f"{model['name']} failed to load: {model['error']}")
+    if st.button("Refresh model status"):
+        st.rerun()
     st.markdown("### Requirements")
     st.code("pip install streamlit torch transformers pandas PyPDF2 python-docx", language="bash")
@@ -6,3 +6,17 @@ def test_optimize_context():
     text = "Break a leg!"
     optimized = optimize_context(text, src_lang="en", tgt_lang="zh")
     assert "祝你好运" in optimized
+
+def test_optimize_context_preserves_case_and_word_boundaries():
+    text = "The exam was a Piece of Cake, but we still had to CUT CORNERS. Cornerstones stay."
+    optimized = optimize_context(text, src_lang="en", tgt_lang="zh")
+    assert optimized == "The exam was a 小菜一碟, but we still had to 偷工减料. Cornerstones stay."
+    assert optimize_context("Shortcuts cut cornersome", "en", "zh") == "Shortcuts cut cornersome"
+
+def test_optimize_context_longest_match_and_apostrophes():
+    assert "说漏嘴" in optimize_context("Don't let the cat out of the bag.", "en", "zh")
+    assert optimize_context("Stop pulling, just pull someone’s\nleg", "en", "zh") == "Stop pulling, just 开某人玩笑"
+
+def test_optimize_context_other_pairs():
+    assert optimize_context("这真是一举两得。", "zh", "en") == "这真是kill two birds with one stone。"
+    assert optimize_context("Break a leg!", "en", "fr") == "Break a leg!"
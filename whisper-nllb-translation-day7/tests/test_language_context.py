@@ -0,0 +1,16 @@
+# tests/test_language_context.py
+
+from utils.language_context import LanguageContext, resolve_language, translation_pair
+
+def test_confident_asr_language_is_reused():
+    context = LanguageContext.from_asr({"text": "hello", "language": "zh", "language_probability": 0.98})
+    # The transcript text is not consulted when Whisper is confident
+    assert resolve_language("hello world", context) is context
+    assert translation_pair(context) == ("zh", "en")
+
+def test_low_confidence_falls_back_to_text():
+    context = LanguageContext.from_asr({"text": "你好", "language": "en", "language_probability": 0.3})
+    resolved = resolve_language("你好，世界", context)
+    assert (resolved.language, resolved.source) == ("zh", "text")
+    assert translation_pair(LanguageContext("fr", 0.99), default_src="zh") == ("zh", "en")
+    assert LanguageContext.from_asr({}, requested_language="en").is_reliable()
@@ -0,0 +1,34 @@
+# tests/test_model_registry.py
+
+import threading
+
+from utils.model_registry import ModelRegistry
+
+def test_model_loaded_once_across_threads():
+    registry = ModelRegistry()
+    calls = []
+    registry.register("dummy", lambda: calls.append(1) or object())
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("dummy"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    report = registry.memory_report()
+    assert report["models"][0]["status"] == "loaded"
+    assert report["process_rss_mb"] > 0
+
+def test_preload_and_failed_load_status():
+    registry = ModelRegistry()
+    registry.register("ok", lambda: "model")
+    registry.register("broken", lambda: 1 / 0)
+    registry.preload().join()
+
+    assert registry.is_loaded("ok")
+    statuses = {m["name"]: m for m in registry.memory_report()["models"]}
+    assert statuses["broken"]["status"] == "failed"
+    assert "division by zero" in statuses["broken"]["error"]
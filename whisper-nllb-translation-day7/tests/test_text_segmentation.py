@@ -0,0 +1,28 @@
+# tests/test_text_segmentation.py
+
+from utils.text_segmentation import pack_sentences, reassemble, segment_text, split_sentences
+
+def test_split_sentences_english_and_chinese():
+    english = split_sentences("Dr. Smith arrived at 5 p.m. today. Was he late?\nNo, he was\nearly!")
+    assert english == ["Dr. Smith arrived at 5 p.m. today.", "Was he late?", "No, he was early!"]
+    chinese = split_sentences("今天天气很好。我们去公园吧！“好的。”你呢？")
+    assert chinese == ["今天天气很好。", "我们去公园吧！", "“好的。”", "你呢？"]
+
+def test_pack_sentences_respects_token_budget():
+    sentences = [f"Sentence number {i} is here." for i in range(20)]
+    chunks = pack_sentences(sentences, max_tokens=20, count_tokens=lambda s: len(s.split()))
+    assert all(len(chunk.split()) <= 20 for chunk in chunks)
+    assert " ".join(chunks) == " ".join(sentences)
+
+    long_chinese = "一" * 50 + "，" + "二" * 50 + "。"
+    pieces = pack_sentences([long_chinese], max_tokens=30, count_tokens=len)
+    assert all(len(piece) <= 30 for piece in pieces)
+    assert "".join(pieces) == long_chinese
+
+def test_segment_and_reassemble_keeps_paragraphs():
+    text = "First paragraph. It has two sentences.\n\n第二段。两句话。"
+    segments = segment_text(text, max_tokens=10, count_tokens=lambda s: 10)
+    assert [end for _, end in segments] == [False, True, False, True]
+    translations = ["A.", "B.", "C.", "D."]
+    assert reassemble(translations, [end for _, end in segments], "en") == "A. B.\n\nC. D."
+    assert reassemble(["甲。", "乙。", None, "丁。"], [end for _, end in segments], "zh") == "甲。乙。\n\n丁。"
@@ -12,3 +12,60 @@ def test_transcribe_audio():
     transcript = transcribe_audio(dummy_audio)
     assert isinstance(transcript, str)
     assert len(transcript) > 0
+
+def _wav_bytes(samples, sr, width, channels=1):
+    import io
+    import wave
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(width)
+        wf.setframerate(sr)
+        wf.writeframes(samples)
+    return buf.getvalue()
+
+def test_decode_pcm_wav_in_memory():
+    import numpy as np
+    from utils.whisper_integration import decode_audio
+
+    with open("tests/assets/sample.wav", "rb") as f:
+        audio = decode_audio(f.read())
+    assert audio.dtype == np.float32 and audio.ndim == 1
+    assert abs(len(audio) - 809508 * 16000 / 44100) < 2
+
+    tone = (0.5 * np.sin(2 * np.pi * 440 * np.arange(16000) / 16000) * 32767).astype("<i2")
+    decoded = decode_audio(_wav_bytes(tone.tobytes(), 16000, 2))
+    assert np.allclose(decoded, tone / 32768.0, atol=1e-6)
+
+    # 24-bit little-endian samples, including negative values
+    ints = (tone.astype(np.int32) << 8)
+    packed = np.stack([(ints >> s) & 0xFF for s in (0, 8, 16)], axis=1).astype(np.uint8).tobytes()
+    assert np.allclose(decode_audio(_wav_bytes(packed, 16000, 3)), decoded, atol=1e-6)
+
+def test_faster_whisper_output_mapping(monkeypatch):
+    from types import SimpleNamespace
+    import numpy as np
+    import utils.whisper_integration as wi
+
+    words = [SimpleNamespace(word=" Hello", start=0.0, end=0.4, probability=0.9),
+             SimpleNamespace(word=" world", start=0.5, end=0.9, probability=0.8)]
+    segment = SimpleNamespace(start=0.0, end=1.0, text=" Hello world", avg_logprob=-0.1, words=words)
+    info = SimpleNamespace(language="en", language_probability=0.97)
+
+    class FakePipeline:
+        def transcribe(self, audio, **kwargs):
+            assert kwargs["word_timestamps"] and kwargs["vad_filter"]
+            return iter([segment]), info
+
+    monkeypatch.setattr(wi, "get_whisper_model", lambda backend=None: FakePipeline())
+    tone = (np.zeros(16000, dtype="<i2")).tobytes()
+
+    class DummyFile:
+        def read(self):
+            return _wav_bytes(tone, 16000, 2)
+
+    result = wi.transcribe_audio(DummyFile(), backend="faster-whisper")
+    assert result["text"] == "Hello world"
+    assert result["language"] == "en" and result["language_probability"] == 0.97
+    assert result["words"][1] == {"text": "world", "start": 0.5, "end": 0.9, "confidence": 0.8}
+    assert abs(result["segments"][0]["confidence"] - np.exp(-0.1)) < 1e-9
@@ -1,60 +1,126 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+# Idiom lexicon keyed by "src-tgt" language pair: {phrase: replacement}
+IDIOMS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "idioms.json")
+
+# Curly apostrophes are matched as straight ones
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'"})
+
+
+@lru_cache(maxsize=1)
+def load_idioms(path=IDIOMS_PATH):
+    """Load the idiom lexicon once per process."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _normalize_key(phrase):
+    return phrase.translate(_APOSTROPHES).casefold()
+
+
+def _trie_pattern(phrases):
+    """
+    Regex alternation for `phrases` factored into a prefix trie, e.g.
+    ["hit the books", "hit the sack"] -> "hit\\s+the\\s+(?:books|sack)".
+    Shared prefixes are matched once and the leading character class lets `re`
+    skip quickly over text that cannot start an idiom.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = []
+        for ch in sorted(k for k in node if k):
+            if ch == " ":
+                atom = r"\s+"           # any whitespace run, e.g. line breaks in PDFs
+            elif ch == "'":
+                atom = "['’‘]"          # straight or curly apostrophe
+            else:
+                atom = re.escape(ch)
+            branches.append(atom + build(node[ch]))
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+    return build(trie)
+
+
+def compile_lexicon(lexicon):
+    """
+    Compile a {phrase: replacement} lexicon into (pattern, replacements, whole_words).
+    All phrases form a single alternation (as a trie, so the longest idiom wins),
+    which scans the text once regardless of the lexicon size. The pattern is
+    lowercase and is matched against a lowercased copy of the text.
+    """
+    replacements = {_normalize_key(phrase): target for phrase, target in lexicon.items()}
+    body = _trie_pattern(replacements)
+    whole_words = all(key.isascii() for key in replacements)
+    if whole_words:
+        # Whole words/phrases only for alphabetic scripts. The left boundary is checked
+        # in apply_lexicon: a leading lookbehind would stop `re` from using the
+        # pattern's first-character set to skip ahead.
+        body = rf"{body}(?!\w)"
+    return re.compile(body), replacements, whole_words
+
+
+def apply_lexicon(text, compiled):
+    """Replace every idiom of a compiled lexicon in one pass, preserving the rest of the text."""
+    pattern, replacements, whole_words = compiled
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Rare characters whose lowercase form changes length: match case-insensitively instead
+        pattern = re.compile(pattern.pattern, re.IGNORECASE)
+        lowered = text
+
+    # Match on the lowercased copy, splice replacements into the original text
+    pieces, pos = [], 0
+    match = pattern.search(lowered)
+    while match:
+        start = match.start()
+        if whole_words and start > 0 and (lowered[start - 1].isalnum() or lowered[start - 1] == "_"):
+            # Idiom starts inside a word: retry from the next character
+            match = pattern.search(lowered, start + 1)
+            continue
+        pieces.append(text[pos:start])
+        pieces.append(replacements[_normalize_key(" ".join(match.group(0).split()))])
+        pos = match.end()
+        match = pattern.search(lowered, pos)
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+@lru_cache(maxsize=None)
+def _compile(src_lang, tgt_lang):
+    """Compiled lexicon for a language pair, or None if the pair has no idioms."""
+    lexicon = load_idioms().get(f"{src_lang}-{tgt_lang}")
+    if not lexicon:
+        return None
+    return compile_lexicon(lexicon)
+
+
 def optimize_context(text, src_lang, tgt_lang):
     """
     Optimize input text context based on source and target languages.
-    Replaces idioms and informal expressions for better translation results.
+    Replaces idioms and informal expressions for better translation results,
+    leaving the casing and wording of the rest of the text untouched.
     """
 
     if not isinstance(text, str):
         raise ValueError("optimize_context expects a string input")
 
-    if src_lang == "en" and tgt_lang == "zh":
-        # Lowercase the input for consistency
-        text_lower = text.lower()
-
-        # Idioms and expressions dictionary: English -> Simplified Chinese
-        idiom_replacements = {
-            "break a leg": "祝你好运",
-            "hit the sack": "去睡觉",
-            "piece of cake": "小菜一碟",
-            "under the weather": "身体不舒服",
-            "cost an arm and a leg": "非常昂贵",
-            "spill the beans": "泄露秘密",
-            "let the cat out of the bag": "说漏嘴",
-            "hit the books": "用功读书",
-            "kick the bucket": "去世（俚语）",
-            "bite the bullet": "咬紧牙关面对困难",
-            "burn the midnight oil": "熬夜工作或学习",
-            "bend over backwards": "极力帮助",
-            "out of the blue": "出乎意料",
-            "in hot water": "陷入麻烦",
-            "call it a day": "收工",
-            "add fuel to the fire": "火上加油",
-            "cry over spilled milk": "为无法挽回的事悲伤",
-            "once in a blue moon": "千载难逢",
-            "hit the nail on the head": "一针见血",
-            "jump the gun": "操之过急",
-            "pull someone’s leg": "开某人玩笑",
-            "pull someone's leg": "开某人玩笑",
-            "the ball is in your court": "轮到你行动了",
-            "on the fence": "犹豫不决",
-            "the last straw": "最后一根稻草",
-            "throw in the towel": "认输",
-            "when pigs fly": "不可能的事情",
-            "kill two birds with one stone": "一箭双雕",
-            "cut corners": "偷工减料",
-            "go the extra mile": "加倍努力",
-            "rain cats and dogs": "下倾盆大雨",
-            "hang in there": "坚持住",
-            "see eye to eye": "意见一致",
-            "salt pickle": "咸菜"
-        }
-
-        # Replace idioms in the input text
-        for phrase, replacement in idiom_replacements.items():
-            if phrase in text_lower:
-                text_lower = text_lower.replace(phrase, replacement)
-
-        return text_lower
-
-    # For other language pairs or no optimization
-    return text
+    compiled = _compile(src_lang, tgt_lang)
+    if compiled is None:
+        # For other language pairs or no optimization
+        return text
+
+    return apply_lexicon(text, compiled)
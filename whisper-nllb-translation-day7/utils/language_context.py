@@ -0,0 +1,53 @@
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import config
+
+def detect_text_language(text: str) -> str:
+    """Script-based en/zh guess for text that did not come through ASR."""
+    chinese_chars = sum(1 for c in text if "\u4e00" <= c <= "\u9fff")
+    total = len(text.replace(" ", ""))
+    if total == 0:
+        return "unknown"
+    return "zh" if (chinese_chars / total) > 0.3 else "en"
+
+@dataclass(frozen=True)
+class LanguageContext:
+    """
+    Source language handed from ASR to translation, so the transcript does not have
+    to be re-detected. `source` is "user", "asr" (Whisper's posterior) or "text".
+    """
+    language: str
+    probability: Optional[float] = None
+    source: str = "asr"
+
+    @classmethod
+    def from_asr(cls, result: dict, requested_language: Optional[str] = None) -> "LanguageContext":
+        """Build a context from a transcribe_audio() result."""
+        if requested_language:
+            return cls(requested_language, 1.0, "user")
+        return cls(result.get("language") or "unknown", result.get("language_probability"), "asr")
+
+    def is_reliable(self, threshold: Optional[float] = None) -> bool:
+        threshold = config.LANGUAGE_CONFIDENCE_THRESHOLD if threshold is None else threshold
+        if not self.language or self.language == "unknown":
+            return False
+        return self.source == "user" or (self.probability is not None and self.probability >= threshold)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def resolve_language(text: str, context: Optional[LanguageContext] = None) -> LanguageContext:
+    """Use `context` when reliable; only otherwise fall back to detecting from the text."""
+    if context is not None and context.is_reliable():
+        return context
+    return LanguageContext(detect_text_language(text), None, "text")
+
+def translation_pair(context: LanguageContext, default_src: str = None):
+    """
+    (src, tgt) for a source language, looked up in config.SUPPORTED_LANGUAGE_PAIRS;
+    falls back to `default_src` (or config.DEFAULT_SOURCE_LANG) when unsupported.
+    """
+    pairs = dict(config.SUPPORTED_LANGUAGE_PAIRS)
+    src = context.language if context.language in pairs else (default_src or config.DEFAULT_SOURCE_LANG)
+    return src, pairs[src]
@@ -0,0 +1,149 @@
+import os
+import resource
+import sys
+import threading
+import time
+
+import config
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB (psutil, /proc, or peak RSS as a fallback)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _parameter_mb(model):
+    """Size of a torch module's parameters in MB, or None for non-torch models."""
+    module = getattr(model, "model", model)
+    parameters = getattr(module, "parameters", None)
+    if parameters is None:
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters()) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class _Entry:
+    def __init__(self, loader):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.model = None
+        self.status = "registered"
+        self.error = None
+        self.load_seconds = None
+        self.rss_delta_mb = None
+        self.parameter_mb = None
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of lazily loaded models.
+
+    Each model is loaded at most once per process, even when several threads
+    (e.g. Streamlit sessions or a background preload) ask for it at the same time.
+    Because the registry lives in an imported module, it survives Streamlit reruns.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """Register a zero-argument loader under `name` (no-op if already registered)."""
+        with self._lock:
+            self._entries.setdefault(name, _Entry(loader))
+
+    def _entry(self, name):
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown model: {name}")
+
+    def get(self, name):
+        """Return the model, loading it on first use. Load errors are re-raised."""
+        entry = self._entry(name)
+        if entry.model is not None:
+            return entry.model
+        with entry.lock:
+            if entry.model is None:
+                entry.status = "loading"
+                rss_before = current_rss_mb()
+                start = time.perf_counter()
+                try:
+                    model = entry.loader()
+                except Exception as e:
+                    entry.status, entry.error = "failed", str(e)
+                    raise
+                entry.load_seconds = time.perf_counter() - start
+                entry.rss_delta_mb = current_rss_mb() - rss_before
+                entry.parameter_mb = _parameter_mb(model)
+                entry.model, entry.status, entry.error = model, "loaded", None
+        return entry.model
+
+    def is_loaded(self, name):
+        return self._entry(name).model is not None
+
+    def preload(self, names=None):
+        """Load the given models (default: all) in a daemon thread; returns the thread."""
+        names = list(names or self._entries)
+
+        def _load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Preloading '{name}' failed: {e}")
+
+        thread = threading.Thread(target=_load_all, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def memory_report(self):
+        """Per-model load status, load time and memory, plus the current process RSS."""
+        models = []
+        for name, entry in self._entries.items():
+            models.append({
+                "name": name,
+                "status": entry.status,
+                "load_seconds": round(entry.load_seconds, 2) if entry.load_seconds is not None else None,
+                "rss_delta_mb": round(entry.rss_delta_mb, 1) if entry.rss_delta_mb is not None else None,
+                "parameter_mb": round(entry.parameter_mb, 1) if entry.parameter_mb is not None else None,
+                "error": entry.error
+            })
+        return {"process_rss_mb": round(current_rss_mb(), 1), "models": models}
+
+
+def _load_translator():
+    from models import create_translator
+    return create_translator()
+
+
+def _load_whisper():
+    import whisper
+    return whisper.load_model(config.WHISPER_MODEL_NAME)
+
+
+def _load_faster_whisper():
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+    model = WhisperModel(config.WHISPER_MODEL_NAME, device="auto", compute_type=config.FASTER_WHISPER_COMPUTE_TYPE)
+    return BatchedInferencePipeline(model=model)
+
+
+# Shared process-level registry with the app's default models
+registry = ModelRegistry()
+registry.register("translator", _load_translator)
+registry.register("whisper", _load_whisper)
+registry.register("faster_whisper", _load_faster_whisper)
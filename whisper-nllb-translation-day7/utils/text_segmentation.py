@@ -0,0 +1,146 @@
+import re
+
+# Sentence ends: Latin terminators followed by whitespace, or CJK terminators
+# (which are not followed by spaces), each optionally followed by closing quotes/brackets.
+_EN_SENTENCE_END = re.compile(r"""[.!?]+["'”’)\]]*(?=\s)""")
+_ZH_SENTENCE_END = re.compile(r"""[。！？；…]+[”’」』）)]*""")
+_CLAUSE_BREAK = re.compile(r"""[,;:，、；：]\s*""")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_CJK = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]")
+
+# Abbreviations whose trailing period does not end a sentence
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "inc", "ltd", "co", "no", "fig", "approx", "dept", "u.s", "u.k", "a.m", "p.m"
+}
+
+
+def approx_token_count(text):
+    """
+    Rough subword count when no tokenizer is at hand:
+    one token per CJK character, ~1.3 tokens per other word.
+    """
+    cjk = len(_CJK.findall(text))
+    words = len(_CJK.sub(" ", text).split())
+    return cjk + int(words * 1.3 + 0.5)
+
+
+def split_paragraphs(text):
+    """Split text on blank lines into stripped, non-empty paragraphs."""
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
+
+
+def split_sentences(text):
+    """
+    Split a paragraph into sentences. English (. ! ? followed by whitespace, skipping
+    common abbreviations and initials) and Chinese (。！？；…) terminators are both
+    honoured, so mixed-language input works. Single line breaks, e.g. from PDF
+    extraction, are treated as wrapped lines rather than sentence boundaries.
+    """
+    line = ""
+    for part in text.split("\n"):
+        if part.strip():
+            line = _join(line, part.strip())
+    cuts = {match.end() for match in _ZH_SENTENCE_END.finditer(line)}
+    for match in _EN_SENTENCE_END.finditer(line):
+        before = line[:match.start()].split()
+        word = before[-1].lower() if before else ""
+        if word.rstrip(".") in _ABBREVIATIONS or re.fullmatch(r"[a-z]", word):
+            continue
+        cuts.add(match.end())
+    sentences, start = [], 0
+    for cut in sorted(cuts) + [len(line)]:
+        sentence = line[start:cut].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = cut
+    return sentences
+
+
+def _split_long(sentence, max_tokens, count_tokens):
+    """Split an over-long sentence at clause punctuation, then by words/characters."""
+    if count_tokens(sentence) <= max_tokens:
+        return [sentence]
+    clauses, pos = [], 0
+    for match in _CLAUSE_BREAK.finditer(sentence):
+        clauses.append(sentence[pos:match.end()].strip())
+        pos = match.end()
+    clauses.append(sentence[pos:].strip())
+    clauses = [c for c in clauses if c]
+    if len(clauses) == 1:
+        # No clause boundary: fall back to words, or characters for unspaced CJK text
+        units = sentence.split() if " " in sentence else list(sentence)
+        joiner = " " if " " in sentence else ""
+        pieces, current = [], []
+        for unit in units:
+            if current and count_tokens(joiner.join(current + [unit])) > max_tokens:
+                pieces.append(joiner.join(current))
+                current = []
+            current.append(unit)
+        if current:
+            pieces.append(joiner.join(current))
+        return pieces
+    return pack_sentences(clauses, max_tokens, count_tokens)
+
+
+def _join(left, right):
+    """Join two text pieces, adding a space only between non-CJK neighbours."""
+    if not left:
+        return right
+    if _CJK.match(left[-1]) or _CJK.match(right[0]) or left[-1] in "。！？；，、":
+        return left + right
+    return left + " " + right
+
+
+def pack_sentences(sentences, max_tokens=200, count_tokens=approx_token_count):
+    """
+    Greedily merge consecutive sentences into chunks of at most `max_tokens`
+    (keeping some context per chunk), splitting any sentence that alone exceeds it.
+    """
+    chunks, current, current_tokens = [], "", 0
+    for sentence in sentences:
+        for piece in _split_long(sentence, max_tokens, count_tokens):
+            tokens = count_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append(current)
+                current, current_tokens = "", 0
+            current = _join(current, piece)
+            current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def segment_text(text, max_tokens=200, count_tokens=approx_token_count):
+    """
+    Segment a document into translation units.
+
+    Returns:
+        list of (chunk, paragraph_end) tuples in document order, where paragraph_end
+        is True for the last chunk of each paragraph.
+    """
+    segments = []
+    for paragraph in split_paragraphs(text):
+        chunks = pack_sentences(split_sentences(paragraph), max_tokens, count_tokens)
+        for i, chunk in enumerate(chunks):
+            segments.append((chunk, i == len(chunks) - 1))
+    return segments
+
+
+def reassemble(translations, paragraph_ends, tgt_lang):
+    """
+    Join translated chunks back into a document: chunks of a paragraph are joined
+    with a space (English) or directly (Chinese), paragraphs with a blank line.
+    Missing translations (None) are skipped, so partial results can be shown.
+    """
+    sentence_sep = "" if tgt_lang == "zh" else " "
+    paragraphs, current = [], []
+    for translation, paragraph_end in zip(translations, paragraph_ends):
+        if translation:
+            current.append(translation.strip())
+        if paragraph_end and current:
+            paragraphs.append(sentence_sep.join(current))
+            current = []
+    if current:
+        paragraphs.append(sentence_sep.join(current))
+    return "\n\n".join(paragraphs)
@@ -1,37 +1,194 @@
-import whisper
-import tempfile
+import io
 import os
+import subprocess
+import tempfile
+import wave
 
-# Load the Whisper model only once
-model = whisper.load_model("large")
+import numpy as np
 
-def transcribe_audio(audio_file):
-    """
-    Transcribes an uploaded audio file using OpenAI's Whisper model.
+import config
+from utils.model_registry import registry
 
-    Parameters:
-    - audio_file: A file-like object (e.g., from Streamlit uploader).
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
 
-    Returns:
-    - dict: A dictionary containing 'text', and optionally 'segments' and 'words'.
-    """
-    # Create a temporary file from uploaded audio
-    tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+try:
+    from scipy.signal import resample_poly
+except ImportError:
+    resample_poly = None
+
+# Whisper models expect 16 kHz mono float32
+SAMPLE_RATE = 16000
+
+# Registry entry for each ASR backend name
+ASR_MODELS = {"whisper": "whisper", "faster-whisper": "faster_whisper"}
+
+def get_whisper_model(backend=None):
+    """Return the shared ASR model for `backend`, loading it once per process on first use."""
+    return registry.get(ASR_MODELS[backend or config.ASR_BACKEND])
+
+def _to_mono_16k(audio, sr):
+    """Downmix (frames, channels) audio to mono and resample it to 16 kHz."""
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if sr != SAMPLE_RATE:
+        if resample_poly is not None:
+            g = np.gcd(int(sr), SAMPLE_RATE)
+            audio = resample_poly(audio, SAMPLE_RATE // g, int(sr) // g)
+        else:
+            n_out = int(round(len(audio) * SAMPLE_RATE / sr))
+            audio = np.interp(np.arange(n_out) * (sr / SAMPLE_RATE), np.arange(len(audio)), audio)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+def _decode_pcm_wav(data):
+    """Decode an uncompressed PCM WAV with the stdlib; returns None if it is not one."""
     try:
-        tmp.write(audio_file.read())
-        tmp.close()
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            channels, width, sr = wf.getnchannels(), wf.getsampwidth(), wf.getframerate()
+            frames = wf.readframes(wf.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    if width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        ints = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints >= 1 << 23, ints - (1 << 24), ints)
+        audio = ints.astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        return None
+    return _to_mono_16k(audio.reshape(-1, channels), sr)
 
-        # Run transcription (remove `word_timestamps=True` if you’re not using whisperx)
-        result = model.transcribe(tmp.name)
+def _decode_soundfile(data):
+    """Decode WAV (incl. float/ADPCM), FLAC or OGG via libsndfile; None if unsupported."""
+    if sf is None:
+        return None
+    try:
+        audio, sr = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except Exception:
+        return None
+    return _to_mono_16k(audio, sr)
 
-        # Ensure structure matches Streamlit app expectations
-        output = {
-            "text": result.get("text", ""),
-            "segments": result.get("segments", []),
-            "words": []  # Whisper (non-X) doesn't return word timestamps
-        }
+def _decode_ffmpeg(data):
+    """
+    Decode any other format by piping bytes through ffmpeg (stdin -> s16le stdout).
+    Containers that need seeking (e.g. MP4/M4A with a trailing moov atom) cannot be
+    read from a pipe, so a temporary file is used as a last resort.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-loglevel", "error",
+           "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1"]
+    proc = subprocess.run(cmd, input=data, capture_output=True)
+    if proc.returncode == 0 and proc.stdout:
+        return np.frombuffer(proc.stdout, dtype=np.int16).astype(np.float32) / 32768.0
 
+    tmp = tempfile.NamedTemporaryFile(delete=False)
+    try:
+        tmp.write(data)
+        tmp.close()
+        cmd[cmd.index("pipe:0")] = tmp.name
+        proc = subprocess.run(cmd, capture_output=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Failed to decode audio: {proc.stderr.decode(errors='ignore').strip()}")
+        return np.frombuffer(proc.stdout, dtype=np.int16).astype(np.float32) / 32768.0
     finally:
         os.remove(tmp.name)
 
-    return output
+def decode_audio(data: bytes) -> np.ndarray:
+    """
+    Decode audio bytes to a 16 kHz mono float32 array without touching the disk:
+    PCM WAV with the stdlib `wave` module (no ffmpeg), WAV/FLAC/OGG with soundfile,
+    everything else through an ffmpeg stdin/stdout pipe.
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        audio = _decode_pcm_wav(data)
+        if audio is not None:
+            return audio
+    if data[:4] in (b"RIFF", b"fLaC", b"OggS"):
+        audio = _decode_soundfile(data)
+        if audio is not None:
+            return audio
+    return _decode_ffmpeg(data)
+
+def _segment_confidence(avg_logprob):
+    return float(np.exp(avg_logprob)) if avg_logprob is not None else 0.0
+
+def _transcribe_faster_whisper(model, audio, language):
+    segments, info = model.transcribe(
+        audio,
+        language=language,
+        batch_size=config.ASR_BATCH_SIZE,
+        vad_filter=config.ASR_VAD_FILTER,
+        word_timestamps=True
+    )
+    out_segments = []
+    for seg in segments:
+        out_segments.append({
+            "start": seg.start,
+            "end": seg.end,
+            "text": seg.text.strip(),
+            "confidence": _segment_confidence(seg.avg_logprob),
+            "words": [
+                {"text": w.word.strip(), "start": w.start, "end": w.end, "confidence": w.probability}
+                for w in (seg.words or [])
+            ]
+        })
+    return out_segments, info.language, info.language_probability
+
+def _transcribe_openai_whisper(model, audio, language):
+    result = model.transcribe(audio, language=language, word_timestamps=True)
+    out_segments = []
+    for seg in result.get("segments", []):
+        out_segments.append({
+            "start": seg.get("start"),
+            "end": seg.get("end"),
+            "text": seg.get("text", "").strip(),
+            "confidence": _segment_confidence(seg.get("avg_logprob")),
+            "words": [
+                {"text": w.get("word", "").strip(), "start": w.get("start"), "end": w.get("end"),
+                 "confidence": w.get("probability", 0)}
+                for w in seg.get("words", [])
+            ]
+        })
+    # openai-whisper does not expose the detection probability from transcribe()
+    return out_segments, result.get("language"), None
+
+def transcribe_audio(audio_file, language=None, backend=None):
+    """
+    Transcribes an uploaded audio file with Whisper.
+
+    Parameters:
+    - audio_file: A file-like object (e.g., from Streamlit uploader).
+    - language: Optional language code; detected automatically when None.
+    - backend: "faster-whisper" (int8, batched, VAD-filtered) or "whisper";
+      defaults to config.ASR_BACKEND.
+
+    Returns:
+    - dict with 'text', 'language', 'language_probability', 'duration', and
+      'segments'/'words' where every segment and word has text, start, end and
+      confidence (the structure save_audio_results expects).
+    """
+    backend = backend or config.ASR_BACKEND
+    # Decode in memory and pass the float32 array straight to the model
+    audio = decode_audio(audio_file.read())
+    model = get_whisper_model(backend)
+    if backend == "faster-whisper":
+        segments, detected, probability = _transcribe_faster_whisper(model, audio, language)
+    else:
+        segments, detected, probability = _transcribe_openai_whisper(model, audio, language)
+
+    # Chinese/Japanese segments are joined without spaces
+    separator = "" if detected in ("zh", "ja") else " "
+    return {
+        "text": separator.join(seg["text"] for seg in segments if seg["text"]),
+        "language": detected,
+        "language_probability": probability,
+        "duration": len(audio) / SAMPLE_RATE,
+        "segments": segments,
+        "words": [word for seg in segments for word in seg["words"]]
+    }